@@ -0,0 +1,424 @@
+"""
+Frontend Asset Pipeline for Genesis Crew
+Turns the files the Frontend Specialist wrote into a production bundle in
+build/frontend/dist: unreferenced and duplicate files are reported and left
+out, stylesheets and scripts are bundled and minified, bundle names carry a
+content hash so they can be cached forever, and every text file is
+precompressed to gzip (and brotli when installed). The generated FastAPI app
+serves the result.
+
+The module only needs the standard library, so the pipeline copies it into
+the build as build_assets.py and the generated Dockerfile runs it in its own
+stage; dist is never committed.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import rjsmin
+except ImportError:  # fall back to the conservative built-in minifier
+    rjsmin = None
+
+try:
+    import rcssmin
+except ImportError:
+    rcssmin = None
+
+try:
+    import brotli
+except ImportError:  # gzip alone still covers every client
+    brotli = None
+
+DIST_DIR = "dist"
+# Name of this module's copy in the build directory
+BUILD_SCRIPT = "build_assets.py"
+ASSETS_DIR = "assets"
+SOURCE_EXTENSIONS = (".html", ".css", ".js")
+COMPRESS_EXTENSIONS = (".html", ".css", ".js", ".json", ".svg")
+# Files smaller than this are not worth a compressed variant
+COMPRESS_MIN_SIZE = 256
+
+_SCRIPT = re.compile(r"<script\b(?P<attrs>[^>]*)>(?P<body>.*?)</script>\s*", re.S | re.I)
+_STYLESHEET = re.compile(r"<link\b(?=[^>]*\brel=[\"']?stylesheet)[^>]*>\s*", re.I)
+_ATTR = re.compile(r"\b(src|href)=[\"']([^\"']+)[\"']", re.I)
+_CSS_STRING_OR_COMMENT = re.compile(r"""/\*.*?\*/|"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'""", re.S)
+_CSS_IMPORT = re.compile(r"@import\s+(?:url\()?[\"']?([^\"')\s;]+)[\"']?\)?\s*;", re.I)
+# A / after one of these (or at the start) opens a regex literal, anywhere else it divides
+_JS_REGEX_AFTER = set("(,=:[!&|?{};+-*%<>~^")
+_JS_REGEX_KEYWORD = re.compile(r"(?<![\w$.])(?:return|typeof|instanceof|in|of|new|delete|void|throw|case|do|else|yield|await)$")
+
+
+@dataclass
+class AssetReport:
+    bundles: Dict[str, str] = field(default_factory=dict)
+    """Original reference(s) -> hashed path under /assets."""
+    dead: List[str] = field(default_factory=list)
+    duplicates: Dict[str, str] = field(default_factory=dict)
+    """Duplicate file -> the file it duplicates."""
+    missing: List[str] = field(default_factory=list)
+    source_bytes: int = 0
+    dist_bytes: int = 0
+    compressed_bytes: int = 0
+
+    def summary(self) -> str:
+        lines = [f"{len(self.bundles)} bundles, {self.source_bytes} -> {self.dist_bytes} bytes "
+                 f"({self.compressed_bytes} bytes compressed)"]
+        if self.dead:
+            lines.append(f"unreferenced: {', '.join(self.dead)}")
+        if self.duplicates:
+            lines.append("duplicates: " + ", ".join(f"{a} = {b}" for a, b in self.duplicates.items()))
+        if self.missing:
+            lines.append(f"missing: {', '.join(self.missing)}")
+        return "; ".join(lines)
+
+
+# --- Minification ---
+
+def minify_css(css: str) -> str:
+    """
+    With rcssmin installed it does the work. The fallback drops comments and
+    only the whitespace next to braces and semicolons: whitespace elsewhere
+    can be a descendant combinator ("div :first-child"), and strings are
+    kept verbatim.
+    """
+    if rcssmin is not None:
+        return rcssmin.cssmin(css)
+    strings: List[str] = []
+
+    def hold(match: re.Match) -> str:
+        token = match.group(0)
+        if token.startswith("/*"):
+            return " "
+        strings.append(token)
+        return f"\x00{len(strings) - 1}\x00"
+
+    css = _CSS_STRING_OR_COMMENT.sub(hold, css)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};])\s*", r"\1", css)
+    css = css.replace(";}", "}").strip()
+    return re.sub(r"\x00(\d+)\x00", lambda match: strings[int(match.group(1))], css)
+
+
+def _string_end(js: str, start: int) -> int:
+    """End of the string or template literal at start; a quote string also ends at a raw newline."""
+    quote, i = js[start], start + 1
+    while i < len(js):
+        char = js[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == quote:
+            return i + 1
+        if char == "\n" and quote != "`":
+            return i
+        if quote == "`" and js.startswith("${", i):
+            i = _expression_end(js, i + 2)
+            continue
+        i += 1
+    return len(js)
+
+
+def _expression_end(js: str, start: int) -> int:
+    """End of a template literal's ${...} expression, which may hold strings and nested braces."""
+    i, depth = start, 0
+    while i < len(js):
+        char = js[i]
+        if char in "\"'`":
+            i = _string_end(js, i)
+            continue
+        if js.startswith("//", i) or js.startswith("/*", i):
+            i = _comment_end(js, i)
+            continue
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            if not depth:
+                return i + 1
+            depth -= 1
+        i += 1
+    return len(js)
+
+
+def _comment_end(js: str, start: int) -> int:
+    if js.startswith("//", start):
+        end = js.find("\n", start)
+        return len(js) if end == -1 else end
+    end = js.find("*/", start + 2)
+    return len(js) if end == -1 else end + 2
+
+
+def _regex_end(js: str, start: int) -> Optional[int]:
+    """End of the regex literal at start, or None if the line ends first (then it was a division)."""
+    i, in_class = start + 1, False
+    while i < len(js) and js[i] != "\n":
+        char = js[i]
+        if char == "\\":
+            i += 1
+        elif char == "[":
+            in_class = True
+        elif char == "]":
+            in_class = False
+        elif char == "/" and not in_class:
+            return re.match(r"/[a-z]*", js[i:]).end() + i
+        i += 1
+    return None
+
+
+def _regex_allowed(code: str) -> bool:
+    """Whether a / after this code starts a regex literal rather than a division."""
+    code = code.rstrip()
+    if not code:
+        return True
+    if code.endswith(("++", "--")):
+        return False
+    return code[-1] in _JS_REGEX_AFTER or bool(_JS_REGEX_KEYWORD.search(code))
+
+
+def minify_js(js: str) -> str:
+    """
+    With rjsmin installed it does the work. The fallback reads strings,
+    template literals (including their ${...} expressions), regex literals
+    and comments the way a parser would: comments are dropped, literals are
+    kept verbatim, and elsewhere only indentation, blank lines and repeated
+    spaces are removed. Line breaks stay, so automatic semicolon insertion
+    sees the same statements.
+    """
+    if rjsmin is not None:
+        return rjsmin.jsmin(js)
+    code: List[str] = []
+    literals: List[str] = []
+    i = 0
+    while i < len(js):
+        char = js[i]
+        end = None
+        if char in "\"'`":
+            end = _string_end(js, i)
+        elif js.startswith("//", i) or js.startswith("/*", i):
+            end = _comment_end(js, i)
+            # A comment that spans lines still separates statements
+            code.append("\n" if "\n" in js[i:end] else " ")
+            i = end
+            continue
+        elif char == "/" and _regex_allowed("".join(code[-16:])):
+            end = _regex_end(js, i)
+        if end is None:
+            code.append(char)
+            i += 1
+            continue
+        literals.append(js[i:end])
+        code.append(f"\x00{len(literals) - 1}\x00")
+        i = end
+    text = re.sub(r"[ \t\f\v]+", " ", "".join(code))
+    text = "\n".join(line.strip() for line in text.splitlines() if line.strip())
+    return re.sub(r"\x00(\d+)\x00", lambda match: literals[int(match.group(1))], text) + "\n"
+
+
+def minify_html(html: str) -> str:
+    html = re.sub(r"<!--(?!\[if).*?-->", "", html, flags=re.S)
+    return "\n".join(line.strip() for line in html.splitlines() if line.strip()) + "\n"
+
+
+# --- Discovery ---
+
+def _is_local(reference: str) -> bool:
+    return not re.match(r"^(?:[a-z]+:)?//|^data:", reference, re.I)
+
+
+def _local_path(frontend_dir: str, reference: str) -> str:
+    return os.path.normpath(os.path.join(frontend_dir, reference.split("?")[0].split("#")[0].lstrip("/")))
+
+
+def _read(path: str) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _digest(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def _css_with_imports(frontend_dir: str, reference: str, seen: List[str], missing: List[str]) -> str:
+    """Inline local @import rules so a stylesheet bundle is self-contained."""
+    path = _local_path(frontend_dir, reference)
+    if path in seen:
+        return ""
+    if not os.path.isfile(path):
+        missing.append(reference)
+        return ""
+    seen.append(path)
+    base = os.path.dirname(os.path.relpath(path, frontend_dir))
+
+    def inline(match: re.Match) -> str:
+        target = match.group(1)
+        if not _is_local(target):
+            return match.group(0)
+        return _css_with_imports(frontend_dir, os.path.join(base, target), seen, missing)
+
+    return _CSS_IMPORT.sub(inline, _read(path))
+
+
+def find_duplicates(frontend_dir: str) -> Dict[str, str]:
+    """Source files whose content is identical to an earlier file (by name)."""
+    first: Dict[str, str] = {}
+    duplicates = {}
+    for name in sorted(os.listdir(frontend_dir)):
+        path = os.path.join(frontend_dir, name)
+        if not os.path.isfile(path) or not name.endswith(SOURCE_EXTENSIONS):
+            continue
+        with open(path, "rb") as f:
+            digest = _digest(f.read().strip())
+        if digest in first:
+            duplicates[name] = first[digest]
+        else:
+            first[digest] = name
+    return duplicates
+
+
+# --- Build ---
+
+def _emit(assets_dir: str, stem: str, extension: str, content: str) -> str:
+    data = content.encode("utf-8")
+    name = f"{stem}.{_digest(data)[:10]}{extension}"
+    with open(os.path.join(assets_dir, name), "wb") as f:
+        f.write(data)
+    return f"/{ASSETS_DIR}/{name}"
+
+
+def _bundle_name(references: List[str]) -> str:
+    stem = os.path.splitext(os.path.basename(references[0]))[0] if len(references) == 1 else "bundle"
+    return re.sub(r"[^\w-]", "-", stem)
+
+
+def precompress(root: str) -> int:
+    """
+    Write .gz (and .br) siblings for every compressible file. Returns the
+    bytes a client accepting every encoding would download for all files.
+    """
+    total = 0
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            with open(path, "rb") as f:
+                data = f.read()
+            smallest = len(data)
+            if name.endswith(COMPRESS_EXTENSIONS) and len(data) >= COMPRESS_MIN_SIZE:
+                variants = [(".gz", gzip.compress(data, compresslevel=9, mtime=0))]
+                if brotli is not None:
+                    variants.append((".br", brotli.compress(data, quality=11)))
+                for suffix, compressed in variants:
+                    # Variants that do not save anything would only cost a disk read
+                    if len(compressed) < len(data):
+                        with open(path + suffix, "wb") as f:
+                            f.write(compressed)
+                        smallest = min(smallest, len(compressed))
+            total += smallest
+    return total
+
+
+def _join_scripts(frontend_dir: str, references: List[str], used: List[str], report: AssetReport) -> str:
+    parts = []
+    for reference in references:
+        path = _local_path(frontend_dir, reference)
+        if os.path.isfile(path):
+            used.append(os.path.relpath(path, frontend_dir))
+            # Separate files so a missing trailing semicolon cannot join statements
+            parts.append(_read(path).rstrip() + "\n;")
+        else:
+            report.missing.append(reference)
+    return "\n".join(parts)
+
+
+def build_page(frontend_dir: str, html_name: str, assets_dir: str, report: AssetReport) -> Tuple[str, List[str]]:
+    """Bundle one page's local stylesheets and scripts; returns the rewritten HTML and the files it uses."""
+    html = _read(os.path.join(frontend_dir, html_name))
+    used = [html_name]
+
+    styles = [m for m in _STYLESHEET.finditer(html) if _is_local(dict(_ATTR.findall(m.group(0))).get("href", "//"))]
+    scripts = [m for m in _SCRIPT.finditer(html)]
+    bundle_scripts = (all("src=" in m.group("attrs").lower() and not m.group("body").strip() for m in scripts)
+                      and not any(re.search(r"\b(async|defer|type=[\"']?module)", m.group("attrs"), re.I) for m in scripts)
+                      and all(_is_local(dict(_ATTR.findall(m.group("attrs"))).get("src", "//")) for m in scripts))
+    local_scripts = [m for m in scripts if bundle_scripts]
+
+    replacements: List[Tuple[int, int, str]] = []
+    if styles:
+        references = [dict(_ATTR.findall(m.group(0)))["href"] for m in styles]
+        seen: List[str] = []
+        css = "\n".join(_css_with_imports(frontend_dir, reference, seen, report.missing) for reference in references)
+        used += [os.path.relpath(path, frontend_dir) for path in seen]
+        href = _emit(assets_dir, _bundle_name(references), ".css", minify_css(css))
+        report.bundles[", ".join(references)] = href
+        replacements.append((styles[0].start(), styles[0].end(), f'<link rel="stylesheet" href="{href}">\n'))
+        replacements += [(m.start(), m.end(), "") for m in styles[1:]]
+    if local_scripts:
+        references = [dict(_ATTR.findall(m.group("attrs")))["src"] for m in local_scripts]
+        src = _emit(assets_dir, _bundle_name(references), ".js", minify_js(_join_scripts(frontend_dir, references, used, report)))
+        report.bundles[", ".join(references)] = src
+        # The bundle takes the place of the last script so every script still runs after the DOM it needs
+        replacements += [(m.start(), m.end(), "") for m in local_scripts[:-1]]
+        replacements.append((local_scripts[-1].start(), local_scripts[-1].end(), f'<script src="{src}"></script>\n'))
+    elif scripts:
+        # Inline, async or module scripts keep their order; local files are still minified and hashed
+        for m in scripts:
+            reference = dict(_ATTR.findall(m.group("attrs"))).get("src")
+            if not reference or not _is_local(reference):
+                continue
+            src = _emit(assets_dir, _bundle_name([reference]), ".js", minify_js(_join_scripts(frontend_dir, [reference], used, report)))
+            report.bundles[reference] = src
+            replacements.append((m.start(), m.end(), m.group(0).replace(reference, src, 1)))
+    for start, end, text in sorted(replacements, reverse=True):
+        html = html[:start] + text + html[end:]
+    return minify_html(html), used
+
+
+def build_assets(frontend_dir: str) -> Optional[AssetReport]:
+    """Rebuild frontend_dir/dist from the HTML pages in frontend_dir; None if there is no page."""
+    pages = sorted(name for name in os.listdir(frontend_dir) if name.endswith(".html"))
+    if not pages:
+        return None
+    dist = os.path.join(frontend_dir, DIST_DIR)
+    shutil.rmtree(dist, ignore_errors=True)
+    assets_dir = os.path.join(dist, ASSETS_DIR)
+    os.makedirs(assets_dir)
+
+    report = AssetReport(duplicates=find_duplicates(frontend_dir))
+    used = set()
+    for page in pages:
+        html, page_files = build_page(frontend_dir, page, assets_dir, report)
+        used.update(page_files)
+        with open(os.path.join(dist, page), "w", encoding="utf-8") as f:
+            f.write(html)
+    sources = [name for name in sorted(os.listdir(frontend_dir))
+               if os.path.isfile(os.path.join(frontend_dir, name)) and name.endswith(SOURCE_EXTENSIONS)]
+    report.dead = [name for name in sources if name not in used]
+    report.source_bytes = sum(os.path.getsize(os.path.join(frontend_dir, name)) for name in used)
+
+    with open(os.path.join(dist, "asset-manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(report.bundles, f, indent=2, sort_keys=True)
+    report.dist_bytes = sum(os.path.getsize(os.path.join(dirpath, name))
+                            for dirpath, _, names in os.walk(dist) for name in names)
+    report.compressed_bytes = precompress(dist)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bundle, hash and precompress a frontend into <frontend>/dist")
+    parser.add_argument("frontend_dir", nargs="?", default="frontend")
+    args = parser.parse_args()
+
+    report = build_assets(args.frontend_dir)
+    if report is None:
+        raise SystemExit(f"❌ No HTML page in {args.frontend_dir}")
+    print(f"✅ Frontend assets: {report.summary()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,29 @@
 const app = document.getElementById('app');
 
-async function fetchQuotes() {
+async function fetchQuoteOfTheDay() {
     try {
-        const response = await fetch('http://localhost:8000/quotes'); // Replace with your API endpoint
-        const quotes = await response.json();
-        displayQuotes(quotes);
+        // Served by the same app as the page. The API sends Cache-Control/ETag,
+        // so repeat visits on the same day are served from the browser cache or
+        // revalidated with a 304.
+        const response = await fetch('/quote/today');
+        const quote = await response.json();
+        displayQuote(quote);
     } catch (error) {
-        console.error('Error fetching quotes:', error);
+        console.error('Error fetching quote:', error);
     }
 }
 
-function displayQuotes(quotes) {
-    if (!quotes || quotes.length === 0) {
+function displayQuote(quote) {
+    if (!quote || !quote.text) {
         app.innerHTML = '<p>No quotes found.</p>';
         return;
     }
-    app.innerHTML = quotes.map(quote => `<div class='quote'>${quote}</div>`).join('');
+    const text = document.createElement('div');
+    text.className = 'quote';
+    text.textContent = quote.text;
+    const author = document.createElement('p');
+    author.textContent = quote.author ? `— ${quote.author}` : '';
+    app.replaceChildren(text, author);
 }
 
-fetchQuotes();
\ No newline at end of file
+fetchQuoteOfTheDay();
@@ -1,21 +1,206 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from datetime import date, datetime, time, timedelta, timezone
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse
 from supabase import create_client, Client
+import hashlib
+import json
+import mimetypes
 import os
 
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:  # brotli is optional; gzip covers every client
+    BrotliMiddleware = None
+
+# Supabase client, created per worker process in the lifespan hook so that
+# no connection pool is ever shared across a fork.
+supabase: Optional[Client] = None
+
+
+def get_supabase() -> Client:
+    global supabase
+    if supabase is None:
+        url = os.getenv("SUPABASE_URL")
+        key = os.getenv("SUPABASE_KEY")
+        supabase = create_client(url, key)
+    return supabase
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Runs once in every worker after it has been spawned.
+    get_supabase()
+    yield
+    # Graceful shutdown: drop the client so its connections are released
+    # before the worker exits.
+    global supabase
+    supabase = None
+
+
 # Initialize FastAPI
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+
+# Compress larger payloads only; a single quote is below the threshold and
+# is cheaper to send as-is.
+if BrotliMiddleware is not None:
+    app.add_middleware(BrotliMiddleware, minimum_size=1000, gzip_fallback=True)
+else:
+    app.add_middleware(GZipMiddleware, minimum_size=1000)
 
-# Initialize Supabase client
-url = os.getenv("SUPABASE_URL")
-key = os.getenv("SUPABASE_KEY")
-supabase: Client = create_client(url, key)
+# Quote of the day per UTC date: (serialized body, strong ETag). Each worker
+# hits the database at most once per day.
+_daily_cache: Dict[date, Tuple[bytes, str]] = {}
 
+
+# Endpoints that query Supabase are plain functions: its client blocks, so
+# FastAPI runs them in its threadpool instead of on the event loop.
 @app.get("/quote/random")
-async def get_random_quote():
-    response = supabase.table("quotes").select("*").order("random()").limit(1).execute()
+def get_random_quote():
+    response = get_supabase().table("quotes").select("*").order("random()").limit(1).execute()
     quote = response.data[0] if response.data else {"message": "No quotes found."}
     return quote
 
+
+def quote_index(day: date, count: int) -> int:
+    """Deterministic position of the quote for a given day."""
+    digest = hashlib.sha256(day.isoformat().encode()).digest()
+    return int.from_bytes(digest[:8], "big") % count
+
+
+def load_quote_of_the_day(day: date) -> Optional[Tuple[bytes, str]]:
+    """The day's quote as (body, ETag), or None when there is none to serve."""
+    cached = _daily_cache.get(day)
+    if cached is not None:
+        return cached
+    client = get_supabase()
+    count = client.table("quotes").select("id", count="exact").limit(1).execute().count or 0
+    if not count:
+        return None
+    offset = quote_index(day, count)
+    response = client.table("quotes").select("*").order("id").range(offset, offset).execute()
+    if not response.data:
+        return None
+    body = json.dumps({**response.data[0], "date": day.isoformat()}, separators=(",", ":")).encode()
+    etag = '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+    # Only the current day is ever requested again.
+    _daily_cache.clear()
+    _daily_cache[day] = (body, etag)
+    return body, etag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # If-None-Match uses weak comparison.
+    return "*" in candidates or etag in [tag[2:] if tag.startswith("W/") else tag for tag in candidates]
+
+
+@app.get("/quote/today")
+def get_quote_of_the_day(request: Request):
+    now = datetime.now(timezone.utc)
+    loaded = load_quote_of_the_day(now.date())
+    if loaded is None:
+        # Not cached anywhere, so the quote shows up as soon as there is one.
+        body = json.dumps({"message": "No quotes found.", "date": now.date().isoformat()}, separators=(",", ":"))
+        return Response(content=body, media_type="application/json", headers={"Cache-Control": "no-store"})
+    body, etag = loaded
+    midnight = datetime.combine(now.date() + timedelta(days=1), time.min, tzinfo=timezone.utc)
+    ttl = max(1, int((midnight - now).total_seconds()))
+    headers = {
+        "ETag": etag,
+        # Browsers and CDNs may keep the quote until the day rolls over.
+        "Cache-Control": f"public, max-age={ttl}, s-maxage={ttl}, stale-while-revalidate=60",
+        "Expires": midnight.strftime("%a, %d %b %Y %H:%M:%S GMT"),
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+# Frontend bundle built by the asset pipeline: index.html plus content-hashed
+# files in assets/, each with precompressed .br/.gz siblings.
+STATIC_DIR = Path(os.getenv("STATIC_DIR", Path(__file__).resolve().parent.parent / "frontend" / "dist"))
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def accepted_encodings(accept_encoding: Optional[str]) -> set:
+    encodings = set()
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        if name and params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            encodings.add(name.strip().lower())
+    return encodings
+
+
+def static_response(path: Path, request: Request, cache_control: str) -> Response:
+    """Serve path, or its precompressed variant when the client accepts it."""
+    media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    headers = {"Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    accepted = accepted_encodings(request.headers.get("accept-encoding"))
+    for encoding, suffix in PRECOMPRESSED:
+        variant = path.with_name(path.name + suffix)
+        if encoding in accepted and variant.is_file():
+            # Setting Content-Encoding keeps the compression middleware away.
+            return FileResponse(variant, media_type=media_type, headers={**headers, "Content-Encoding": encoding})
+    return FileResponse(path, media_type=media_type, headers=headers)
+
+
+@app.get("/assets/{name}")
+async def get_asset(name: str, request: Request):
+    path = STATIC_DIR / "assets" / name
+    if name.startswith(".") or name.endswith((".br", ".gz")) or not path.is_file():
+        raise HTTPException(status_code=404)
+    # File names carry a content hash, so a cached copy never goes stale.
+    return static_response(path, request, IMMUTABLE)
+
+
+@app.get("/")
+async def get_index(request: Request):
+    path = STATIC_DIR / "index.html"
+    if not path.is_file():
+        raise HTTPException(status_code=404)
+    # The page is small and names the current asset hashes; always revalidate.
+    return static_response(path, request, "no-cache")
+
+
+def worker_count() -> int:
+    """Number of worker processes: WEB_CONCURRENCY, else one per usable core."""
+    configured = os.getenv("WEB_CONCURRENCY")
+    if configured:
+        return max(1, int(configured))
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+    return max(1, cores)
+
+
+def server_options() -> dict:
+    """uvicorn settings for the production profile."""
+    return {
+        "host": os.getenv("HOST", "0.0.0.0"),
+        "port": int(os.getenv("PORT", "8000")),
+        "workers": worker_count(),
+        # Use the C event loop and HTTP parser when they are installed.
+        "loop": "uvloop" if find_spec("uvloop") else "asyncio",
+        "http": "httptools" if find_spec("httptools") else "h11",
+        # Keep idle connections open a little longer than a typical load
+        # balancer (60s) would, so the proxy always closes first.
+        "timeout_keep_alive": int(os.getenv("KEEP_ALIVE_TIMEOUT", "75")),
+        "timeout_graceful_shutdown": int(os.getenv("GRACEFUL_SHUTDOWN_TIMEOUT", "30")),
+        "proxy_headers": True,
+        "forwarded_allow_ips": os.getenv("FORWARDED_ALLOW_IPS", "*"),
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # An import string is required for uvicorn to spawn multiple workers.
+    uvicorn.run("src.main:app", **server_options())
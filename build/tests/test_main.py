@@ -1,16 +1,26 @@
 import pytest
+from datetime import date
 from fastapi.testclient import TestClient
-from unittest.mock import patch
-from src.main import app
+from unittest.mock import MagicMock, patch
+import src.main
+from src.main import app, quote_index, server_options, worker_count
 
 @pytest.fixture
 def client():
+    src.main._daily_cache.clear()
     return TestClient(app)
 
+def mock_quotes(mock_supabase, quotes):
+    table = mock_supabase.table.return_value
+    table.select.return_value.limit.return_value.execute.return_value = MagicMock(count=len(quotes))
+    table.select.return_value.order.return_value.range.side_effect = (
+        lambda start, end: MagicMock(execute=MagicMock(return_value=MagicMock(data=quotes[start:end + 1])))
+    )
+
 @patch('src.main.supabase')
 def test_get_random_quote(mock_supabase, client):
     # Mock the Supabase client's behavior
-    mock_supabase.table.return_value.select.return_value.order.return_value.limit.return_value.execute.return_value = {'data': [{'quote': 'This is a test quote'}]}
+    mock_supabase.table.return_value.select.return_value.order.return_value.limit.return_value.execute.return_value = MagicMock(data=[{'quote': 'This is a test quote'}])
     
     response = client.get('/quote/random')
     assert response.status_code == 200
@@ -19,8 +29,104 @@ def test_get_random_quote(mock_supabase, client):
 @patch('src.main.supabase')
 def test_get_random_quote_no_data(mock_supabase, client):
     # Mock the Supabase client to return no data
-    mock_supabase.table.return_value.select.return_value.order.return_value.limit.return_value.execute.return_value = {'data': []}
+    mock_supabase.table.return_value.select.return_value.order.return_value.limit.return_value.execute.return_value = MagicMock(data=[])
     
     response = client.get('/quote/random')
     assert response.status_code == 200
-    assert response.json() == {'message': 'No quotes found.'}
\ No newline at end of file
+    assert response.json() == {'message': 'No quotes found.'}
+
+def test_worker_count_from_env(monkeypatch):
+    monkeypatch.setenv('WEB_CONCURRENCY', '3')
+    assert worker_count() == 3
+
+def test_worker_count_defaults_to_cores(monkeypatch):
+    monkeypatch.delenv('WEB_CONCURRENCY', raising=False)
+    assert worker_count() >= 1
+
+def test_server_options(monkeypatch):
+    monkeypatch.setenv('PORT', '9000')
+    monkeypatch.setenv('WEB_CONCURRENCY', '2')
+    options = server_options()
+    assert options['port'] == 9000
+    assert options['workers'] == 2
+    assert options['loop'] in ('uvloop', 'asyncio')
+    assert options['http'] in ('httptools', 'h11')
+
+def test_quote_index_is_deterministic():
+    day = date(2024, 1, 1)
+    assert quote_index(day, 7) == quote_index(day, 7)
+    assert 0 <= quote_index(day, 7) < 7
+
+@patch('src.main.supabase')
+def test_quote_of_the_day_is_cacheable(mock_supabase, client):
+    mock_quotes(mock_supabase, [{'id': i, 'text': f'Quote {i}', 'author': 'A'} for i in range(5)])
+
+    response = client.get('/quote/today')
+    assert response.status_code == 200
+    assert response.headers['etag'].startswith('"')
+    assert 'public' in response.headers['cache-control']
+    assert 'max-age=' in response.headers['cache-control']
+
+    again = client.get('/quote/today')
+    assert again.json() == response.json()
+    # The database is only queried once per day and worker
+    assert mock_supabase.table.return_value.select.return_value.limit.return_value.execute.call_count == 1
+
+@patch('src.main.supabase')
+def test_quote_of_the_day_not_modified(mock_supabase, client):
+    mock_quotes(mock_supabase, [{'id': 1, 'text': 'Only quote', 'author': 'A'}])
+
+    etag = client.get('/quote/today').headers['etag']
+    response = client.get('/quote/today', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.content == b''
+    assert response.headers['etag'] == etag
+
+@patch('src.main.supabase')
+def test_quote_of_the_day_no_data(mock_supabase, client):
+    mock_quotes(mock_supabase, [])
+
+    response = client.get('/quote/today')
+    assert response.status_code == 200
+    assert response.json()['message'] == 'No quotes found.'
+    assert response.headers['cache-control'] == 'no-store'
+    assert 'etag' not in response.headers
+
+    # The fallback is not cached, so the first quote added is served right away
+    mock_quotes(mock_supabase, [{'id': 1, 'text': 'New quote', 'author': 'A'}])
+    assert client.get('/quote/today').json()['text'] == 'New quote'
+
+@pytest.fixture
+def static_dir(tmp_path, monkeypatch):
+    assets = tmp_path / 'assets'
+    assets.mkdir()
+    (tmp_path / 'index.html').write_text('<script src="/assets/index.abc123.js"></script>')
+    (assets / 'index.abc123.js').write_text('console.log(1);')
+    (assets / 'index.abc123.js.gz').write_bytes(b'gzip-bytes')
+    monkeypatch.setattr(src.main, 'STATIC_DIR', tmp_path)
+    return tmp_path
+
+def test_index_is_revalidated(static_dir, client):
+    response = client.get('/', headers={'Accept-Encoding': 'identity'})
+    assert response.status_code == 200
+    assert response.headers['cache-control'] == 'no-cache'
+    assert 'index.abc123.js' in response.text
+
+def test_hashed_asset_is_immutable(static_dir, client):
+    response = client.get('/assets/index.abc123.js', headers={'Accept-Encoding': 'identity'})
+    assert response.status_code == 200
+    assert 'immutable' in response.headers['cache-control']
+    assert response.headers['content-type'].startswith(('application/javascript', 'text/javascript'))
+    assert response.text == 'console.log(1);'
+
+def test_precompressed_asset_is_served(static_dir):
+    # Read the raw body: the test client would otherwise try to decode it
+    with TestClient(app).stream('GET', '/assets/index.abc123.js', headers={'Accept-Encoding': 'br, gzip'}) as response:
+        body = b''.join(response.iter_raw())
+    assert response.headers['content-encoding'] == 'gzip'
+    assert response.headers['vary'] == 'Accept-Encoding'
+    assert body == b'gzip-bytes'
+
+def test_missing_asset(static_dir, client):
+    assert client.get('/assets/missing.js').status_code == 404
+    assert client.get('/assets/index.abc123.js.gz').status_code == 404
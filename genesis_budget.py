@@ -0,0 +1,280 @@
+"""
+Run Budgets for Genesis Crew
+Gives every run an optional wall-clock deadline and token and dollar
+budgets, tracked in ProjectState. The fraction left decides the run's mode:
+in "economy" mode agents fall back to a cheaper model with fewer loop
+iterations and no best-of-N, repairs stop and optional stages are skipped;
+once a budget is "exhausted" no further LLM stage starts and the run
+finishes with the artifacts produced so far.
+"""
+
+import contextvars
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+ECONOMY_AT = float(os.getenv("GENESIS_BUDGET_ECONOMY_AT", "0.3"))
+ECONOMY_MODEL = os.getenv("GENESIS_ECONOMY_MODEL", "gpt-4o-mini")
+ECONOMY_MAX_ITER = int(os.getenv("GENESIS_ECONOMY_MAX_ITER", "8"))
+
+# Stages the run can ship without, and the LLM stages an exhausted run stops starting.
+# The asset pipeline is cheap and always runs, so a written frontend is never left unbundled.
+OPTIONAL_STAGES = ("FrontendSpecialist",)
+LLM_STAGES = ("ProductManager", "Architect", "BackendDeveloper", "FrontendSpecialist", "QAEngineer")
+
+# USD per million (prompt, completion) tokens; unknown models are priced like gpt-4o
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "o3-mini": (1.10, 4.40),
+}
+DEFAULT_PRICE = MODEL_PRICES["gpt-4o"]
+
+
+def price_for(model: str) -> Tuple[float, float]:
+    name = model.split("/")[-1]
+    # Longest prefix first, so "gpt-4o-mini-2024-07-18" is not priced as gpt-4o
+    for known in sorted(MODEL_PRICES, key=len, reverse=True):
+        if name.startswith(known):
+            return MODEL_PRICES[known]
+    return DEFAULT_PRICE
+
+
+# --- Usage metering ---
+
+@dataclass
+class Usage:
+    tokens: int = 0
+    cost: float = 0.0
+    run_id: Optional[str] = None
+    closed: bool = False
+    """Set once the node has reported its totals; later usage is charged late to run_id."""
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add(self, model: str, prompt_tokens: int, completion_tokens: int) -> None:
+        prompt_price, completion_price = price_for(model)
+        tokens = prompt_tokens + completion_tokens
+        cost = (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+        with self._lock:
+            if not self.closed:
+                self.tokens += tokens
+                self.cost += cost
+                return
+        # Work that outlived its node, e.g. a best-of-N candidate that was stopped
+        charge_late(self.run_id or "default", tokens, cost)
+
+    def close(self) -> Tuple[int, float]:
+        with self._lock:
+            self.closed = True
+            return self.tokens, self.cost
+
+
+_usage: contextvars.ContextVar[Optional[Usage]] = contextvars.ContextVar("genesis_usage", default=None)
+
+
+def record_usage(model: str, token_usage: Any) -> None:
+    """Charge a crew's token usage (CrewOutput.token_usage) to the current node."""
+    usage = _usage.get()
+    if usage is None or token_usage is None:
+        return
+    usage.add(model, getattr(token_usage, "prompt_tokens", 0) or 0, getattr(token_usage, "completion_tokens", 0) or 0)
+
+
+@contextmanager
+def track_usage(run_id: Optional[str] = None) -> Iterator[Usage]:
+    # Best-of-N threads run in a copy of this context and share the Usage object
+    usage = Usage(run_id=run_id)
+    token = _usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _usage.reset(token)
+
+
+def metered(node: Callable[[dict], dict]) -> Callable[[dict], dict]:
+    """Wrap a graph node so the tokens and dollars it spends are added to the state."""
+
+    @functools.wraps(node)
+    def run(state: dict) -> dict:
+        with track_usage(state.get("run_id", "default")) as usage:
+            new_state = node(state)
+        tokens, cost = usage.close()
+        # Start from the node's returned totals, which may already include work it adopted
+        return {**new_state, "tokens_used": new_state.get("tokens_used", 0) + tokens,
+                "cost_used": new_state.get("cost_used", 0.0) + cost}
+
+    return run
+
+
+# Usage of work that outlived its node (a stopped candidate or draft winding down), by run;
+# settled into the state by the Orchestrator's next step
+_late: Dict[str, Usage] = {}
+_late_lock = threading.Lock()
+
+
+def charge_late(run_id: str, tokens: int, cost: float) -> None:
+    with _late_lock:
+        usage = _late.setdefault(run_id, Usage(run_id=run_id))
+    with usage._lock:
+        usage.tokens += tokens
+        usage.cost += cost
+
+
+def settle_late_usage(state: dict) -> dict:
+    """The state with late usage charged to it."""
+    with _late_lock:
+        usage = _late.pop(state.get("run_id", "default"), None)
+    if usage is None or not (usage.tokens or usage.cost):
+        return state
+    print(f"💸 Charging {usage.tokens} tokens (${usage.cost:.4f}) of stopped or discarded work")
+    return {**state, "tokens_used": state.get("tokens_used", 0) + usage.tokens,
+            "cost_used": state.get("cost_used", 0.0) + usage.cost}
+
+
+# --- Budget state ---
+
+def _env_float(key: str) -> Optional[float]:
+    value = os.getenv(key)
+    return float(value) if value else None
+
+
+def new_budget(deadline_seconds: Optional[float] = None, token_budget: Optional[int] = None,
+               cost_budget: Optional[float] = None) -> Dict[str, Any]:
+    """Budget fields of a fresh ProjectState; unset limits come from GENESIS_DEADLINE / _TOKEN_BUDGET / _COST_BUDGET."""
+    now = time.time()
+    deadline_seconds = deadline_seconds if deadline_seconds is not None else _env_float("GENESIS_DEADLINE")
+    token_budget = token_budget if token_budget is not None else _env_float("GENESIS_TOKEN_BUDGET")
+    return {
+        "started_at": now,
+        "deadline": now + deadline_seconds if deadline_seconds else None,
+        "token_budget": int(token_budget) if token_budget else None,
+        "cost_budget": cost_budget if cost_budget is not None else _env_float("GENESIS_COST_BUDGET"),
+        "tokens_used": 0,
+        "cost_used": 0.0,
+        "budget_level": "normal",
+        "skipped_stages": [],
+    }
+
+
+def remaining_fraction(state: dict) -> float:
+    """Smallest share left of any budget the run has (1.0 without budgets)."""
+    left = [1.0]
+    if state.get("deadline"):
+        total = state["deadline"] - state.get("started_at", state["deadline"])
+        left.append((state["deadline"] - time.time()) / total if total > 0 else 0.0)
+    if state.get("token_budget"):
+        left.append(1 - state.get("tokens_used", 0) / state["token_budget"])
+    if state.get("cost_budget"):
+        left.append(1 - state.get("cost_used", 0.0) / state["cost_budget"])
+    return min(left)
+
+
+def budget_level(state: dict) -> str:
+    left = remaining_fraction(state)
+    if left <= 0:
+        return "exhausted"
+    return "economy" if left <= ECONOMY_AT else "normal"
+
+
+def skipped_by(level: str) -> Tuple[str, ...]:
+    """Stages a run in this mode does not start."""
+    if level == "exhausted":
+        return OPTIONAL_STAGES + LLM_STAGES
+    return OPTIONAL_STAGES if level == "economy" else ()
+
+
+def seconds_left(state: dict) -> Optional[float]:
+    return state["deadline"] - time.time() if state.get("deadline") else None
+
+
+# --- Cancellation ---
+
+class Cancelled(TimeoutError):
+    """Work nobody waits for any more; a TimeoutError, which crewAI raises without retrying the task."""
+
+
+_cancel_events: contextvars.ContextVar[Tuple[threading.Event, ...]] = contextvars.ContextVar(
+    "genesis_cancel_events", default=())
+
+
+@contextmanager
+def cancel_scope(event: threading.Event) -> Iterator[threading.Event]:
+    """Work started inside (including threads given a copy of this context) stops once event is set."""
+    token = _cancel_events.set(_cancel_events.get() + (event,))
+    try:
+        yield event
+    finally:
+        _cancel_events.reset(token)
+
+
+def cancelled() -> bool:
+    return any(event.is_set() for event in _cancel_events.get())
+
+
+def check_cancelled(*_: Any) -> None:
+    """Agent step_callback: stops the agent at its next step once its work was cancelled."""
+    if cancelled():
+        raise Cancelled("Cancelled: the result of this task is no longer needed")
+
+
+def run_with_deadline(work: Callable[[], Any], state: dict) -> Any:
+    """
+    Run work within the run's deadline. With a deadline it runs in a thread
+    with a copy of this context, so the workspace, scheduler, usage and
+    profiling scopes still apply; when the deadline passes, Cancelled is
+    raised here and the work stops at its next agent step.
+    """
+    left = seconds_left(state)
+    if left is None:
+        return work()
+    with cancel_scope(threading.Event()) as stop:
+        context = contextvars.copy_context()
+    pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="genesis-deadline")
+    future = pool.submit(context.run, work)
+    pool.shutdown(wait=False)
+    done, _ = wait([future], timeout=max(1.0, left))
+    if not done:
+        stop.set()
+        raise Cancelled(f"Run deadline reached after {time.time() - state['started_at']:.0f}s")
+    return future.result()
+
+
+# --- Degradation ---
+
+def budget_agent(agent: Any, state: dict) -> Any:
+    """
+    The agent to run a task with under the run's budget: unchanged in normal
+    mode, otherwise a copy on ECONOMY_MODEL with at most ECONOMY_MAX_ITER
+    iterations. Deadlines are enforced by run_with_deadline, not by crewAI's
+    max_execution_time, whose thread would lose this context.
+    """
+    if budget_level(state) == "normal":
+        return agent
+    agent = agent.copy()
+    if getattr(agent.llm, "model", None) != ECONOMY_MODEL:
+        from crewai import LLM
+
+        agent.llm = LLM(model=ECONOMY_MODEL)
+    agent.max_iter = min(agent.max_iter, ECONOMY_MAX_ITER)
+    return agent
+
+
+def print_budget(state: dict) -> None:
+    print("\n💸 Budget:")
+    print(f"   - Tokens: {state.get('tokens_used', 0)}"
+          + (f" of {state['token_budget']}" if state.get("token_budget") else ""))
+    print(f"   - Cost: ${state.get('cost_used', 0.0):.4f}"
+          + (f" of ${state['cost_budget']:.2f}" if state.get("cost_budget") else ""))
+    if state.get("deadline"):
+        print(f"   - Time: {time.time() - state['started_at']:.0f}s of {state['deadline'] - state['started_at']:.0f}s")
+    print(f"   - Mode: {state.get('budget_level', 'normal')}")
+    if state.get("skipped_stages"):
+        print(f"   - Skipped: {', '.join(state['skipped_stages'])}")
@@ -1,7 +1,9 @@
+import asyncio
+from pathlib import Path
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 from crewai.agents.agent_builder.base_agent import BaseAgent
-from typing import List
+from typing import Any, Dict, List, Optional
 # If you want to run a snippet of code before or after the crew starts,
 # you can use the @before_kickoff and @after_kickoff decorators
 # https://docs.crewai.com/concepts/crews#example-crew-class-with-decorators
@@ -62,3 +64,74 @@ class Genesis():
             verbose=True,
             # process=Process.hierarchical, # In case you wanna use that instead https://docs.crewai.com/how-to/Hierarchical/
         )
+
+    def research_crew(self) -> Crew:
+        """Researches a single topic (map step)"""
+        return Crew(
+            agents=[self.researcher()],
+            tasks=[self.research_task()],
+            process=Process.sequential,
+            verbose=True,
+        )
+
+    def synthesis_crew(self, research: str, topic: str, output_file: str = 'report.md') -> Crew:
+        """Writes one report from the research of every topic (reduce step)"""
+        config = self.tasks_config['reporting_task'] # type: ignore[index]
+        analyst = self.reporting_analyst()
+        analyst.interpolate_inputs({'topic': topic})
+        report_task = Task(
+            config=config,
+            # Kicked off without inputs, so braces in the research are never interpolated
+            description=f"{config['description']}\nResearch per topic:\n\n{research}",
+            output_file=output_file,
+        )
+        return Crew(
+            agents=[analyst],
+            tasks=[report_task],
+            process=Process.sequential,
+            verbose=True,
+        )
+
+    async def map_reduce(
+        self,
+        topics: List[str],
+        inputs: Optional[Dict[str, Any]] = None,
+        max_concurrency: int = 3,
+        output_file: str = 'report.md',
+    ) -> str:
+        """
+        Fans research_task out over the topics, at most max_concurrency at a
+        time, then runs a single reporting_task over all of the research, so
+        reporting costs one call however many topics there are. While the
+        research runs, output_file holds the notes of every finished topic;
+        the report replaces them at the end. Returns the report.
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        template = self.research_crew()
+        research: Dict[int, str] = {}
+        failed: List[str] = []
+
+        def notes() -> str:
+            return "\n\n".join(f"## {topic}\n\n{research[index].strip()}"
+                               for index, topic in enumerate(topics) if index in research)
+
+        def write_draft() -> None:
+            header = f"# Research in progress: {len(research)}/{len(topics)} topics done"
+            Path(output_file).write_text(f"{header}\n\n{notes()}\n", encoding='utf-8')
+
+        async def research_topic(index: int, topic: str) -> None:
+            async with semaphore:
+                try:
+                    # Each topic gets its own copy so agents never share executor state
+                    result = await template.copy().kickoff_async(inputs={**(inputs or {}), 'topic': topic})
+                    research[index] = result.raw
+                except Exception as e:
+                    failed.append(topic)
+                    research[index] = f"_Research for this topic failed: {e}_"
+            write_draft()
+
+        await asyncio.gather(*(research_topic(index, topic) for index, topic in enumerate(topics)))
+        if len(failed) == len(topics):
+            raise RuntimeError(f"Research failed for every topic: {', '.join(failed)}")
+        result = await self.synthesis_crew(notes(), ', '.join(topics), output_file).kickoff_async()
+        return result.raw
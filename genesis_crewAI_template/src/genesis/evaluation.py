@@ -0,0 +1,213 @@
+"""
+Parallel train/test/replay helpers for the Genesis crew.
+
+The agents/tasks YAML is parsed once in the parent process and handed to
+every worker, each worker builds the crew once and copies it per iteration,
+and all workers share an on-disk LLM response cache.
+"""
+import copy
+import os
+import statistics
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from crewai import Crew
+from crewai.utilities.llm_utils import create_llm
+from crewai.utilities.evaluators.crew_evaluator_handler import CrewEvaluator
+from crewai.events.event_bus import crewai_event_bus
+from crewai.events.types.crew_events import CrewKickoffCompletedEvent, CrewKickoffStartedEvent
+
+from genesis.crew import Genesis
+
+CONFIG_DIR = Path(__file__).parent / "config"
+LLM_CACHE_DIR = os.getenv("GENESIS_LLM_CACHE_DIR", ".cache/llm")
+
+# Parsed YAML keyed by resolved file path
+_shared_config: Dict[str, Any] = {}
+
+
+def load_shared_config() -> Dict[str, Any]:
+    """Parse agents.yaml and tasks.yaml once per process."""
+    if not _shared_config:
+        for name in ("agents.yaml", "tasks.yaml"):
+            path = (CONFIG_DIR / name).resolve()
+            _shared_config[str(path)] = Genesis.load_yaml(path)
+    return _shared_config
+
+
+class SharedConfigGenesis(Genesis):
+    """Genesis crew that reads its YAML from the shared, already parsed config."""
+
+    @staticmethod
+    def load_yaml(config_path: Path):
+        key = str(Path(config_path).resolve())
+        if key not in _shared_config:
+            _shared_config[key] = Genesis.load_yaml(config_path)
+        # Crew construction mutates the config, so hand out a private copy
+        return copy.deepcopy(_shared_config[key])
+
+
+def enable_llm_cache(cache_dir: str) -> None:
+    """Route every litellm call through an on-disk cache shared by all workers."""
+    import litellm
+    from litellm.caching.caching import Cache
+
+    try:
+        litellm.cache = Cache(type="disk", disk_cache_dir=cache_dir)
+    except ModuleNotFoundError as e:  # disk caching needs diskcache
+        print(f"LLM cache disabled: {e}")
+
+
+def set_cache_namespace(iteration: int) -> None:
+    """
+    Key cached responses by iteration too: iterations of one run stay
+    independent samples, while re-running an evaluation after a prompt change
+    reuses every call whose prompt did not change.
+    """
+    import litellm
+
+    if litellm.cache is not None:
+        litellm.cache.namespace = f"iteration-{iteration}"
+
+
+def worker_count(n_iterations: int) -> int:
+    configured = os.getenv("GENESIS_WORKERS")
+    if configured:
+        return max(1, int(configured))
+    return max(1, min(n_iterations, os.cpu_count() or 1))
+
+
+def cache_dir() -> Optional[str]:
+    if os.getenv("GENESIS_LLM_CACHE", "1").lower() in ("0", "false", "no"):
+        return None
+    return LLM_CACHE_DIR
+
+
+@dataclass
+class IterationResult:
+    iteration: int
+    duration: float
+    task_scores: List[float] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def crew_score(self) -> Optional[float]:
+        return statistics.mean(self.task_scores) if self.task_scores else None
+
+
+def _init_worker(config: Dict[str, Any], llm_cache_dir: Optional[str]) -> None:
+    _shared_config.update(config)
+    if llm_cache_dir:
+        enable_llm_cache(llm_cache_dir)
+
+
+@lru_cache(maxsize=1)
+def _base_crew() -> Crew:
+    return SharedConfigGenesis().crew()
+
+
+def _test_iteration(iteration: int, inputs: Dict[str, Any], eval_llm: str) -> IterationResult:
+    set_cache_namespace(iteration)
+    start = time.perf_counter()
+    try:
+        crew = _base_crew().copy()
+        evaluator = CrewEvaluator(crew, create_llm(eval_llm))
+        # CrewEvaluator keeps its scores in a class-level dict; give this iteration its own
+        evaluator.tasks_scores = defaultdict(list)
+        evaluator.set_iteration(iteration)
+        crew.kickoff(inputs=inputs)
+        scores = list(evaluator.tasks_scores[iteration])
+        return IterationResult(iteration, time.perf_counter() - start, scores)
+    except Exception as e:
+        return IterationResult(iteration, time.perf_counter() - start, error=str(e))
+
+
+def run_test_iterations(n_iterations: int, eval_llm: str, inputs: Dict[str, Any],
+                        workers: Optional[int] = None) -> List[IterationResult]:
+    """Run n evaluated iterations across a process pool."""
+    workers = workers or worker_count(n_iterations)
+    print(f"Testing {n_iterations} iterations on {workers} workers")
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(load_shared_config(), cache_dir())) as pool:
+        futures = [pool.submit(_test_iteration, i, inputs, eval_llm) for i in range(1, n_iterations + 1)]
+        for future in as_completed(futures):
+            result = future.result()
+            status = f"score {result.crew_score:.2f}" if result.crew_score is not None else (result.error or "no score")
+            print(f"  Iteration {result.iteration}: {result.duration:.1f}s, {status}")
+            results.append(result)
+    return sorted(results, key=lambda r: r.iteration)
+
+
+# Iterations of the training run in progress, timed from crew kickoff events
+_training: Optional[List[IterationResult]] = None
+_kickoff_started: Dict[str, float] = {}
+
+
+@lru_cache(maxsize=1)
+def _listen_for_kickoffs() -> None:
+    """
+    Register the kickoff timers once. They stay registered and only record
+    while a training run is in progress: scoped_handlers() would also drop
+    crewAI's own console listener for the whole run.
+    """
+    @crewai_event_bus.on(CrewKickoffStartedEvent)
+    def on_started(source, event):
+        if _training is not None:
+            _kickoff_started["at"] = time.perf_counter()
+            set_cache_namespace(len(_training) + 1)
+
+    @crewai_event_bus.on(CrewKickoffCompletedEvent)
+    def on_completed(source, event):
+        if _training is not None:
+            duration = time.perf_counter() - _kickoff_started.pop("at", time.perf_counter())
+            _training.append(IterationResult(len(_training) + 1, duration))
+            print(f"  Iteration {len(_training)}: {duration:.1f}s")
+
+
+def run_train_iterations(n_iterations: int, filename: str, inputs: Dict[str, Any]) -> List[IterationResult]:
+    """
+    Train the crew. Training asks for human feedback inside every iteration,
+    so iterations stay sequential; they still share the parsed config and the
+    LLM cache, and each kickoff is timed.
+    """
+    global _training
+    _init_worker(load_shared_config(), cache_dir())
+    _listen_for_kickoffs()
+    _training = results = []
+    try:
+        _base_crew().train(n_iterations=n_iterations, filename=filename, inputs=inputs)
+    finally:
+        _training = None
+    return results
+
+
+def run_replay(task_id: str) -> IterationResult:
+    _init_worker(load_shared_config(), cache_dir())
+    start = time.perf_counter()
+    _base_crew().replay(task_id=task_id)
+    return IterationResult(1, time.perf_counter() - start)
+
+
+def print_summary(results: List[IterationResult]) -> None:
+    """Print timing and score aggregates over all iterations."""
+    if not results:
+        return
+    durations = [r.duration for r in results]
+    print("\nIteration summary")
+    print(f"  Iterations: {len(results)} ({sum(1 for r in results if r.error)} failed)")
+    print(f"  Time (s):   mean {statistics.mean(durations):.1f}, min {min(durations):.1f}, "
+          f"max {max(durations):.1f}, total {sum(durations):.1f}")
+    scores = [r.crew_score for r in results if r.crew_score is not None]
+    if scores:
+        spread = statistics.stdev(scores) if len(scores) > 1 else 0.0
+        print(f"  Crew score: mean {statistics.mean(scores):.2f}, min {min(scores):.2f}, "
+              f"max {max(scores):.2f}, stdev {spread:.2f}")
+        per_task = [r.task_scores for r in results if r.task_scores]
+        for index, task_scores in enumerate(zip(*per_task), start=1):
+            print(f"  Task {index}:     mean {statistics.mean(task_scores):.2f}")
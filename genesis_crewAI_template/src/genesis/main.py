@@ -1,10 +1,13 @@
 #!/usr/bin/env python
+import asyncio
+import os
 import sys
 import warnings
 
 from datetime import datetime
 
 from genesis.crew import Genesis
+from genesis.evaluation import print_summary, run_replay, run_test_iterations, run_train_iterations
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
@@ -28,6 +31,30 @@ def run():
         raise Exception(f"An error occurred while running the crew: {e}")
 
 
+def run_topics():
+    """
+    Run the crew over several topics at once (map-reduce) into a single report.md.
+    Topics come from the command line; GENESIS_MAX_CONCURRENCY caps parallel research.
+    """
+    topics = sys.argv[1:] or [
+        'AI LLMs',
+        'AI agents',
+        'Retrieval-augmented generation',
+    ]
+    inputs = {
+        'current_year': str(datetime.now().year)
+    }
+
+    try:
+        asyncio.run(Genesis().map_reduce(
+            topics,
+            inputs=inputs,
+            max_concurrency=int(os.getenv('GENESIS_MAX_CONCURRENCY', '3')),
+        ))
+    except Exception as e:
+        raise Exception(f"An error occurred while running the crew: {e}")
+
+
 def train():
     """
     Train the crew for a given number of iterations.
@@ -37,7 +64,7 @@ def train():
         'current_year': str(datetime.now().year)
     }
     try:
-        Genesis().crew().train(n_iterations=int(sys.argv[1]), filename=sys.argv[2], inputs=inputs)
+        print_summary(run_train_iterations(n_iterations=int(sys.argv[1]), filename=sys.argv[2], inputs=inputs))
 
     except Exception as e:
         raise Exception(f"An error occurred while training the crew: {e}")
@@ -47,7 +74,7 @@ def replay():
     Replay the crew execution from a specific task.
     """
     try:
-        Genesis().crew().replay(task_id=sys.argv[1])
+        print_summary([run_replay(task_id=sys.argv[1])])
 
     except Exception as e:
         raise Exception(f"An error occurred while replaying the crew: {e}")
@@ -55,6 +82,7 @@ def replay():
 def test():
     """
     Test the crew execution and returns the results.
+    Iterations run concurrently on GENESIS_WORKERS processes.
     """
     inputs = {
         "topic": "AI LLMs",
@@ -62,7 +90,7 @@ def test():
     }
     
     try:
-        Genesis().crew().test(n_iterations=int(sys.argv[1]), eval_llm=sys.argv[2], inputs=inputs)
+        print_summary(run_test_iterations(n_iterations=int(sys.argv[1]), eval_llm=sys.argv[2], inputs=inputs))
 
     except Exception as e:
         raise Exception(f"An error occurred while testing the crew: {e}")
@@ -1,11 +1,27 @@
 import os
 import json
-from typing import TypedDict, List
+import uuid
+from typing import TypedDict, List, Optional, Type
 from dotenv import load_dotenv
 from crewai import Agent, Task, Crew, Process
 from langchain_community.tools import DuckDuckGoSearchRun
-from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
 from langgraph.graph import StateGraph, END
+from genesis_workspace import BUILD_DIR, resolve_path
+from genesis_tools import FastTool, print_tool_metrics
+from genesis_sampling import best_of_n, sample_count
+import genesis_assets
+from genesis_assets import BUILD_SCRIPT, build_assets
+from genesis_schema import extract_ddl, parse_ddl, render_schema_manifest, schema_context
+from genesis_templates import render_devops_manifest
+from genesis_scheduler import install_llm_scheduler, llm_scheduler, run_scope
+from genesis_store import commit_run, write_artifact
+from genesis_profiler import profile_run, profile_scope, profiled
+from genesis_pipelining import install_stream_listener, pipelined, streaming_speculation
+from genesis_budget import (budget_agent, budget_level, cancelled, check_cancelled, metered, new_budget, print_budget,
+                            record_usage, run_with_deadline, settle_late_usage, skipped_by)
+from genesis_manifest import ArtifactManifest, manifest_instructions, manifest_nodes, materialize, parse_manifest
+from genesis_verification import MAX_REPAIRS, verify_workspace
 
 # --- Environment Setup ---
 # Load environment variables from .env file
@@ -23,6 +39,11 @@ if os.getenv("LANGCHAIN_PROJECT"):
 if os.getenv("OPENAI_API_KEY"):
     os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY")
 
+# Route every LLM call through the shared rate limiter (GENESIS_RPM / GENESIS_TPM)
+install_llm_scheduler()
+# Stream upstream LLM output to speculative drafts (GENESIS_PIPELINE)
+install_stream_listener()
+
 # Utility function to get environment variables with defaults
 def get_env_var(key: str, default: str = None, required: bool = False) -> str:
     """Get environment variable with optional default value"""
@@ -65,44 +86,66 @@ def validate_environment():
 # --- Tool Definitions ---
 # Agents need tools to interact with the file system.
 
-class FileReaderTool(BaseTool):
+class FileReaderInput(BaseModel):
+    file_path: str = Field(..., description="Path of the file to read.")
+
+class FileReaderTool(FastTool):
     name: str = "FileReaderTool"
     description: str = "Reads the content of a specified file."
-
-    def _run(self, file_path: str) -> str:
+    args_schema: Type[BaseModel] = FileReaderInput
+    cache_ttl: Optional[float] = 300
+    # Agents rewrite files from what they read, so a file is never cut short
+    max_output_tokens: Optional[int] = None
+
+    def cache_key(self, args: FileReaderInput):
+        # Key on the file's current version so writes invalidate the cache
+        path = resolve_path(args.file_path)
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
-        except Exception as e:
-            return f"Error reading file {file_path}: {e}"
-            
-    def _arun(self, file_path: str):
-        raise NotImplementedError("FileReaderTool does not support async run")
-
-class FileWriterTool(BaseTool):
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+    def _execute(self, file_path: str) -> str:
+        with open(resolve_path(file_path), 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def format_error(self, error: Exception, file_path: str = "", **kwargs) -> str:
+        return f"Error reading file {file_path}: {error}"
+
+class FileWriterInput(BaseModel):
+    file_path: str = Field(..., description="Path of the file to write, e.g. './build/src/main.py'.")
+    content: str = Field(..., description="Full content of the file.")
+
+class FileWriterTool(FastTool):
     name: str = "FileWriterTool"
     description: str = "Writes given content to a specified file. Use this to create or overwrite files for the project."
+    args_schema: Type[BaseModel] = FileWriterInput
 
-    def _run(self, file_path: str, content: str) -> str:
-        try:
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            return f"Successfully wrote to {file_path}."
-        except Exception as e:
-            return f"Error writing to file {file_path}: {e}"
-            
-    def _arun(self, file_path: str, content: str):
-        raise NotImplementedError("FileWriterTool does not support async run")
+    def _execute(self, file_path: str, content: str) -> str:
+        target_path = resolve_path(file_path)
+        # A call that timed out, or whose run was cancelled, must not write late
+        check_cancelled()
+        write_artifact(target_path, content)
+        return f"Successfully wrote to {file_path}."
+
+    def format_error(self, error: Exception, file_path: str = "", **kwargs) -> str:
+        return f"Error writing to file {file_path}: {error}"
+
+class SearchInput(BaseModel):
+    query: str = Field(..., description="The search query.")
 
 # Create a wrapper for DuckDuckGoSearchRun to make it compatible with CrewAI
-class SearchTool(BaseTool):
+class SearchTool(FastTool):
     name: str = 'search_tool'
     description: str = 'Search the web using DuckDuckGo'
-    
-    def _run(self, query: str) -> str:
-        search_tool = DuckDuckGoSearchRun()
-        return search_tool.run(query)
+    args_schema: Type[BaseModel] = SearchInput
+    cache_ttl: Optional[float] = 3600
+    timeout: Optional[float] = 30.0
+    max_output_tokens: Optional[int] = 1500
+
+    def _execute(self, query: str) -> str:
+        return DuckDuckGoSearchRun().run(query)
 
 # Instantiate tools
 file_reader_tool = FileReaderTool()
@@ -237,18 +280,91 @@ class ProjectState(TypedDict):
     current_task_description: str
     next_agent: str
     iteration_count: int
+    repair_count: int
+    repair_files: List[str]
+    test_feedback: str
+    schema_context: str
+    run_id: str
+    priority: str
+    started_at: float
+    deadline: Optional[float]
+    token_budget: Optional[int]
+    cost_budget: Optional[float]
+    tokens_used: int
+    cost_used: float
+    budget_level: str
+    skipped_stages: List[str]
+
+# --- Agent Execution ---
+
+def kickoff_agent(state: ProjectState, node: str, agent: Agent, expected_output: str, outputs: List[str]):
+    """
+    Run the node's current task as a single-task crew, as best-of-N when
+    GENESIS_BEST_OF_N is set. outputs lists the build paths the node may
+    produce ('dir/' for a directory); nodes in GENESIS_MANIFEST_NODES return
+    them as one manifest instead of calling FileWriterTool per file. All LLM
+    calls are attributed to the run for the LLM scheduler, and a run low on
+    budget gets a cheaper agent and a single sample. A node being speculated
+    on streams its output to the drafts.
+    """
+    description = state['current_task_description']
+    use_manifest = node in manifest_nodes()
+    samples = sample_count(node) if budget_level(state) == "normal" else 1
+    agent = budget_agent(agent, state)
+    if streaming_speculation() is not None:
+        agent = agent.copy()
+        agent.llm.stream = True
+
+    def kickoff(agent: Agent):
+        if use_manifest:
+            agent.tools = [tool for tool in agent.tools if not isinstance(tool, FileWriterTool)]
+            task = Task(description=description + manifest_instructions(outputs),
+                        expected_output=f"{expected_output} Returned as a JSON artifact manifest.",
+                        agent=agent, output_pydantic=ArtifactManifest)
+        else:
+            task = Task(description=description, expected_output=expected_output, agent=agent)
+        crew = Crew(agents=[agent], tasks=[task], process=Process.sequential, verbose=1)
+        agent.step_callback = check_cancelled
+
+        def run_crew():
+            # Registers best-of-N candidate and deadline threads with the node's profile scope
+            with profile_scope(node):
+                try:
+                    return crew.kickoff()
+                finally:
+                    # Charged when the crew really stops: a crew still winding down after
+                    # the deadline passed is charged to the run late, not lost
+                    record_usage(getattr(agent.llm, "model", ""), crew.calculate_usage_metrics())
+
+        result = run_with_deadline(run_crew, state)
+        if use_manifest:
+            materialize(parse_manifest(result), outputs)
+        return result
+
+    with run_scope(state.get("run_id", "default"), state.get("priority")):
+        return _kickoff_samples(node, agent, kickoff, use_manifest, samples)
+
+
+def _kickoff_samples(node: str, agent: Agent, kickoff, use_manifest: bool, samples: int):
+    if samples <= 1:
+        # A copy keeps executor state private: manifest mode changes the tools,
+        # and concurrent service runs share the module's agents
+        return kickoff(agent.copy())
+    # Every candidate gets its own agent copy so no executor state is shared between threads
+    best = best_of_n(lambda index: kickoff(agent.copy()), samples, label=node)
+    if best is None:
+        raise RuntimeError(f"All {samples} candidates failed")
+    return best.result
+
 
 # --- LangGraph Node Definitions ---
 
 def run_product_manager(state: ProjectState) -> ProjectState:
     print("---NODE: PRODUCT MANAGER---")
     try:
-        task = Task(description=state['current_task_description'], 
-        expected_output="A complete Markdown file named './build/prd.md'.", 
-        agent=product_manager)
-        crew = Crew(agents=[product_manager], 
-        tasks=[task], process=Process.sequential, verbose=1)
-        result = crew.kickoff()
+        result = kickoff_agent(state, "ProductManager", product_manager,
+        expected_output="A complete Markdown file named './build/prd.md'.",
+        outputs=["prd.md"])
         new_artifacts = state.get("artifacts", []) + ["./build/prd.md"]
         return {**state, "artifacts": new_artifacts, "next_agent": "Architect"}
     except Exception as e:
@@ -258,25 +374,39 @@ def run_product_manager(state: ProjectState) -> ProjectState:
 def run_solution_architect(state: ProjectState) -> ProjectState:
     print("---NODE: SOLUTION ARCHITECT---")
     try:
-        task = Task(description=state['current_task_description'], 
-        expected_output="A complete Markdown file named './build/architectural_blueprint.md' containing a Supabase SQL schema.", 
-        agent=solution_architect)
-        crew = Crew(agents=[solution_architect], tasks=[task], process=Process.sequential, verbose=1)
-        result = crew.kickoff()
+        result = kickoff_agent(state, "Architect", solution_architect,
+        expected_output="A complete Markdown file named './build/architectural_blueprint.md' containing a Supabase SQL schema.",
+        outputs=["architectural_blueprint.md"])
         new_artifacts = state.get("artifacts", []) + ["./build/architectural_blueprint.md"]
-        return {**state, "artifacts": new_artifacts, "next_agent": "BackendDeveloper"}
+        return {**state, "artifacts": new_artifacts, "next_agent": "SchemaCodegen"}
     except Exception as e:
         print(f"❌ Error in Solution Architect: {e}")
         return {**state, "next_agent": "Finish"}  # Terminate on error
 
+def run_schema_codegen(state: ProjectState) -> ProjectState:
+    print("---NODE: SCHEMA CODEGEN---")
+    done = {**state, "next_agent": "BackendDeveloper"}
+    try:
+        with open(resolve_path(os.path.join(BUILD_DIR, "architectural_blueprint.md")), "r", encoding="utf-8") as f:
+            schema = parse_ddl(extract_ddl(f.read()))
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Schema codegen skipped: {e}")
+        return done
+    if not schema.tables:
+        print("⚠️ No CREATE TABLE statement in the blueprint, skipping schema codegen")
+        return done
+    written = materialize(render_schema_manifest(schema), ["src/", "tests/"])
+    print(f"✅ Generated models, repositories and fixtures for {len(schema.tables)} tables")
+    return {**done, "artifacts": state.get("artifacts", []) + written, "schema_context": schema_context(schema)}
+
 def run_backend_developer(state: ProjectState) -> ProjectState:
     print("---NODE: BACKEND DEVELOPER---")
     try:
-        task = Task(description=state['current_task_description'], 
-        expected_output="A complete, runnable Python file named './build/src/main.py' that uses the supabase-py client.", 
-        agent=backend_developer)
-        crew = Crew(agents=[backend_developer], tasks=[task], process=Process.sequential, verbose=1)
-        result = crew.kickoff()
+        result = kickoff_agent(state, "BackendDeveloper", backend_developer,
+        expected_output="A complete, runnable Python file named './build/src/main.py' that uses the supabase-py client.",
+        outputs=["src/"])
+        if state.get("repair_files"):
+            return {**state, "next_agent": "Verifier"}
         new_artifacts = state.get("artifacts", []) + ["./build/src/main.py"]
         return {**state, "artifacts": new_artifacts, "next_agent": "FrontendSpecialist"}
     except Exception as e:
@@ -286,40 +416,84 @@ def run_backend_developer(state: ProjectState) -> ProjectState:
 def run_frontend_specialist(state: ProjectState) -> ProjectState:
     print("---NODE: FRONTEND SPECIALIST---")
     try:
-        task = Task(description=state['current_task_description'], 
-        expected_output="A complete frontend application in './build/frontend/' directory with HTML, CSS, JavaScript, and package.json files.", 
-        agent=frontend_specialist)
-        crew = Crew(agents=[frontend_specialist], tasks=[task], process=Process.sequential, verbose=1)
-        result = crew.kickoff()
+        result = kickoff_agent(state, "FrontendSpecialist", frontend_specialist,
+        expected_output="A complete frontend application in './build/frontend/' directory with HTML, CSS, JavaScript, and package.json files.",
+        outputs=["frontend/"])
         new_artifacts = state.get("artifacts", []) + ["./build/frontend/"]
-        return {**state, "artifacts": new_artifacts, "next_agent": "QAEngineer"}
+        return {**state, "artifacts": new_artifacts, "next_agent": "AssetPipeline"}
     except Exception as e:
         print(f"❌ Error in Frontend Specialist: {e}")
         return {**state, "next_agent": "Finish"}  # Terminate on error
 
+def run_asset_pipeline(state: ProjectState) -> ProjectState:
+    print("---NODE: ASSET PIPELINE---")
+    done = {**state, "next_agent": "QAEngineer"}
+    frontend_dir = resolve_path(os.path.join(BUILD_DIR, "frontend"))
+    try:
+        report = build_assets(frontend_dir) if os.path.isdir(frontend_dir) else None
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Asset pipeline failed: {e}")
+        return done
+    if report is None:
+        print("⚠️ No HTML page in ./build/frontend, skipping asset pipeline")
+        return done
+    print(f"✅ Frontend assets: {report.summary()}")
+    # dist stays out of the build; the Dockerfile rebuilds it with this copy of the pipeline
+    with open(genesis_assets.__file__, "r", encoding="utf-8") as f:
+        write_artifact(resolve_path(os.path.join(BUILD_DIR, BUILD_SCRIPT)), f.read())
+    return {**done, "artifacts": state.get("artifacts", []) + ["./build/frontend/dist/", f"./build/{BUILD_SCRIPT}"]}
+
 def run_qa_engineer(state: ProjectState) -> ProjectState:
     print("---NODE: QA ENGINEER---")
     try:
-        task = Task(description=state['current_task_description'], 
-        expected_output="A complete Python test file named './build/tests/test_main.py' which mocks the Supabase client.", 
-        agent=qa_engineer)
-        crew = Crew(agents=[qa_engineer], tasks=[task], process=Process.sequential, verbose=1)
-        result = crew.kickoff()
+        result = kickoff_agent(state, "QAEngineer", qa_engineer,
+        expected_output="A complete Python test file named './build/tests/test_main.py' which mocks the Supabase client.",
+        outputs=["tests/"])
+        if state.get("repair_files"):
+            return {**state, "next_agent": "Verifier"}
         new_artifacts = state.get("artifacts", []) + ["./build/tests/test_main.py"]
-        return {**state, "artifacts": new_artifacts, "next_agent": "DevOpsEngineer"}
+        return {**state, "artifacts": new_artifacts, "next_agent": "Verifier"}
     except Exception as e:
         print(f"❌ Error in QA Engineer: {e}")
         return {**state, "next_agent": "Finish"}  # Terminate on error
 
+def run_verifier(state: ProjectState) -> ProjectState:
+    print("---NODE: VERIFIER---")
+    report = verify_workspace()
+    repair_count = state.get("repair_count", 0)
+    done = {**state, "repair_files": [], "test_feedback": "", "next_agent": "DevOpsEngineer"}
+    if report.passed:
+        print(f"✅ Test suite passed ({report.tests_passed} tests)")
+        return done
+    print(f"❌ {len(report.failures)} failing tests")
+    if repair_count >= MAX_REPAIRS:
+        print(f"⚠️ Repair limit ({MAX_REPAIRS}) reached, continuing with failing tests")
+        return done
+    if budget_level(state) != "normal":
+        print("⚠️ Budget running low, continuing with failing tests")
+        return done
+    # Repair one owner at a time; the backend goes first since the tests exercise it
+    owner = report.owners()[0]
+    print(f"🔧 Repair {repair_count + 1}/{MAX_REPAIRS}: {owner} -> {report.files_for(owner)}")
+    return {**state, "repair_count": repair_count + 1, "repair_files": report.files_for(owner),
+            "test_feedback": report.feedback_for(owner), "next_agent": owner}
+
 def run_devops_engineer(state: ProjectState) -> ProjectState:
     print("---NODE: DEVOPS ENGINEER---")
+    outputs = ["Dockerfile", "requirements.txt", ".env.example", "docker-compose.yml"]
     try:
-        task = Task(description=state['current_task_description'], 
-        expected_output="Three files: './build/Dockerfile', './build/requirements.txt', and './build/.env.example'.", 
-        agent=devops_engineer)
-        crew = Crew(agents=[devops_engineer], tasks=[task], process=Process.sequential, verbose=1)
-        result = crew.kickoff()
-        new_artifacts = state.get("artifacts", []) + ["./build/Dockerfile", "./build/requirements.txt", "./build/.env.example"]
+        # Known stacks get their files from templates; the agent only handles the rest
+        manifest = render_devops_manifest()
+        if manifest is not None:
+            materialize(manifest, outputs)
+        elif budget_level(state) == "exhausted":
+            print("⏭️ Budget exhausted and no template for this stack, skipping DevOps files")
+            return {**state, "skipped_stages": state.get("skipped_stages", []) + ["DevOpsEngineer"], "next_agent": "Finish"}
+        else:
+            result = kickoff_agent(state, "DevOpsEngineer", devops_engineer,
+            expected_output="Four files: './build/Dockerfile', './build/requirements.txt', './build/.env.example' and './build/docker-compose.yml'.",
+            outputs=outputs)
+        new_artifacts = state.get("artifacts", []) + ["./build/Dockerfile", "./build/requirements.txt", "./build/.env.example", "./build/docker-compose.yml"]
         return {**state, "artifacts": new_artifacts, "next_agent": "Finish"}
     except Exception as e:
         print(f"❌ Error in DevOps Engineer: {e}")
@@ -327,10 +501,40 @@ def run_devops_engineer(state: ProjectState) -> ProjectState:
 
 
 # --- Orchestrator Logic ---
+def task_description_for(next_agent: str, state: ProjectState) -> str:
+    """The task the Orchestrator gives a node, given the run so far."""
+    # Generated schema code replaces models and mocks the agents would otherwise re-derive
+    schema_note = f"\n{state['schema_context']}" if state.get("schema_context") else ""
+
+    if next_agent == "Verifier":
+        return "Run the generated test suite and report failures."
+    elif next_agent == "AssetPipeline":
+        return "Bundle, minify, fingerprint and precompress the frontend assets."
+    elif next_agent == "SchemaCodegen":
+        return "Generate models, data access and test fixtures from the blueprint's SQL schema."
+    elif next_agent in ("BackendDeveloper", "QAEngineer") and state.get("repair_files"):
+        files = ", ".join(f"'./build/{path}'" for path in state["repair_files"])
+        return (f"The test suite in './build/tests/' fails. Fix only these files: {files}. "
+                f"Read each file, correct it and write it back in full; do not touch any other file.\n"
+                f"Failing tests:\n{state.get('test_feedback', '')}")
+    elif next_agent == "Architect":
+        return f"Based on the PRD located at './build/prd.md', create a concise Architectural Blueprint. Ensure you define a SQL schema for the 'quotes' table for Supabase as CREATE TABLE statements in a ```sql code block."
+    elif next_agent == "BackendDeveloper":
+        return f"Develop the FastAPI application based on the Architectural Blueprint. You must use the supabase-py client to fetch a random quote from the 'quotes' table defined in the blueprint.{schema_note}"
+    elif next_agent == "FrontendSpecialist":
+        return f"Create a modern, responsive frontend application that integrates with the FastAPI backend. The frontend should display quotes from the API endpoint and have an attractive, user-friendly interface. The FastAPI app serves the page itself, so call the API with relative URLs. Only files referenced from index.html are bundled and shipped."
+    elif next_agent == "QAEngineer":
+        return f"Write a pytest test suite for the FastAPI application in './build/src/main.py' and frontend tests in './build/frontend/'. Make sure to mock the supabase-py client calls to avoid actual database interaction.{schema_note}"
+    elif next_agent == "DevOpsEngineer":
+        return f"Create a Dockerfile, requirements.txt, and a .env.example file. The .env.example must contain SUPABASE_URL and SUPABASE_KEY placeholders. Also create a docker-compose.yml for the full-stack application."
+    else:
+        return f"Analyze this user idea and create a detailed Product Requirements Document (PRD): '{state['user_idea']}'"
+
+
 def run_orchestrator(state: ProjectState) -> ProjectState:
     print("---NODE: ORCHESTRATOR (MCP)---")
+    state = settle_late_usage(state)
     next_agent = state.get("next_agent", "ProductManager")
-    user_idea = state["user_idea"]
     iteration_count = state.get("iteration_count", 0) + 1
     
     # Debug: Show current state
@@ -347,20 +551,31 @@ def run_orchestrator(state: ProjectState) -> ProjectState:
     if iteration_count > 50:
         print("⚠️ Maximum iterations reached, terminating workflow")
         return {**state, "next_agent": "Finish"}
+
+    # Budget check: a run low on time, tokens or money drops stages instead of stopping mid-way
+    level = budget_level(state)
+    if level != state.get("budget_level", "normal"):
+        print(f"💸 Budget at {level} level (tokens {state.get('tokens_used', 0)}, cost ${state.get('cost_used', 0.0):.4f})")
+    state = {**state, "budget_level": level}
+    if level == "exhausted" and state.get("repair_files"):
+        print("⏭️ Budget exhausted, abandoning repairs")
+        state = {**state, "repair_files": [], "test_feedback": ""}
+        next_agent = "DevOpsEngineer"
+    stages = list(NODES)
+    skipped = list(state.get("skipped_stages", []))
+    while next_agent in skipped_by(level):
+        print(f"⏭️ Skipping {next_agent} ({level} budget)")
+        skipped.append(next_agent)
+        following = stages.index(next_agent) + 1
+        next_agent = stages[following] if following < len(stages) else "Finish"
+    state = {**state, "skipped_stages": skipped}
+    if next_agent == "Finish":
+        print("⚠️ Budget exhausted, finishing with the artifacts produced so far")
+        return {**state, "next_agent": "Finish"}
     
-    if next_agent == "Architect":
-        task_description = f"Based on the PRD located at './build/prd.md', create a concise Architectural Blueprint. Ensure you define a SQL schema for the 'quotes' table for Supabase."
-    elif next_agent == "BackendDeveloper":
-        task_description = f"Develop the FastAPI application based on the Architectural Blueprint. You must use the supabase-py client to fetch a random quote from the 'quotes' table defined in the blueprint."
-    elif next_agent == "FrontendSpecialist":
-        task_description = f"Create a modern, responsive frontend application that integrates with the FastAPI backend. The frontend should display quotes from the API endpoint and have an attractive, user-friendly interface."
-    elif next_agent == "QAEngineer":
-        task_description = f"Write a pytest test suite for the FastAPI application in './build/src/main.py' and frontend tests in './build/frontend/'. Make sure to mock the supabase-py client calls to avoid actual database interaction."
-    elif next_agent == "DevOpsEngineer":
-        task_description = f"Create a Dockerfile, requirements.txt, and a .env.example file. The .env.example must contain SUPABASE_URL and SUPABASE_KEY placeholders. Also create a docker-compose.yml for the full-stack application."
-    else: # First step is always the Product Manager
+    if next_agent not in NODES: # First step is always the Product Manager
         next_agent = "ProductManager"
-        task_description = f"Analyze this user idea and create a detailed Product Requirements Document (PRD): '{user_idea}'"
+    task_description = task_description_for(next_agent, state)
 
     print(f"Orchestrator delegating to: {next_agent}")
     return {**state, "current_task_description": task_description, "next_agent": next_agent, "iteration_count": iteration_count}
@@ -373,35 +588,45 @@ def router(state: ProjectState):
 
 workflow = StateGraph(ProjectState)
 
-workflow.add_node("Orchestrator", run_orchestrator)
-workflow.add_node("ProductManager", run_product_manager)
-workflow.add_node("Architect", run_solution_architect)
-workflow.add_node("BackendDeveloper", run_backend_developer)
-workflow.add_node("FrontendSpecialist", run_frontend_specialist)
-workflow.add_node("QAEngineer", run_qa_engineer)
-workflow.add_node("DevOpsEngineer", run_devops_engineer)
+# Worker nodes by name, in pipeline order; each one hands control back to the Orchestrator
+NODES = {
+    "ProductManager": run_product_manager,
+    "Architect": run_solution_architect,
+    "SchemaCodegen": run_schema_codegen,
+    "BackendDeveloper": run_backend_developer,
+    "FrontendSpecialist": run_frontend_specialist,
+    "AssetPipeline": run_asset_pipeline,
+    "QAEngineer": run_qa_engineer,
+    "Verifier": run_verifier,
+    "DevOpsEngineer": run_devops_engineer,
+}
+
+
+def run_draft(state: ProjectState, stages) -> ProjectState:
+    """Run stages back to back without the Orchestrator, for a speculative draft; stops when the draft is abandoned."""
+    for stage in stages:
+        # Abandoned, or no longer worth the money it may not be adopted for
+        if cancelled() or budget_level(state) != "normal":
+            break
+        state = NODES[stage]({**state, "current_task_description": task_description_for(stage, state)})
+        if state["next_agent"] == "Finish":
+            break
+    return state
+
+
+# Every node charges the tokens and dollars it spends to the run's budget,
+# upstream nodes let their successors draft early when speculation can pay
+# off, and with GENESIS_PROFILE each node's samples are attributed to it
+NODES = {name: profiled(name, metered(pipelined(name, node, run_draft, lambda state: budget_level(state) == "normal")))
+         for name, node in NODES.items()}
+
+workflow.add_node("Orchestrator", profiled("Orchestrator", run_orchestrator))
+for name, node in NODES.items():
+    workflow.add_node(name, node)
+    workflow.add_edge(name, "Orchestrator")
 
 workflow.set_entry_point("Orchestrator")
-workflow.add_conditional_edges(
-    "Orchestrator",
-    router,
-    {
-        "ProductManager": "ProductManager",
-        "Architect": "Architect",
-        "BackendDeveloper": "BackendDeveloper",
-        "FrontendSpecialist": "FrontendSpecialist",
-        "QAEngineer": "QAEngineer",
-        "DevOpsEngineer": "DevOpsEngineer",
-        "Finish": END,
-    },
-)
-
-workflow.add_edge("ProductManager", "Orchestrator")
-workflow.add_edge("Architect", "Orchestrator")
-workflow.add_edge("BackendDeveloper", "Orchestrator")
-workflow.add_edge("FrontendSpecialist", "Orchestrator")
-workflow.add_edge("QAEngineer", "Orchestrator")
-workflow.add_edge("DevOpsEngineer", "Orchestrator")
+workflow.add_conditional_edges("Orchestrator", router, {**{name: name for name in NODES}, "Finish": END})
 
 app = workflow.compile()
 
@@ -409,6 +634,14 @@ app = workflow.compile()
 app = app.with_config({"recursion_limit": 100})
 
 
+def new_project_state(user_idea: str, priority: Optional[str] = None, run_id: Optional[str] = None,
+                      deadline_seconds: Optional[float] = None, token_budget: Optional[int] = None,
+                      cost_budget: Optional[float] = None) -> ProjectState:
+    return {"user_idea": user_idea, "artifacts": [], "iteration_count": 0,
+            "run_id": run_id or uuid.uuid4().hex, "priority": priority or get_env_var("GENESIS_PRIORITY", "interactive"),
+            **new_budget(deadline_seconds, token_budget, cost_budget)}
+
+
 # --- Kickoff the Crew ---
 if __name__ == "__main__":
     # Validate environment before starting
@@ -428,16 +661,21 @@ if __name__ == "__main__":
     print(f"Goal: {USER_IDEA}")
     print("-" * 50)
 
-    initial_state = {"user_idea": USER_IDEA, "artifacts": [], "iteration_count": 0}
+    initial_state = new_project_state(USER_IDEA)
     
     try:
-        final_state = app.invoke(initial_state)
+        with profile_run(lambda: resolve_path(os.path.join(BUILD_DIR, "profile"))):
+            final_state = app.invoke(initial_state)
+        commit_run(final_state["run_id"], BUILD_DIR)
         
         print("-" * 50)
         print("✅ Genesis Crew MCP finished execution. ✅")
         print("Final State:")
         print(final_state)
         print("\nCheck the './build' directory for the generated software artifacts.")
+        print_tool_metrics()
+        llm_scheduler.print_metrics()
+        print_budget(settle_late_usage(final_state))
     except Exception as e:
         print(f"❌ Error during execution: {e}")
         print("Please check your API keys and try again.")
@@ -0,0 +1,92 @@
+"""
+Structured Artifact Manifests for Genesis Crew
+Lets a node return all of its files as one validated {path: content}
+manifest in its final answer, which is then written to the workspace in a
+single pass instead of one FileWriterTool round-trip per file.
+"""
+
+import os
+import posixpath
+from typing import Any, List, Sequence, Set
+
+from pydantic import BaseModel, Field, ValidationError, field_validator, model_validator
+
+from genesis_store import write_artifact
+from genesis_workspace import BUILD_DIR, resolve_path
+
+# Nodes that emit manifests instead of calling FileWriterTool
+DEFAULT_MANIFEST_NODES = "FrontendSpecialist,DevOpsEngineer"
+
+
+def manifest_nodes() -> Set[str]:
+    value = os.getenv("GENESIS_MANIFEST_NODES", DEFAULT_MANIFEST_NODES)
+    return {node.strip() for node in value.split(",") if node.strip()}
+
+
+class ArtifactFile(BaseModel):
+    path: str = Field(..., description="File path relative to the build directory, e.g. 'frontend/index.html'.")
+    content: str = Field(..., description="The complete content of the file.")
+
+    @field_validator("path")
+    @classmethod
+    def _relative_path(cls, value: str) -> str:
+        path = posixpath.normpath(value.strip().replace("\\", "/"))
+        # Accept './build/x', 'build/x' and 'x' alike
+        for prefix in ("./", "build/"):
+            if path.startswith(prefix):
+                path = path[len(prefix):]
+        if not path or path == "." or path.startswith("/") or path.split("/")[0] == "..":
+            raise ValueError(f"path must stay inside the build directory: {value!r}")
+        return path
+
+
+class ArtifactManifest(BaseModel):
+    files: List[ArtifactFile] = Field(..., min_length=1, description="Every file this step produces.")
+
+    @model_validator(mode="after")
+    def _unique_paths(self) -> "ArtifactManifest":
+        paths = [f.path for f in self.files]
+        duplicates = sorted({p for p in paths if paths.count(p) > 1})
+        if duplicates:
+            raise ValueError(f"duplicate paths in manifest: {duplicates}")
+        return self
+
+
+def is_allowed(path: str, outputs: Sequence[str]) -> bool:
+    """outputs entries ending in '/' allow a directory, others a single file."""
+    return any(path.startswith(o) if o.endswith("/") else path == o for o in outputs)
+
+
+def manifest_instructions(outputs: Sequence[str]) -> str:
+    allowed = ", ".join(f"'{o}'" for o in outputs)
+    return (
+        "\n\nDo not write files with tools. Your final answer must be a JSON manifest "
+        "with a 'files' list of {\"path\": ..., \"content\": ...} objects, one per file, "
+        f"each path relative to './build' and within: {allowed}. "
+        "Give the complete content of every file."
+    )
+
+
+def parse_manifest(result: Any) -> ArtifactManifest:
+    """Extract the manifest from a CrewOutput, falling back to its raw JSON."""
+    if isinstance(getattr(result, "pydantic", None), ArtifactManifest):
+        return result.pydantic
+    raw = getattr(result, "raw", result)
+    try:
+        return ArtifactManifest.model_validate_json(str(raw).strip().removeprefix("```json").strip("`\n "))
+    except ValidationError as e:
+        raise ValueError(f"Final answer is not a valid artifact manifest: {e}") from e
+
+
+def materialize(manifest: ArtifactManifest, outputs: Sequence[str]) -> List[str]:
+    """Validate every path against outputs, then write all files to the active workspace."""
+    rejected = [f.path for f in manifest.files if not is_allowed(f.path, outputs)]
+    if rejected:
+        raise ValueError(f"Manifest paths outside the allowed outputs {list(outputs)}: {rejected}")
+    written = []
+    for artifact in manifest.files:
+        build_path = os.path.join(BUILD_DIR, *artifact.path.split("/"))
+        write_artifact(resolve_path(build_path), artifact.content)
+        written.append(f"./build/{artifact.path}")
+    print(f"📦 Materialized {len(written)} files from manifest")
+    return written
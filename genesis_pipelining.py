@@ -0,0 +1,265 @@
+"""
+Speculative Pipelining for Genesis Crew
+With GENESIS_PIPELINE set, a node whose output a later stage mostly depends
+on streams its LLM output, and as soon as the stable part of its artifact
+has streamed (the PRD's feature list, the blueprint's SQL DDL) the next
+stages start drafting in their own workspace. When the upstream node
+finishes, the same section is cut from the artifact it actually wrote; if
+it matches what the draft was built from, the draft is promoted and its
+stages are skipped, otherwise it is thrown away and the stages run as usual.
+"""
+
+import contextvars
+import functools
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from genesis_budget import cancel_scope, charge_late
+from genesis_sampling import sample_count
+from genesis_workspace import (
+    BUILD_DIR,
+    changed_files,
+    create_workspace,
+    discard,
+    promote,
+    replace_file,
+    resolve_path,
+    snapshot,
+    use_workspace,
+)
+
+PIPELINE_ENABLED = os.getenv("GENESIS_PIPELINE", "").lower() in ("1", "true", "yes")
+
+_HEADING = re.compile(r"^(#{1,6})[ \t]+(.*)$", re.M)
+_FEATURES = re.compile(r"\b(features?|functional requirements|user stories)\b", re.I)
+_SQL_BLOCK = re.compile(r"```sql[ \t]*\n(.*?)```", re.S | re.I)
+# A JSON string value, possibly still open at the end of the stream
+_JSON_STRING = re.compile(r':\s*"((?:[^"\\]|\\.)*)')
+_PARTIAL_ESCAPE = re.compile(r"\\u[0-9a-fA-F]{0,3}$")
+
+
+# --- Stable sections ---
+
+def features_section(text: str, final: bool = False) -> Optional[str]:
+    """The PRD's feature list; while streaming it only counts once the next heading has started."""
+    headings = list(_HEADING.finditer(text))
+    for index, heading in enumerate(headings):
+        if not _FEATURES.search(heading.group(2)):
+            continue
+        level = len(heading.group(1))
+        end = next((h.start() for h in headings[index + 1:] if len(h.group(1)) <= level), None)
+        if end is None and not final:
+            return None
+        return text[heading.start():end].strip()
+    return None
+
+
+def ddl_section(text: str, final: bool = False) -> Optional[str]:
+    """The blueprint's first complete ```sql block."""
+    match = _SQL_BLOCK.search(text)
+    return f"```sql\n{match.group(1).strip()}\n```" if match else None
+
+
+def _normalized(section: Optional[str]) -> Optional[str]:
+    return " ".join(section.split()).lower() if section else None
+
+
+def _decoded(text: str) -> str:
+    """
+    Files are usually streamed as a tool call, i.e. inside a JSON string:
+    decode the longest string value with escaped line breaks, up to its last
+    complete escape.
+    """
+    values = [match.group(1) for match in _JSON_STRING.finditer(text) if "\\n" in match.group(1)]
+    if not values:
+        return text
+    try:
+        return json.loads('"' + _PARTIAL_ESCAPE.sub("", max(values, key=len)) + '"')
+    except json.JSONDecodeError:
+        return text
+
+
+@dataclass(frozen=True)
+class Handoff:
+    artifact: str
+    """Build-relative file the upstream node writes."""
+    stages: Tuple[str, ...]
+    """Stages drafted from it, in order."""
+    section: Callable[..., Optional[str]]
+
+
+HANDOFFS: Dict[str, Handoff] = {
+    "ProductManager": Handoff("prd.md", ("Architect",), features_section),
+    "Architect": Handoff("architectural_blueprint.md", ("SchemaCodegen", "BackendDeveloper"), ddl_section),
+}
+
+_speculation: contextvars.ContextVar[Optional["Speculation"]] = contextvars.ContextVar("genesis_speculation", default=None)
+_drafting: contextvars.ContextVar[bool] = contextvars.ContextVar("genesis_drafting", default=False)
+
+
+# --- Speculation ---
+
+class Speculation:
+    """Drafts a handoff's stages from the upstream node's streamed output."""
+
+    def __init__(self, node: str, handoff: Handoff, state: dict, run_draft: Callable[[dict, Tuple[str, ...]], dict]):
+        self.node = node
+        self.handoff = handoff
+        self.state = state
+        self.run_draft = run_draft
+        self.section: Optional[str] = None
+        self.result: Optional[dict] = None
+        self.changed: List[str] = []
+        self.error: Optional[BaseException] = None
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._abandoned = False
+        self._finished = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._root: Optional[str] = None
+
+    def feed(self, chunk: str) -> None:
+        if self._thread is not None or not chunk:
+            return
+        self._buffer.append(chunk)
+        # Sections only complete at a line break or a closing fence
+        if "\n" not in chunk and "`" not in chunk and "\\n" not in chunk:
+            return
+        section = self.handoff.section(_decoded("".join(self._buffer)))
+        if section:
+            self.start(section)
+
+    def start(self, section: str) -> None:
+        self.section = section
+        self._root = create_workspace(prefix=f"genesis-draft-{self.node.lower()}-")
+        # The workspace copy keeps the read-only modes of store-linked files
+        replace_file(os.path.join(self._root, self.handoff.artifact), (section + "\n").encode("utf-8"))
+        print(f"🏎️ {self.node} streamed its stable section, drafting {', '.join(self.handoff.stages)}")
+        with cancel_scope(self._stop):
+            context = contextvars.copy_context()
+        self._thread = threading.Thread(target=context.run, args=(self._draft,), name=f"draft-{self.node}", daemon=True)
+        self._thread.start()
+
+    def _draft(self) -> None:
+        _speculation.set(None)
+        _drafting.set(True)
+        baseline = snapshot(self._root)
+        state = {**self.state, "artifacts": self.state.get("artifacts", []) + [f"./build/{self.handoff.artifact}"]}
+        try:
+            with use_workspace(self._root):
+                self.result = self.run_draft(state, self.handoff.stages)
+            self.changed = [rel for rel in changed_files(self._root, baseline) if rel != self.handoff.artifact]
+        except BaseException as e:  # the stages simply run again after the upstream node
+            self.error = e
+        with self._lock:
+            self._finished = True
+            if self._abandoned:
+                self._settle()
+
+    def _settle(self) -> None:
+        # What the discarded draft spent is still the run's money
+        if self.result is not None:
+            charge_late(self.state.get("run_id", "default"),
+                        self.result.get("tokens_used", 0) - self.state.get("tokens_used", 0),
+                        self.result.get("cost_used", 0.0) - self.state.get("cost_used", 0.0))
+        discard(self._root)
+
+    def abandon(self, reason: str) -> None:
+        """
+        Stop the draft: a running agent gives up at its next step and no
+        further stage starts. Its usage is charged to the run once it has stopped.
+        """
+        print(f"🗑️ Draft of {', '.join(self.handoff.stages)} discarded: {reason}")
+        self._stop.set()
+        with self._lock:
+            self._abandoned = True
+            if self._finished:
+                self._settle()
+
+    def resolve(self, new_state: dict) -> dict:
+        """The upstream node's state, continued by the draft when the draft is consistent with its output."""
+        if self._thread is None:
+            return new_state
+        if new_state.get("next_agent") != self.handoff.stages[0]:
+            self.abandon(f"{self.node} did not hand over to {self.handoff.stages[0]}")
+            return new_state
+        try:
+            with open(resolve_path(os.path.join(BUILD_DIR, self.handoff.artifact)), "r", encoding="utf-8") as f:
+                final = self.handoff.section(f.read(), final=True)
+        except OSError as e:
+            self.abandon(str(e))
+            return new_state
+        if _normalized(final) != _normalized(self.section):
+            self.abandon(f"the final {self.handoff.artifact} changed the section it was drafted from")
+            return new_state
+        self._thread.join()
+        if self.error is not None or self.result.get("next_agent") == "Finish":
+            self.abandon(f"the draft failed: {self.error or 'a stage finished the run'}")
+            return new_state
+        draft = self.result
+        promote(self._root, self.changed)
+        discard(self._root)
+        print(f"✅ Draft of {', '.join(self.handoff.stages)} adopted")
+        base = len(self.state.get("artifacts", [])) + 1
+        return {**draft,
+                "artifacts": new_state.get("artifacts", []) + draft.get("artifacts", [])[base:],
+                # The draft's own usage is the difference it made to the budget it started from
+                "tokens_used": new_state.get("tokens_used", 0) + draft.get("tokens_used", 0) - self.state.get("tokens_used", 0),
+                "cost_used": new_state.get("cost_used", 0.0) + draft.get("cost_used", 0.0) - self.state.get("cost_used", 0.0)}
+
+
+def streaming_speculation() -> Optional[Speculation]:
+    """The speculation listening to the current thread's LLM stream, if any."""
+    return _speculation.get()
+
+
+def pipelined(node: str, run: Callable[[dict], dict], run_draft: Callable[[dict, Tuple[str, ...]], dict],
+              allowed: Callable[[dict], bool]) -> Callable[[dict], dict]:
+    """
+    Wrap a graph node so that, in pipeline mode, the stages of its handoff are
+    drafted while it streams. allowed(state) can veto speculation for a run
+    (e.g. on a tight budget, where a discarded draft is money lost).
+    """
+    handoff = HANDOFFS.get(node)
+    if handoff is None:
+        return run
+
+    @functools.wraps(run)
+    def wrapper(state: dict) -> dict:
+        # Best-of-N candidates would interleave their streams, so they are never speculated on
+        if not PIPELINE_ENABLED or _drafting.get() or sample_count(node) > 1 or not allowed(state):
+            return run(state)
+        speculation = Speculation(node, handoff, state, run_draft)
+        token = _speculation.set(speculation)
+        try:
+            new_state = run(state)
+        finally:
+            _speculation.reset(token)
+        return speculation.resolve(new_state)
+
+    return wrapper
+
+
+_installed = False
+
+
+def install_stream_listener() -> None:
+    """Feed streamed LLM chunks to the speculation of the thread that made the call (idempotent)."""
+    global _installed
+    if _installed or not PIPELINE_ENABLED:
+        return
+    from crewai.events.event_bus import crewai_event_bus
+    from crewai.events.types.llm_events import LLMStreamChunkEvent
+
+    @crewai_event_bus.on(LLMStreamChunkEvent)
+    def _feed(source, event):
+        speculation = _speculation.get()
+        if speculation is not None:
+            speculation.feed(event.chunk)
+
+    _installed = True
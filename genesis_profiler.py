@@ -0,0 +1,244 @@
+"""
+Sampling Profiler for Genesis Crew
+With GENESIS_PROFILE set, a background thread samples the Python stacks of
+every thread working for a graph node every few milliseconds (wall clock,
+so time blocked on LLM responses shows up as well as CPU). Samples are
+attributed to the node, and to the tool when a FastTool is running, and
+written next to the run's artifacts:
+
+    profile/<Node>.collapsed  one "frame;frame;frame count" line per stack,
+                              for flamegraph.pl, speedscope or inferno
+    profile/summary.txt       wall time per node and tool, where it went
+                              (LLM, tools, crewAI, LangGraph) and the
+                              top-N functions by inclusive and self time
+"""
+
+import contextvars
+import functools
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from genesis_workspace import replace_file
+
+PROFILE_ENABLED = os.getenv("GENESIS_PROFILE", "").lower() in ("1", "true", "yes")
+INTERVAL = float(os.getenv("GENESIS_PROFILE_INTERVAL", "0.005"))
+TOP_N = int(os.getenv("GENESIS_PROFILE_TOP", "25"))
+
+# Where a sample's time went, decided by the innermost frame from one of these
+# packages; frames of this project (genesis_*) count as "genesis"
+CATEGORIES = (
+    ("llm", ("litellm", "openai", "httpx", "httpcore", "requests", "urllib3", "ssl", "socket")),
+    ("crewai", ("crewai",)),
+    ("langgraph", ("langgraph", "langchain", "langchain_core")),
+)
+
+
+class Profile:
+    """Samples and wall times collected for one run (or one step of it)."""
+
+    def __init__(self):
+        self.stacks: Dict[str, Counter] = defaultdict(Counter)
+        """Top-level scope (node) -> (scope path, frames) -> samples."""
+        self.categories: Dict[str, Counter] = defaultdict(Counter)
+        self.wall: Counter = Counter()
+        """Scope path ("Node" or "Node;tool:Name") -> seconds."""
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, labels: Tuple[str, ...], frames: List[str], category: str) -> None:
+        with self._lock:
+            self.stacks[labels[0]][(labels, tuple(frames))] += 1
+            self.categories[labels[0]][category] += 1
+
+    def timed(self, path: str, seconds: float) -> None:
+        with self._lock:
+            self.wall[path] += seconds
+
+    # --- Output ---
+
+    def summary(self) -> str:
+        lines = [f"Run wall time: {self.elapsed:.2f}s (sampling every {INTERVAL * 1000:.0f}ms)"]
+        nodes = {path: seconds for path, seconds in self.wall.items() if ";" not in path}
+        if nodes:
+            lines.append(f"Graph overhead outside nodes: {max(0.0, self.elapsed - sum(nodes.values())):.2f}s")
+        lines.append("")
+        lines.append("Wall time per scope:")
+        for path, seconds in sorted(self.wall.items(), key=lambda item: -item[1]):
+            lines.append(f"  {seconds:8.2f}s  {path.replace(';', ' > ')}")
+        for node, stacks in sorted(self.stacks.items()):
+            categories = self.categories[node]
+            samples = sum(categories.values())
+            inclusive: Counter = Counter()
+            exclusive: Counter = Counter()
+            for (_, frames), count in stacks.items():
+                for frame in set(frames):
+                    inclusive[frame] += count
+                exclusive[frames[-1]] += count
+            lines.append("")
+            lines.append(f"== {node}: {self.wall.get(node, 0.0):.2f}s, {samples} samples")
+            lines.append("  " + ", ".join(f"{name} {count * 100 / samples:.0f}%" for name, count in categories.most_common()))
+            lines.append(f"  Top {TOP_N} inclusive:")
+            lines += [f"    {count * 100 / samples:5.1f}%  {frame}" for frame, count in inclusive.most_common(TOP_N)]
+            lines.append(f"  Top {TOP_N} self:")
+            lines += [f"    {count * 100 / samples:5.1f}%  {frame}" for frame, count in exclusive.most_common(TOP_N)]
+        return "\n".join(lines) + "\n"
+
+    def write(self, directory: str) -> None:
+        with self._lock:
+            stacks = {node: dict(counts) for node, counts in self.stacks.items()}
+        for node, counts in stacks.items():
+            # Scope labels become the root frames of the flame graph
+            lines = [f"{';'.join((*labels, *frames))} {count}\n" for (labels, frames), count in sorted(counts.items())]
+            replace_file(os.path.join(directory, f"{node}.collapsed"), "".join(lines).encode("utf-8"))
+        replace_file(os.path.join(directory, "summary.txt"), self.summary().encode("utf-8"))
+
+
+# --- Scopes ---
+
+_scope: contextvars.ContextVar[Optional[Tuple[Profile, Tuple[str, ...]]]] = contextvars.ContextVar(
+    "genesis_profile_scope", default=None)
+# Threads currently working for a scope; only these are sampled
+_threads: Dict[int, Tuple[Profile, Tuple[str, ...]]] = {}
+_threads_lock = threading.Lock()
+
+
+@contextmanager
+def profile_scope(label: str) -> Iterator[None]:
+    """Attribute this thread's samples to label (nested under the enclosing scope) while inside."""
+    current = _scope.get()
+    if current is None:
+        yield
+        return
+    profile, labels = current
+    # Re-entering the innermost scope, e.g. from a best-of-N thread, only registers the thread
+    pushed = not labels or labels[-1] != label
+    if pushed:
+        labels = (*labels, label)
+    thread = threading.get_ident()
+    token = _scope.set((profile, labels))
+    with _threads_lock:
+        previous = _threads.get(thread)
+        _threads[thread] = (profile, labels)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if pushed:
+            profile.timed(";".join(labels), time.perf_counter() - started)
+        with _threads_lock:
+            if previous is None:
+                _threads.pop(thread, None)
+            else:
+                _threads[thread] = previous
+        _scope.reset(token)
+
+
+def profiled(label: str, node: Callable[[dict], dict]) -> Callable[[dict], dict]:
+    """Wrap a graph node so its samples are attributed to it."""
+    if not PROFILE_ENABLED:
+        return node
+
+    @functools.wraps(node)
+    def run(state: dict) -> dict:
+        with profile_scope(label):
+            return node(state)
+
+    return run
+
+
+# --- Sampler ---
+
+def _category(labels: Tuple[str, ...], modules: List[str]) -> str:
+    if any(label.startswith("tool:") for label in labels):
+        return "tools"
+    for module in reversed(modules):
+        package = module.split(".")[0]
+        for name, packages in CATEGORIES:
+            if package in packages:
+                return name
+        if package.startswith("genesis_") or package == "__main__":
+            return "genesis"
+    return "other"
+
+
+def _sample() -> None:
+    frames = sys._current_frames()
+    with _threads_lock:
+        registered = list(_threads.items())
+    for thread, (profile, labels) in registered:
+        frame = frames.get(thread)
+        names, modules = [], []
+        while frame is not None:
+            code = frame.f_code
+            module = frame.f_globals.get("__name__", "?")
+            names.append(f"{module}:{getattr(code, 'co_qualname', code.co_name)}")
+            modules.append(module)
+            frame = frame.f_back
+        if names:
+            names.reverse()
+            modules.reverse()
+            profile.add(labels, names, _category(labels, modules))
+
+
+class _Sampler:
+    """One sampling thread shared by every profiled run in the process."""
+
+    def __init__(self):
+        self._users = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(INTERVAL):
+            _sample()
+
+    def acquire(self) -> None:
+        with self._lock:
+            self._users += 1
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="genesis-profiler", daemon=True)
+                self._thread.start()
+
+    def release(self) -> None:
+        with self._lock:
+            self._users -= 1
+            if self._users or self._thread is None:
+                return
+            self._stop.set()
+            thread, self._thread = self._thread, None
+        thread.join()
+
+
+_sampler = _Sampler()
+
+
+@contextmanager
+def profile_run(directory: Callable[[], str]) -> Iterator[Optional[Profile]]:
+    """
+    Profile the graph nodes run inside the block when GENESIS_PROFILE is set,
+    then write the results to directory() (called at the end, so it can
+    point into the run's workspace).
+    """
+    if not PROFILE_ENABLED:
+        yield None
+        return
+    profile = Profile()
+    token = _scope.set((profile, ()))
+    _sampler.acquire()
+    try:
+        yield profile
+    finally:
+        _sampler.release()
+        _scope.reset(token)
+        profile.elapsed = time.perf_counter() - profile.started
+        target = directory()
+        profile.write(target)
+        print(f"🔬 Profile written to {target}")
@@ -0,0 +1,342 @@
+"""
+Job Queue for Genesis Crew
+A small durable queue that lets worker processes on one or more hosts share
+generation work. Jobs are leased, not popped: a worker that stops
+heartbeating loses its job to the next claimant, so every job runs at least
+once. Every write a worker makes after claiming is fenced by its attempt
+number, so a worker that lost its lease cannot overwrite newer progress.
+Backed by SQLite for a single host or by any Redis-compatible server
+(Redis, Valkey, KeyDB) for several hosts.
+"""
+
+import json
+import os
+import sqlite3
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from genesis_sqlite import SQLiteDatabase
+
+DEFAULT_QUEUE_URL = os.getenv("GENESIS_QUEUE_URL", "sqlite:///" + os.path.join(".genesis", "jobs.db"))
+LEASE_SECONDS = float(os.getenv("GENESIS_JOB_LEASE", "120"))
+MAX_ATTEMPTS = int(os.getenv("GENESIS_JOB_ATTEMPTS", "3"))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    run_id: str
+    payload: Dict[str, Any]
+    status: str = QUEUED
+    attempts: int = 0
+    worker: Optional[str] = None
+    checkpoint: Optional[Dict[str, Any]] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+class LeaseLost(RuntimeError):
+    """The job was reclaimed by another worker after this worker's lease expired."""
+
+
+class JobQueue(ABC):
+    """Leased job queue with per-run artifact storage."""
+
+    def __init__(self, lease: float = LEASE_SECONDS, max_attempts: int = MAX_ATTEMPTS):
+        self.lease = lease
+        self.max_attempts = max_attempts
+
+    @abstractmethod
+    def enqueue(self, kind: str, payload: Dict[str, Any], run_id: Optional[str] = None,
+                job_id: Optional[str] = None, priority: int = 0, fence: Optional[Job] = None) -> str:
+        """Add a job; enqueuing an existing job_id again is a no-op. Lower priority runs first.
+
+        With fence, the job is only added while fence is still leased to its worker at its attempt.
+        """
+
+    @abstractmethod
+    def claim(self, worker: str) -> Optional[Job]:
+        """Lease the next queued (or expired) job to worker, or return None."""
+
+    @abstractmethod
+    def _update(self, job: Job, fields: Dict[str, Any], release: bool = False) -> bool:
+        """Write fields if job is still leased to its worker at its attempt; release ends the lease."""
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Job]: ...
+
+    @abstractmethod
+    def _put_artifacts(self, job: Job, files: Dict[str, bytes]) -> bool:
+        """Store files for job's run if job is still leased to its worker at its attempt."""
+
+    @abstractmethod
+    def get_artifacts(self, run_id: str) -> Dict[str, bytes]: ...
+
+    @abstractmethod
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per status."""
+
+    # --- Fenced worker operations ---
+
+    def _fenced(self, job: Job, fields: Dict[str, Any], release: bool = False) -> None:
+        if not self._update(job, fields, release):
+            raise _lease_lost(job)
+
+    def heartbeat(self, job: Job) -> None:
+        self._fenced(job, {})
+
+    def checkpoint(self, job: Job, state: Dict[str, Any]) -> None:
+        self._fenced(job, {"checkpoint": json.dumps(state)})
+        job.checkpoint = state
+
+    def complete(self, job: Job, result: Optional[Dict[str, Any]] = None) -> None:
+        self._fenced(job, {"status": DONE, "result": json.dumps(result or {})}, release=True)
+
+    def fail(self, job: Job, error: str) -> None:
+        """Requeue the job, or mark it failed once it has used all its attempts."""
+        status = FAILED if job.attempts >= self.max_attempts else QUEUED
+        self._fenced(job, {"status": status, "error": error}, release=True)
+
+    def put_artifacts(self, job: Job, files: Dict[str, bytes]) -> None:
+        if not self._put_artifacts(job, files):
+            raise _lease_lost(job)
+
+
+def _lease_lost(job: Job) -> LeaseLost:
+    return LeaseLost(f"job {job.id} attempt {job.attempts} is no longer leased to {job.worker}")
+
+
+def _decode(value: Any) -> Optional[Dict[str, Any]]:
+    return json.loads(value) if value else None
+
+
+# --- SQLite ---
+
+class SQLiteJobQueue(JobQueue):
+    """Queue in a SQLite file; shared by every process on one host."""
+
+    def __init__(self, path: str, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.path = path
+        self._db = SQLiteDatabase(path, row_factory=sqlite3.Row)
+        with self._db.transaction() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, kind TEXT, run_id TEXT, payload TEXT, "
+                       "status TEXT, priority INTEGER, created REAL, attempts INTEGER DEFAULT 0, worker TEXT, "
+                       "lease_until REAL, checkpoint TEXT, result TEXT, error TEXT)")
+            db.execute("CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, priority, created)")
+            db.execute("CREATE TABLE IF NOT EXISTS artifacts (run_id TEXT, path TEXT, content BLOB, "
+                       "PRIMARY KEY (run_id, path))")
+
+    def _holds(self, db: sqlite3.Connection, job: Job) -> bool:
+        """Renew job's lease inside db's transaction if it still belongs to job's worker and attempt."""
+        cursor = db.execute("UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND attempts = ? AND status = ?",
+                            (time.time() + self.lease, job.id, job.worker, job.attempts, RUNNING))
+        return cursor.rowcount == 1
+
+    def enqueue(self, kind, payload, run_id=None, job_id=None, priority=0, fence=None):
+        job_id = job_id or uuid.uuid4().hex
+        with self._db.transaction() as db:
+            if fence is not None and not self._holds(db, fence):
+                raise _lease_lost(fence)
+            db.execute("INSERT OR IGNORE INTO jobs (id, kind, run_id, payload, status, priority, created) "
+                       "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                       (job_id, kind, run_id or job_id, json.dumps(payload), QUEUED, priority, time.time()))
+        return job_id
+
+    def claim(self, worker):
+        now = time.time()
+        with self._db.transaction() as db:
+            # Jobs whose worker stopped heartbeating go back to the queue (or fail for good)
+            db.execute("UPDATE jobs SET status = ?, error = 'lease expired', worker = NULL "
+                       "WHERE status = ? AND lease_until < ? AND attempts >= ?", (FAILED, RUNNING, now, self.max_attempts))
+            db.execute("UPDATE jobs SET status = ?, worker = NULL WHERE status = ? AND lease_until < ?",
+                       (QUEUED, RUNNING, now))
+            row = db.execute("SELECT id FROM jobs WHERE status = ? ORDER BY priority, created LIMIT 1",
+                             (QUEUED,)).fetchone()
+            if row is None:
+                return None
+            db.execute("UPDATE jobs SET status = ?, worker = ?, attempts = attempts + 1, lease_until = ? WHERE id = ?",
+                       (RUNNING, worker, now + self.lease, row["id"]))
+        return self.get(row["id"])
+
+    def _update(self, job, fields, release=False):
+        fields = {**fields, "lease_until": None if release else time.time() + self.lease}
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._db.transaction() as db:
+            cursor = db.execute(f"UPDATE jobs SET {assignments} WHERE id = ? AND worker = ? AND attempts = ? AND status = ?",
+                                (*fields.values(), job.id, job.worker, job.attempts, RUNNING))
+            return cursor.rowcount == 1
+
+    def get(self, job_id):
+        row = self._db.connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return Job(id=row["id"], kind=row["kind"], run_id=row["run_id"], payload=json.loads(row["payload"]),
+                   status=row["status"], attempts=row["attempts"], worker=row["worker"],
+                   checkpoint=_decode(row["checkpoint"]), result=_decode(row["result"]), error=row["error"])
+
+    def _put_artifacts(self, job, files):
+        with self._db.transaction() as db:
+            if not self._holds(db, job):
+                return False
+            db.executemany("INSERT OR REPLACE INTO artifacts (run_id, path, content) VALUES (?, ?, ?)",
+                           [(job.run_id, path, content) for path, content in files.items()])
+        return True
+
+    def get_artifacts(self, run_id):
+        rows = self._db.connection().execute("SELECT path, content FROM artifacts WHERE run_id = ?", (run_id,))
+        return {path: bytes(content) for path, content in rows}
+
+    def counts(self):
+        rows = self._db.connection().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+
+# --- Redis-compatible ---
+
+# Requeue expired leases, then lease the head of the queue. Runs atomically on the server.
+_CLAIM_SCRIPT = """
+local prefix, now, lease, worker, max_attempts = KEYS[1], tonumber(ARGV[1]), tonumber(ARGV[2]), ARGV[3], tonumber(ARGV[4])
+for _, id in ipairs(redis.call('ZRANGEBYSCORE', prefix .. 'leases', '-inf', now)) do
+  redis.call('ZREM', prefix .. 'leases', id)
+  local key = prefix .. 'job:' .. id
+  if tonumber(redis.call('HGET', key, 'attempts')) >= max_attempts then
+    redis.call('HSET', key, 'status', 'failed', 'error', 'lease expired', 'worker', '')
+  else
+    redis.call('HSET', key, 'status', 'queued', 'worker', '')
+    redis.call('ZADD', prefix .. 'queued', redis.call('HGET', key, 'score'), id)
+  end
+end
+local head = redis.call('ZRANGE', prefix .. 'queued', 0, 0)
+if #head == 0 then return false end
+local id = head[1]
+local key = prefix .. 'job:' .. id
+redis.call('ZREM', prefix .. 'queued', id)
+redis.call('HINCRBY', key, 'attempts', 1)
+redis.call('HSET', key, 'status', 'running', 'worker', worker)
+redis.call('ZADD', prefix .. 'leases', now + lease, id)
+return id
+"""
+
+# Add a job unless it exists; with a fence (job id, worker, attempt), only while that job is still leased.
+_ENQUEUE_SCRIPT = """
+local prefix, id, score, fence, worker, attempts = KEYS[1], ARGV[1], ARGV[2], ARGV[3], ARGV[4], ARGV[5]
+if fence ~= '' then
+  local job = redis.call('HMGET', prefix .. 'job:' .. fence, 'worker', 'attempts', 'status')
+  if job[1] ~= worker or job[2] ~= attempts or job[3] ~= 'running' then return 0 end
+end
+local key = prefix .. 'job:' .. id
+if redis.call('EXISTS', key) == 0 then
+  for i = 6, #ARGV, 2 do redis.call('HSET', key, ARGV[i], ARGV[i + 1]) end
+  redis.call('ZADD', prefix .. 'queued', score, id)
+end
+return 1
+"""
+
+# Store ARGV path/content pairs for the run only while the job is still leased to the caller's attempt.
+_PUT_ARTIFACTS_SCRIPT = """
+local prefix, id, worker, attempts, now, lease, run_id = KEYS[1], ARGV[1], ARGV[2], ARGV[3], tonumber(ARGV[4]), tonumber(ARGV[5]), ARGV[6]
+local job = redis.call('HMGET', prefix .. 'job:' .. id, 'worker', 'attempts', 'status')
+if job[1] ~= worker or job[2] ~= attempts or job[3] ~= 'running' then return 0 end
+redis.call('ZADD', prefix .. 'leases', now + lease, id)
+for i = 7, #ARGV, 2 do redis.call('HSET', prefix .. 'artifacts:' .. run_id, ARGV[i], ARGV[i + 1]) end
+return 1
+"""
+
+# Apply ARGV field/value pairs only while the job is still leased to the caller's attempt.
+_UPDATE_SCRIPT = """
+local prefix, id, worker, attempts, now, lease, release = KEYS[1], ARGV[1], ARGV[2], ARGV[3], tonumber(ARGV[4]), tonumber(ARGV[5]), ARGV[6]
+local key = prefix .. 'job:' .. id
+local job = redis.call('HMGET', key, 'worker', 'attempts', 'status')
+if job[1] ~= worker or job[2] ~= attempts or job[3] ~= 'running' then return 0 end
+for i = 7, #ARGV, 2 do redis.call('HSET', key, ARGV[i], ARGV[i + 1]) end
+if release == '1' then
+  redis.call('ZREM', prefix .. 'leases', id)
+  if redis.call('HGET', key, 'status') == 'queued' then
+    redis.call('HSET', key, 'worker', '')
+    redis.call('ZADD', prefix .. 'queued', redis.call('HGET', key, 'score'), id)
+  end
+else
+  redis.call('ZADD', prefix .. 'leases', now + lease, id)
+end
+return 1
+"""
+
+
+class RedisJobQueue(JobQueue):
+    """Queue on a Redis-compatible server; shared by workers on any number of hosts."""
+
+    def __init__(self, url: str, prefix: str = "genesis:", **kwargs: Any):
+        super().__init__(**kwargs)
+        import redis  # optional dependency: pip install redis
+
+        self.redis = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self._claim = self.redis.register_script(_CLAIM_SCRIPT)
+        self._update_job = self.redis.register_script(_UPDATE_SCRIPT)
+        self._enqueue = self.redis.register_script(_ENQUEUE_SCRIPT)
+        self._store_artifacts = self.redis.register_script(_PUT_ARTIFACTS_SCRIPT)
+
+    def _key(self, *parts: str) -> str:
+        return self.prefix + ":".join(parts)
+
+    def enqueue(self, kind, payload, run_id=None, job_id=None, priority=0, fence=None):
+        job_id = job_id or uuid.uuid4().hex
+        created = time.time()
+        # Priority dominates, then arrival time
+        score = priority * 1e10 + created
+        fields = {"kind": kind, "run_id": run_id or job_id, "payload": json.dumps(payload), "status": QUEUED,
+                  "attempts": 0, "worker": "", "score": score}
+        pairs = [item for name_value in fields.items() for item in name_value]
+        fenced_by = [fence.id, fence.worker, fence.attempts] if fence is not None else ["", "", ""]
+        if not self._enqueue(keys=[self.prefix], args=[job_id, score, *fenced_by, *pairs]):
+            raise _lease_lost(fence)
+        return job_id
+
+    def claim(self, worker):
+        job_id = self._claim(keys=[self.prefix], args=[time.time(), self.lease, worker, self.max_attempts])
+        return self.get(job_id.decode()) if job_id else None
+
+    def _update(self, job, fields, release=False):
+        pairs = [item for name_value in fields.items() for item in name_value]
+        return bool(self._update_job(keys=[self.prefix], args=[job.id, job.worker, job.attempts, time.time(),
+                                                               self.lease, int(release), *pairs]))
+
+    def get(self, job_id):
+        data = {k.decode(): v.decode() for k, v in self.redis.hgetall(self._key("job", job_id)).items()}
+        if not data:
+            return None
+        return Job(id=job_id, kind=data["kind"], run_id=data["run_id"], payload=json.loads(data["payload"]),
+                   status=data["status"], attempts=int(data["attempts"]), worker=data.get("worker") or None,
+                   checkpoint=_decode(data.get("checkpoint")), result=_decode(data.get("result")),
+                   error=data.get("error"))
+
+    def _put_artifacts(self, job, files):
+        pairs = [item for path_content in files.items() for item in path_content]
+        return bool(self._store_artifacts(keys=[self.prefix], args=[job.id, job.worker, job.attempts, time.time(),
+                                                                    self.lease, job.run_id, *pairs]))
+
+    def get_artifacts(self, run_id):
+        return {path.decode(): content for path, content in self.redis.hgetall(self._key("artifacts", run_id)).items()}
+
+    def counts(self):
+        counts: Dict[str, int] = {}
+        for key in self.redis.scan_iter(match=self._key("job", "*")):
+            status = self.redis.hget(key, "status").decode()
+            counts[status] = counts.get(status, 0) + 1
+        return counts
+
+
+def open_queue(url: str = DEFAULT_QUEUE_URL, **kwargs: Any) -> JobQueue:
+    """sqlite:///path/to/jobs.db or redis://host:6379/0 (also rediss:// and unix://)."""
+    if url.startswith("sqlite:///"):
+        return SQLiteJobQueue(url[len("sqlite:///"):], **kwargs)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisJobQueue(url, **kwargs)
+    raise ValueError(f"Unsupported queue URL: {url}")
@@ -0,0 +1,216 @@
+"""
+Best-of-N Sampling for Genesis Crew
+Generates several candidates for a node concurrently, each in its own
+workspace, scores them with cheap checks (syntax, imports, pytest) and
+promotes the best one into the build directory. Scoring stops as soon as
+a candidate passes every check.
+"""
+
+import contextvars
+import os
+import re
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from genesis_budget import Cancelled, cancel_scope
+from genesis_workspace import (
+    active_root,
+    changed_files,
+    create_workspace,
+    discard,
+    promote,
+    snapshot,
+    use_workspace,
+)
+
+CHECK_TIMEOUT = int(os.getenv("GENESIS_CHECK_TIMEOUT", "120"))
+
+# Credentials are never handed to generated code under test
+SANDBOX_BLOCKED_ENV = ("OPENAI_API_KEY", "LANGCHAIN_API_KEY", "SUPABASE_URL", "SUPABASE_KEY")
+
+# Each check already runs in its own subprocess; this semaphore only caps how
+# many of them (import checks, pytest runs) run at once across all candidates.
+_check_slots = threading.BoundedSemaphore(int(os.getenv("GENESIS_CHECK_WORKERS", str(os.cpu_count() or 2))))
+
+
+def sample_count(node: str) -> int:
+    """Number of candidates to generate for a node (GENESIS_BEST_OF_N[_<NODE>])."""
+    value = os.getenv(f"GENESIS_BEST_OF_N_{node.upper()}") or os.getenv("GENESIS_BEST_OF_N", "1")
+    return max(1, int(value))
+
+
+@dataclass
+class CandidateScore:
+    produced: int = 0
+    syntax_ok: bool = True
+    imports_ok: bool = True
+    tests_ok: bool = True
+    tests_passed: int = 0
+    tests_failed: int = 0
+    details: List[str] = field(default_factory=list)
+
+    @property
+    def passed(self) -> bool:
+        return self.produced > 0 and self.syntax_ok and self.imports_ok and self.tests_ok
+
+    def key(self) -> Tuple:
+        return (self.passed, self.syntax_ok, self.imports_ok, self.tests_ok,
+                self.tests_passed, -self.tests_failed, self.produced)
+
+    def summary(self) -> str:
+        return (f"files={self.produced} syntax={'ok' if self.syntax_ok else 'fail'} "
+                f"imports={'ok' if self.imports_ok else 'fail'} "
+                f"tests={self.tests_passed} passed/{self.tests_failed} failed")
+
+
+@dataclass
+class Candidate:
+    index: int
+    root: str
+    files: List[str]
+    score: CandidateScore
+    result: Any = None
+
+
+def sandbox_env() -> Dict[str, str]:
+    return {key: value for key, value in os.environ.items() if key not in SANDBOX_BLOCKED_ENV}
+
+
+def run_check(command: List[str], cwd: str, timeout: int = CHECK_TIMEOUT,
+              env: Optional[Dict[str, str]] = None) -> subprocess.CompletedProcess:
+    """Run a check command in its own process (GENESIS_CHECK_WORKERS at a time), without credentials by default."""
+    env = {**(sandbox_env() if env is None else env), "PYTHONDONTWRITEBYTECODE": "1"}
+    with _check_slots:
+        try:
+            return subprocess.run(command, cwd=cwd, env=env, capture_output=True, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired as e:
+            return subprocess.CompletedProcess(command, -1, e.stdout or "", f"Timed out after {timeout}s")
+
+
+def check_syntax(root: str, files: List[str]) -> List[str]:
+    errors = []
+    for rel in files:
+        if not rel.endswith(".py"):
+            continue
+        try:
+            with open(os.path.join(root, rel), "r", encoding="utf-8") as f:
+                compile(f.read(), rel, "exec")
+        except (SyntaxError, ValueError) as e:
+            errors.append(f"{rel}: {e}")
+    return errors
+
+
+def module_name(rel: str) -> str:
+    return os.path.splitext(rel)[0].replace(os.sep, ".")
+
+
+def check_imports(root: str, files: List[str]) -> List[str]:
+    modules = [module_name(rel) for rel in files
+               if rel.endswith(".py") and not rel.startswith("tests" + os.sep)
+               and os.path.basename(rel) != "__init__.py"]
+    if not modules:
+        return []
+    script = "import importlib, sys\nfor name in sys.argv[1:]:\n    importlib.import_module(name)\n"
+    result = run_check([sys.executable, "-c", script, *modules], cwd=root)
+    if result.returncode != 0:
+        output = (result.stderr or result.stdout).strip()
+        return [output.splitlines()[-1] if output else "import failed"]
+    return []
+
+
+def parse_pytest_counts(output: str) -> Tuple[int, int]:
+    """Extract (passed, failed + errors) from pytest's summary line."""
+    passed = sum(int(n) for n in re.findall(r"(\d+) passed", output))
+    failed = sum(int(n) for n in re.findall(r"(\d+) (?:failed|errors?)\b", output))
+    return passed, failed
+
+
+def has_tests(root: str) -> bool:
+    tests_dir = os.path.join(root, "tests")
+    return os.path.isdir(tests_dir) and any(
+        name.startswith("test_") and name.endswith(".py") for name in os.listdir(tests_dir))
+
+
+def run_tests(root: str) -> subprocess.CompletedProcess:
+    return run_check([sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", "tests"], cwd=root)
+
+
+def score_workspace(root: str, files: List[str]) -> CandidateScore:
+    """Score a workspace, cheapest checks first."""
+    score = CandidateScore(produced=len(files))
+    syntax_errors = check_syntax(root, files)
+    if syntax_errors:
+        score.syntax_ok = score.imports_ok = score.tests_ok = False
+        score.details.extend(syntax_errors)
+        return score
+    import_errors = check_imports(root, files)
+    if import_errors:
+        score.imports_ok = False
+        score.details.extend(import_errors)
+    if has_tests(root):
+        result = run_tests(root)
+        score.tests_passed, score.tests_failed = parse_pytest_counts(result.stdout)
+        # Exit code 5 means no tests were collected
+        score.tests_ok = result.returncode in (0, 5)
+        if not score.tests_ok and score.tests_failed == 0:
+            score.tests_failed = 1
+            score.details.append((result.stderr or result.stdout).strip()[-500:])
+    return score
+
+
+def best_of_n(generate: Callable[[int], Any], n: int, label: str = "") -> Optional[Candidate]:
+    """
+    Run generate(index) n times concurrently, each inside its own workspace,
+    and promote the best-scoring candidate into the build directory. Once a
+    candidate passes every check, the others stop at their next agent step.
+    """
+    baseline = snapshot(active_root())
+    roots = [create_workspace(prefix=f"genesis-{label.lower()}-{i}-") for i in range(n)]
+    stop = threading.Event()
+
+    def attempt(index: int) -> Candidate:
+        with use_workspace(roots[index]):
+            result = generate(index)
+        if stop.is_set():
+            raise Cancelled("another candidate already passed")
+        files = changed_files(roots[index], baseline)
+        return Candidate(index, roots[index], files, score_workspace(roots[index], files), result)
+
+    print(f"🎲 {label}: generating {n} candidates")
+    pool = ThreadPoolExecutor(max_workers=n, thread_name_prefix=f"genesis-{label.lower()}")
+    with cancel_scope(stop):
+        futures = {pool.submit(contextvars.copy_context().run, attempt, i): i for i in range(n)}
+    best: Optional[Candidate] = None
+    try:
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                candidate = future.result()
+            except Exception as e:
+                print(f"   ❌ Candidate {index} failed: {e}")
+                continue
+            print(f"   Candidate {index}: {candidate.score.summary()}")
+            if best is None or candidate.score.key() > best.score.key():
+                best = candidate
+            if candidate.score.passed:
+                print(f"   ✅ Candidate {index} passed all checks, skipping the rest")
+                break
+    finally:
+        stop.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    if best is not None:
+        promote(best.root, best.files)
+        print(f"🏆 {label}: promoted candidate {best.index} ({len(best.files)} files)")
+
+    # Candidates still generating clean up after themselves once they finish
+    for future, index in futures.items():
+        if future.done():
+            discard(roots[index])
+        else:
+            future.add_done_callback(lambda _, root=roots[index]: discard(root))
+    return best
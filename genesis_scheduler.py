@@ -0,0 +1,219 @@
+"""
+LLM Call Scheduler for Genesis Crew
+Coordinates LLM traffic of every workflow on the machine through shared
+token buckets (requests/min and tokens/min) kept in a SQLite file, so
+concurrent runs and processes draw from one budget instead of bursting into
+provider rate limits together. Waiting calls are served by priority class
+(interactive before batch), then by the run that has been served least,
+then first-come first-served.
+"""
+
+import contextvars
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+from genesis_sqlite import SQLiteDatabase
+
+PRIORITIES = {"interactive": 0, "batch": 1}
+DEFAULT_DB = os.getenv("GENESIS_SCHEDULER_DB", os.path.join(".genesis", "scheduler.db"))
+# Expected completion size added to the prompt estimate of every call
+COMPLETION_TOKENS = int(os.getenv("GENESIS_COMPLETION_TOKENS", "1000"))
+# Waiters that have not polled for this long belong to a dead process
+STALE_AFTER = 30.0
+POLL_INTERVAL = 0.25
+
+
+@dataclass
+class RunScope:
+    run_id: str
+    priority: str
+
+
+_scope: contextvars.ContextVar[Optional[RunScope]] = contextvars.ContextVar("genesis_run_scope", default=None)
+
+
+@dataclass
+class SchedulerMetrics:
+    granted: int = 0
+    throttled: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+    max_queue_depth: int = 0
+    waits_by_priority: Dict[str, List[float]] = field(default_factory=dict)
+
+
+def estimate_tokens(messages: Any) -> int:
+    if isinstance(messages, str):
+        text = messages
+    else:
+        text = "".join(str(m.get("content", "")) if isinstance(m, dict) else str(m) for m in messages or [])
+    return len(text) // 4 + COMPLETION_TOKENS
+
+
+class LLMScheduler:
+    """Cross-process token-bucket scheduler backed by a SQLite file."""
+
+    def __init__(self, rpm: Optional[int], tpm: Optional[int], db_path: str = DEFAULT_DB):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.db_path = db_path
+        self.metrics = SchedulerMetrics()
+        self._metrics_lock = threading.Lock()
+        self._db = SQLiteDatabase(db_path)
+        if self.enabled:
+            with self._db.transaction() as db:
+                db.execute("CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, tokens REAL, updated REAL)")
+                db.execute("CREATE TABLE IF NOT EXISTS waiters (id TEXT PRIMARY KEY, run_id TEXT, priority INTEGER, "
+                           "enqueued REAL, heartbeat REAL, cost INTEGER)")
+                db.execute("CREATE TABLE IF NOT EXISTS runs (run_id TEXT PRIMARY KEY, served INTEGER, last_seen REAL)")
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.rpm or self.tpm)
+
+    # --- Buckets ---
+
+    def _limits(self) -> Dict[str, float]:
+        limits = {}
+        if self.rpm:
+            limits["requests"] = float(self.rpm)
+        if self.tpm:
+            limits["tokens"] = float(self.tpm)
+        return limits
+
+    def _refill(self, db: sqlite3.Connection, now: float) -> Dict[str, float]:
+        levels = {}
+        for name, per_minute in self._limits().items():
+            row = db.execute("SELECT tokens, updated FROM buckets WHERE name = ?", (name,)).fetchone()
+            tokens = per_minute if row is None else min(per_minute, row[0] + (now - row[1]) * per_minute / 60)
+            db.execute("INSERT OR REPLACE INTO buckets (name, tokens, updated) VALUES (?, ?, ?)", (name, tokens, now))
+            levels[name] = tokens
+        return levels
+
+    # --- Scheduling ---
+
+    def _try_acquire(self, waiter_id: str, run_id: str, cost: Dict[str, float]) -> float:
+        """Take tokens if this waiter is at the head of the queue; otherwise return seconds to wait."""
+        now = time.time()
+        with self._db.transaction() as db:
+            db.execute("DELETE FROM waiters WHERE heartbeat < ?", (now - STALE_AFTER,))
+            db.execute("UPDATE waiters SET heartbeat = ? WHERE id = ?", (now, waiter_id))
+            head = db.execute(
+                "SELECT w.id FROM waiters w LEFT JOIN runs r ON r.run_id = w.run_id "
+                "ORDER BY w.priority, COALESCE(r.served, 0), w.enqueued LIMIT 1").fetchone()
+            levels = self._refill(db, now)
+            if head is None or head[0] != waiter_id:
+                return POLL_INTERVAL
+            shortfall = max((cost[name] - levels[name]) * 60 / self._limits()[name] for name in levels)
+            if shortfall > 0:
+                return min(shortfall, POLL_INTERVAL * 4)
+            for name in levels:
+                db.execute("UPDATE buckets SET tokens = tokens - ? WHERE name = ?", (cost[name], name))
+            db.execute("DELETE FROM waiters WHERE id = ?", (waiter_id,))
+            db.execute("INSERT INTO runs (run_id, served, last_seen) VALUES (?, 1, ?) "
+                       "ON CONFLICT(run_id) DO UPDATE SET served = served + 1, last_seen = ?", (run_id, now, now))
+            return 0.0
+
+    def acquire(self, tokens: int) -> float:
+        """Block until the current run may make one LLM call of about `tokens` tokens. Returns the wait."""
+        if not self.enabled:
+            return 0.0
+        scope = _scope.get() or RunScope("default", os.getenv("GENESIS_PRIORITY", "interactive"))
+        priority = PRIORITIES.get(scope.priority, PRIORITIES["interactive"])
+        limits = self._limits()
+        cost = {"requests": 1.0, "tokens": float(tokens)}
+        # A single oversized call must still fit into a full bucket
+        cost = {name: min(cost[name], limits[name]) for name in limits}
+        waiter_id = uuid.uuid4().hex
+        started = time.time()
+        with self._db.transaction() as db:
+            db.execute("DELETE FROM runs WHERE last_seen < ?", (started - 86400,))
+            db.execute("INSERT INTO waiters (id, run_id, priority, enqueued, heartbeat, cost) VALUES (?, ?, ?, ?, ?, ?)",
+                       (waiter_id, scope.run_id, priority, started, started, int(cost.get("tokens", 0))))
+        try:
+            while True:
+                delay = self._try_acquire(waiter_id, scope.run_id, cost)
+                if delay == 0.0:
+                    break
+                time.sleep(delay)
+        except BaseException:
+            with self._db.transaction() as db:
+                db.execute("DELETE FROM waiters WHERE id = ?", (waiter_id,))
+            raise
+        waited = time.time() - started
+        self._record(scope.priority, waited)
+        return waited
+
+    def _record(self, priority: str, waited: float) -> None:
+        depth = self.queue_depth()
+        with self._metrics_lock:
+            m = self.metrics
+            m.granted += 1
+            m.throttled += waited > POLL_INTERVAL
+            m.total_wait += waited
+            m.max_wait = max(m.max_wait, waited)
+            m.max_queue_depth = max(m.max_queue_depth, sum(depth.values()))
+            m.waits_by_priority.setdefault(priority, []).append(waited)
+
+    def queue_depth(self) -> Dict[str, int]:
+        """Number of LLM calls currently waiting, per priority class, across all processes."""
+        if not self.enabled:
+            return {}
+        names = {value: name for name, value in PRIORITIES.items()}
+        rows = self._db.connection().execute("SELECT priority, COUNT(*) FROM waiters GROUP BY priority").fetchall()
+        return {names.get(priority, str(priority)): count for priority, count in rows}
+
+    def print_metrics(self) -> None:
+        if not self.enabled or not self.metrics.granted:
+            return
+        m = self.metrics
+        print("\n🚦 LLM scheduler:")
+        print(f"   - Calls granted: {m.granted} ({m.throttled} throttled)")
+        print(f"   - Wait: avg {m.total_wait / m.granted:.2f}s, max {m.max_wait:.2f}s")
+        print(f"   - Max queue depth: {m.max_queue_depth}")
+        for priority, waits in sorted(m.waits_by_priority.items()):
+            print(f"   - {priority}: {len(waits)} calls, avg wait {sum(waits) / len(waits):.2f}s")
+
+
+@contextmanager
+def run_scope(run_id: str, priority: Optional[str] = None) -> Iterator[RunScope]:
+    """Attribute LLM calls made inside the block to a run and priority class."""
+    scope = RunScope(run_id, priority or os.getenv("GENESIS_PRIORITY", "interactive"))
+    token = _scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _scope.reset(token)
+
+
+def _env_int(key: str) -> Optional[int]:
+    value = os.getenv(key)
+    return int(value) if value else None
+
+
+llm_scheduler = LLMScheduler(rpm=_env_int("GENESIS_RPM"), tpm=_env_int("GENESIS_TPM"))
+
+_installed = False
+
+
+def install_llm_scheduler() -> None:
+    """Gate every crewAI LLM call through the scheduler (idempotent)."""
+    global _installed
+    if _installed or not llm_scheduler.enabled:
+        return
+    from crewai.events.event_bus import crewai_event_bus
+    from crewai.events.types.llm_events import LLMCallStartedEvent
+
+    @crewai_event_bus.on(LLMCallStartedEvent)
+    def _throttle(source, event):
+        # Event handlers run synchronously in the calling thread, so blocking
+        # here delays the LLM request itself.
+        llm_scheduler.acquire(estimate_tokens(event.messages))
+
+    _installed = True
@@ -0,0 +1,333 @@
+"""
+Schema-Driven Code Generation for Genesis Crew
+Parses the SQL DDL in the architectural blueprint into an in-memory schema
+model and renders Pydantic models, Supabase data-access classes and pytest
+fixtures from it. The generated files replace code the backend and QA agents
+would otherwise re-derive from prose, and their compact summary is handed to
+those agents as context.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from genesis_manifest import ArtifactFile, ArtifactManifest
+
+# (SQL type prefix, Python annotation, sample value literal), most specific prefix first
+SQL_TYPES: List[Tuple[str, str, str]] = [
+    ("bigserial", "int", "{n}"),
+    ("smallserial", "int", "{n}"),
+    ("serial", "int", "{n}"),
+    ("bigint", "int", "{n}"),
+    ("smallint", "int", "{n}"),
+    ("interval", "str", '"1 day"'),
+    ("int", "int", "{n}"),
+    ("numeric", "Decimal", 'Decimal("{n}.50")'),
+    ("decimal", "Decimal", 'Decimal("{n}.50")'),
+    ("real", "float", "{n}.5"),
+    ("double", "float", "{n}.5"),
+    ("float", "float", "{n}.5"),
+    ("bool", "bool", "True"),
+    ("timestamp", "datetime", "datetime(2024, 1, {n}, tzinfo=timezone.utc)"),
+    ("date", "date", "date(2024, 1, {n})"),
+    ("time", "str", '"12:00:00"'),
+    ("uuid", "UUID", 'UUID(int={n})'),
+    ("jsonb", "Dict[str, Any]", '{{"key": "value {n}"}}'),
+    ("json", "Dict[str, Any]", '{{"key": "value {n}"}}'),
+    ("varchar", "str", '"{column} {n}"'),
+    ("character", "str", '"{column} {n}"'),
+    ("char", "str", '"{column} {n}"'),
+    ("text", "str", '"{column} {n}"'),
+    ("citext", "str", '"{column} {n}"'),
+]
+
+# Leading keywords of table-level constraints inside CREATE TABLE (...)
+TABLE_CONSTRAINTS = ("primary", "foreign", "unique", "constraint", "check", "exclude")
+
+_SQL_BLOCK = re.compile(r"```sql\s*\n(.*?)```", re.S | re.I)
+_CREATE_TABLE = re.compile(r"create\s+table\s+(?:if\s+not\s+exists\s+)?(?:\"?\w+\"?\.)?\"?(\w+)\"?\s*\(", re.I)
+
+
+@dataclass
+class Column:
+    name: str
+    sql_type: str
+    nullable: bool = True
+    primary_key: bool = False
+    has_default: bool = False
+    references: Optional[str] = None
+
+    @property
+    def generated(self) -> bool:
+        """Filled in by the database when a row is inserted."""
+        return self.has_default or "serial" in self.sql_type or "identity" in self.sql_type
+
+    @property
+    def python_type(self) -> str:
+        return python_type(self.sql_type)
+
+
+@dataclass
+class Table:
+    name: str
+    columns: List[Column] = field(default_factory=list)
+
+    @property
+    def class_name(self) -> str:
+        return "".join(part.capitalize() for part in singular(self.name).split("_"))
+
+    @property
+    def primary_key(self) -> Optional[Column]:
+        return next((column for column in self.columns if column.primary_key), None)
+
+
+@dataclass
+class Schema:
+    tables: List[Table] = field(default_factory=list)
+
+
+def singular(name: str) -> str:
+    if name.endswith("ies"):
+        return name[:-3] + "y"
+    if name.endswith("ses") or name.endswith("xes"):
+        return name[:-2]
+    if name.endswith("s") and not name.endswith("ss"):
+        return name[:-1]
+    return name
+
+
+def _type_entry(sql_type: str) -> Tuple[str, str]:
+    base = sql_type.lower()
+    for prefix, annotation, sample in SQL_TYPES:
+        if base.startswith(prefix):
+            return annotation, sample
+    return "Any", "None"
+
+
+def python_type(sql_type: str) -> str:
+    annotation = _type_entry(sql_type.rstrip("[]"))[0]
+    return f"List[{annotation}]" if sql_type.endswith("[]") else annotation
+
+
+# --- Parsing ---
+
+def _split_top_level(body: str) -> List[str]:
+    """Split a CREATE TABLE body on commas that are not inside parentheses."""
+    parts, depth, current = [], 0, []
+    for char in body:
+        if char == "," and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+            continue
+        depth += (char == "(") - (char == ")")
+        current.append(char)
+    parts.append("".join(current).strip())
+    return [part for part in parts if part]
+
+
+def _table_body(sql: str, start: int) -> Tuple[str, int]:
+    depth = 1
+    for index in range(start, len(sql)):
+        depth += (sql[index] == "(") - (sql[index] == ")")
+        if depth == 0:
+            return sql[start:index], index
+    raise ValueError("Unbalanced parentheses in CREATE TABLE statement")
+
+
+def _names(text: str) -> List[str]:
+    inner = text[text.index("(") + 1:text.index(")")]
+    return [name.strip().strip('"').lower() for name in inner.split(",")]
+
+
+def parse_column(definition: str) -> Column:
+    tokens = definition.split()
+    name = tokens[0].strip('"').lower()
+    rest = " ".join(tokens[1:])
+    # The type runs until the first constraint keyword, e.g. "varchar(255)" or "double precision"
+    match = re.match(r"(.+?)(?=\s+(?:not|null|primary|unique|default|references|check|generated|constraint)\b|$)",
+                     rest, re.I)
+    sql_type = re.sub(r"\s+", " ", match.group(1).strip().lower()) if match else rest.lower()
+    modifiers = rest[len(match.group(1)):].lower() if match else ""
+    references = re.search(r"references\s+\"?(?:\w+\.)?\"?(\w+)\"?", modifiers)
+    primary = "primary key" in modifiers
+    return Column(
+        name=name,
+        sql_type=sql_type + (" identity" if "generated" in modifiers and "identity" in modifiers else ""),
+        nullable=not primary and "not null" not in modifiers and "identity" not in modifiers,
+        primary_key=primary,
+        has_default=" default " in f" {modifiers} ",
+        references=references.group(1) if references else None,
+    )
+
+
+def parse_ddl(sql: str) -> Schema:
+    """Parse every CREATE TABLE statement in sql, ignoring all other statements."""
+    sql = re.sub(r"--[^\n]*", "", sql)
+    schema = Schema()
+    for match in _CREATE_TABLE.finditer(sql):
+        body, _ = _table_body(sql, match.end())
+        table = Table(name=match.group(1).lower())
+        constraints = []
+        for definition in _split_top_level(body):
+            if definition.split()[0].lower() in TABLE_CONSTRAINTS:
+                constraints.append(definition)
+            else:
+                table.columns.append(parse_column(definition))
+        columns = {column.name: column for column in table.columns}
+        for constraint in constraints:
+            lowered = constraint.lower()
+            if "primary key" in lowered:
+                for name in _names(lowered[lowered.index("primary key"):]):
+                    if name in columns:
+                        columns[name].primary_key, columns[name].nullable = True, False
+            elif "foreign key" in lowered:
+                target = re.search(r"references\s+\"?(?:\w+\.)?\"?(\w+)\"?", lowered)
+                for name in _names(lowered[lowered.index("foreign key"):]):
+                    if name in columns and target:
+                        columns[name].references = target.group(1)
+        schema.tables.append(table)
+    return schema
+
+
+def extract_ddl(markdown: str) -> str:
+    """All ```sql blocks of a Markdown document, joined."""
+    return "\n".join(_SQL_BLOCK.findall(markdown))
+
+
+# --- Renderers ---
+
+def _imports(schema: Schema) -> List[str]:
+    annotations = " ".join(column.python_type for table in schema.tables for column in table.columns)
+    lines = []
+    datetime_names = [name for name in ("date", "datetime") if re.search(rf"\b{name}\b", annotations)]
+    if datetime_names:
+        lines.append(f"from datetime import {', '.join(datetime_names)}")
+    if "Decimal" in annotations:
+        lines.append("from decimal import Decimal")
+    typing = [name for name in ("Any", "Dict", "List") if re.search(rf"\b{name}\b", annotations)]
+    if any(column.nullable or column.generated for table in schema.tables for column in table.columns):
+        typing.append("Optional")
+    if typing:
+        lines.append(f"from typing import {', '.join(typing)}")
+    if "UUID" in annotations:
+        lines.append("from uuid import UUID")
+    return lines
+
+
+def _field(column: Column, optional: bool) -> str:
+    if optional:
+        return f"    {column.name}: Optional[{column.python_type}] = None"
+    return f"    {column.name}: {column.python_type}"
+
+
+def render_models(schema: Schema) -> str:
+    lines = ['"""Pydantic models generated from the SQL schema in architectural_blueprint.md."""', ""]
+    lines += _imports(schema) + ["", "from pydantic import BaseModel"]
+    for table in schema.tables:
+        lines += ["", "", f"class {table.class_name}Create(BaseModel):",
+                  f'    """Columns a client provides when inserting into {table.name}."""']
+        writable = [column for column in table.columns if not column.generated]
+        lines += [_field(column, column.nullable) for column in writable] or ["    pass"]
+        lines += ["", "", f"class {table.class_name}({table.class_name}Create):",
+                  f'    """A row of {table.name}."""']
+        generated = [column for column in table.columns if column.generated]
+        lines += [_field(column, column.nullable and not column.primary_key) for column in generated] or ["    pass"]
+    return "\n".join(lines) + "\n"
+
+
+def render_repository(schema: Schema) -> str:
+    names = ", ".join(f"{table.class_name}, {table.class_name}Create" for table in schema.tables)
+    lines = ['"""Supabase data access generated from the SQL schema in architectural_blueprint.md."""', "",
+             "from typing import Any, List, Optional", "", "from supabase import Client", "",
+             f"from .models import {names}"]
+    for table in schema.tables:
+        cls, key = table.class_name, table.primary_key
+        lines += ["", "", f"class {cls}Repository:", f'    table = "{table.name}"', "",
+                  "    def __init__(self, client: Client):", "        self.client = client", "",
+                  f"    def list(self, limit: int = 100, offset: int = 0) -> List[{cls}]:",
+                  "        response = self.client.table(self.table).select(\"*\").range(offset, offset + limit - 1).execute()",
+                  f"        return [{cls}(**row) for row in response.data]", "",
+                  f"    def create(self, data: {cls}Create) -> {cls}:",
+                  "        response = self.client.table(self.table).insert(data.model_dump(mode=\"json\")).execute()",
+                  f"        return {cls}(**response.data[0])"]
+        if key is not None:
+            lines += ["",
+                      f"    def get(self, {key.name}: Any) -> Optional[{cls}]:",
+                      f"        response = self.client.table(self.table).select(\"*\").eq(\"{key.name}\", {key.name}).limit(1).execute()",
+                      f"        return {cls}(**response.data[0]) if response.data else None", "",
+                      f"    def delete(self, {key.name}: Any) -> None:",
+                      f"        self.client.table(self.table).delete().eq(\"{key.name}\", {key.name}).execute()"]
+    return "\n".join(lines) + "\n"
+
+
+def sample_rows(table: Table, count: int = 2) -> List[Dict[str, str]]:
+    """Deterministic sample rows as {column: Python literal}."""
+    rows = []
+    for n in range(1, count + 1):
+        row = {}
+        for column in table.columns:
+            annotation, sample = _type_entry(column.sql_type.rstrip("[]").replace(" identity", ""))
+            value = sample.format(n=n, column=column.name.replace("_", " ").capitalize())
+            row[column.name] = f"[{value}]" if column.sql_type.endswith("[]") else value
+        rows.append(row)
+    return rows
+
+
+def render_fixtures(schema: Schema) -> str:
+    body = []
+    for table in schema.tables:
+        body += ["", "", f"{table.name.upper()}_ROWS = ["]
+        for row in sample_rows(table):
+            fields = ", ".join(f'"{name}": {value}' for name, value in row.items())
+            body.append(f"    {{{fields}}},")
+        body += ["]", "", "", "@pytest.fixture", f"def {singular(table.name)}_rows():",
+                 f"    return copy.deepcopy({table.name.upper()}_ROWS)"]
+    samples = "\n".join(body)
+    lines = ['"""pytest fixtures generated from the SQL schema in architectural_blueprint.md."""', "", "import copy"]
+    datetime_names = [name for name in ("date", "datetime", "timezone") if f"{name}(" in samples or f"={name}." in samples]
+    if datetime_names:
+        lines.append(f"from datetime import {', '.join(datetime_names)}")
+    if "Decimal(" in samples:
+        lines.append("from decimal import Decimal")
+    lines.append("from unittest.mock import MagicMock")
+    if "UUID(" in samples:
+        lines.append("from uuid import UUID")
+    lines += ["", "import pytest"] + body
+    tables = ", ".join(f'"{table.name}": {table.name.upper()}_ROWS' for table in schema.tables)
+    lines += ["", "", "def make_query(rows):",
+              '    """A chainable Supabase query mock whose execute() returns rows."""',
+              "    query = MagicMock()",
+              '    for method in ("select", "insert", "update", "upsert", "delete", "eq", "neq", "in_",',
+              '                   "order", "range", "limit", "single"):',
+              "        getattr(query, method).return_value = query",
+              "    query.execute.return_value = MagicMock(data=copy.deepcopy(rows), count=len(rows))",
+              "    return query", "", "",
+              "@pytest.fixture", "def mock_supabase():",
+              '    """MagicMock Supabase client serving the sample rows of every table."""',
+              f"    tables = {{{tables}}}",
+              "    client = MagicMock()",
+              "    client.table.side_effect = lambda name: make_query(tables.get(name, []))",
+              "    return client"]
+    return "\n".join(lines) + "\n"
+
+
+def render_schema_manifest(schema: Schema) -> ArtifactManifest:
+    return ArtifactManifest(files=[
+        ArtifactFile(path="src/models.py", content=render_models(schema)),
+        ArtifactFile(path="src/repository.py", content=render_repository(schema)),
+        ArtifactFile(path="tests/conftest.py", content=render_fixtures(schema)),
+    ])
+
+
+def schema_context(schema: Schema) -> str:
+    """Compact summary of the generated code for downstream task descriptions."""
+    lines = ["Code generated from the blueprint's SQL schema already exists; import it instead of rewriting it:"]
+    for table in schema.tables:
+        columns = ", ".join(f"{c.name}: {c.python_type}{'?' if c.nullable else ''}" for c in table.columns)
+        key = table.primary_key.name if table.primary_key else None
+        methods = "list(limit, offset), create(data)" + (f", get({key}), delete({key})" if key else "")
+        lines.append(f"- {table.name}: src/models.py {table.class_name}({columns}) and {table.class_name}Create; "
+                     f"src/repository.py {table.class_name}Repository(client).{methods}")
+    fixtures = ", ".join(f"{singular(table.name)}_rows" for table in schema.tables)
+    lines.append(f"- tests/conftest.py fixtures: {fixtures}, mock_supabase (client.table(name) queries return the sample rows)")
+    return "\n".join(lines)
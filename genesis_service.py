@@ -0,0 +1,259 @@
+"""
+Genesis Service
+Keeps the Genesis Crew loaded in one long-lived process and accepts ideas
+over a local HTTP API, so tools and dashboards dispatch generations in
+milliseconds instead of paying a cold start (dotenv, agents, graph
+compilation) per run. Runs wait in a bounded in-memory queue served by a
+fixed pool of threads; when the queue is full, submissions are refused
+with 503 and Retry-After instead of piling up. Every run gets its own
+build directory.
+
+    python genesis_service.py --port 8765 --workers 2
+    curl -X POST localhost:8765/runs -H 'Content-Type: application/json' -d '{"idea": "A todo API"}'
+    curl localhost:8765/runs/<run_id>
+    curl -N localhost:8765/runs/<run_id>/events
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
+
+from genesis_profiler import profile_run
+from genesis_scheduler import PRIORITIES
+from genesis_store import commit_run
+from genesis_workspace import snapshot, use_workspace
+
+RUNS_DIR = os.getenv("GENESIS_SERVICE_RUNS_DIR", os.path.join(".genesis", "runs"))
+QUEUE_SIZE = int(os.getenv("GENESIS_SERVICE_QUEUE", "16"))
+WORKERS = int(os.getenv("GENESIS_SERVICE_WORKERS", "2"))
+# Finished runs kept for status queries; older ones are forgotten (their files stay on disk)
+HISTORY = int(os.getenv("GENESIS_SERVICE_HISTORY", "200"))
+EVENT_POLL = 0.2
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class RunRequest(BaseModel):
+    idea: str = Field(min_length=1)
+    priority: str = "interactive"
+    deadline_seconds: Optional[float] = Field(default=None, gt=0)
+    token_budget: Optional[int] = Field(default=None, gt=0)
+    cost_budget: Optional[float] = Field(default=None, gt=0)
+
+
+@dataclass
+class Run:
+    id: str
+    request: Dict[str, Any]
+    build_dir: str
+    status: str = QUEUED
+    submitted: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    node: Optional[str] = None
+    artifacts: List[str] = field(default_factory=list)
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    error: Optional[str] = None
+
+    def summary(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data.pop("events")
+        data["dispatch_latency"] = self.started - self.submitted if self.started else None
+        return data
+
+
+class GenesisService:
+    """Runs submitted ideas on warm graph and agents with a bounded backlog."""
+
+    def __init__(self, workers: int = WORKERS, queue_size: int = QUEUE_SIZE, runs_dir: str = RUNS_DIR):
+        self.runs_dir = runs_dir
+        self.workers = workers
+        self.backlog: "queue.Queue[Run]" = queue.Queue(maxsize=queue_size)
+        self.runs: "OrderedDict[str, Run]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._stopping = threading.Event()
+
+    def start(self) -> None:
+        # Importing builds the agents and compiles the graph once, before the first request
+        from genesis_crew_main import validate_environment
+
+        if not validate_environment():
+            raise RuntimeError("Environment validation failed, see above")
+
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"genesis-service-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        print(f"🔥 Genesis service warm: {self.workers} workers, backlog of {self.backlog.maxsize}")
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    # --- Submission ---
+
+    def submit(self, request: RunRequest) -> Run:
+        """Queue a run; raises queue.Full when the backlog is at capacity."""
+        run_id = uuid.uuid4().hex
+        run = Run(id=run_id, request=request.model_dump(), build_dir=os.path.join(self.runs_dir, run_id))
+        with self._lock:
+            run.events.append({"event": "queued", "time": run.submitted, "position": self.backlog.qsize() + 1})
+            self.backlog.put_nowait(run)
+            self.runs[run_id] = run
+        return run
+
+    def get(self, run_id: str) -> Optional[Run]:
+        with self._lock:
+            return self.runs.get(run_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for run in self.runs.values():
+                counts[run.status] = counts.get(run.status, 0) + 1
+        return {"workers": self.workers, "queued": self.backlog.qsize(), "capacity": self.backlog.maxsize, "runs": counts}
+
+    # --- Execution ---
+
+    def _event(self, run: Run, kind: str, **data: Any) -> None:
+        with self._lock:
+            run.events.append({"event": kind, "time": time.time(), **data})
+
+    def _forget_old_runs(self) -> None:
+        with self._lock:
+            finished = [run_id for run_id, run in self.runs.items() if run.status in (DONE, FAILED)]
+            for run_id in finished[:max(0, len(finished) - HISTORY)]:
+                del self.runs[run_id]
+
+    def _work(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                run = self.backlog.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            try:
+                self._execute(run)
+            finally:
+                self.backlog.task_done()
+                self._forget_old_runs()
+
+    def _execute(self, run: Run) -> None:
+        from genesis_crew_main import app, new_project_state
+
+        request = run.request
+        state = new_project_state(request["idea"], priority=request["priority"], run_id=run.id,
+                                  deadline_seconds=request["deadline_seconds"], token_budget=request["token_budget"],
+                                  cost_budget=request["cost_budget"])
+        os.makedirs(run.build_dir, exist_ok=True)
+        run.status, run.started = RUNNING, time.time()
+        self._event(run, "started")
+        try:
+            with use_workspace(run.build_dir), profile_run(lambda: os.path.join(run.build_dir, "profile")):
+                for state in app.stream(state, stream_mode="values"):
+                    if state.get("next_agent") != run.node:
+                        run.node = state.get("next_agent")
+                        run.artifacts = list(state.get("artifacts", []))
+                        self._event(run, "step", node=run.node, artifacts=len(run.artifacts),
+                                    tokens=state.get("tokens_used", 0), budget=state.get("budget_level"))
+            commit_run(run.id, run.build_dir)
+            status, outcome = DONE, {"files": sorted(snapshot(run.build_dir)),
+                                     "skipped": state.get("skipped_stages", []), "tokens": state.get("tokens_used", 0)}
+        except Exception as e:
+            run.error = str(e)
+            status, outcome = FAILED, {"error": str(e)}
+        run.finished = time.time()
+        # The last event goes out before the status changes, so event streams never miss it
+        self._event(run, status, **outcome)
+        run.status = status
+
+
+# --- HTTP API ---
+
+def create_app(service: GenesisService) -> FastAPI:
+    @asynccontextmanager
+    async def lifespan(api: FastAPI):
+        service.start()
+        yield
+        service.stop()
+
+    api = FastAPI(title="Genesis Service", lifespan=lifespan)
+
+    @api.post("/runs", status_code=202)
+    def submit_run(request: RunRequest):
+        if request.priority not in PRIORITIES:
+            raise HTTPException(status_code=422, detail=f"priority must be one of {sorted(PRIORITIES)}")
+        try:
+            run = service.submit(request)
+        except queue.Full:
+            return JSONResponse(status_code=503, headers={"Retry-After": "30"},
+                                content={"detail": f"Backlog full ({service.backlog.maxsize} runs), retry later"})
+        return {"run_id": run.id, "status": run.status, "status_url": f"/runs/{run.id}", "events_url": f"/runs/{run.id}/events"}
+
+    @api.get("/runs")
+    def list_runs():
+        with service._lock:
+            return [run.summary() for run in service.runs.values()]
+
+    @api.get("/runs/{run_id}")
+    def get_run(run_id: str):
+        run = service.get(run_id)
+        if run is None:
+            raise HTTPException(status_code=404, detail="Unknown run")
+        return run.summary()
+
+    @api.get("/runs/{run_id}/events")
+    async def stream_events(run_id: str):
+        """Server-sent events: every event of the run so far, then new ones until it ends."""
+        run = service.get(run_id)
+        if run is None:
+            raise HTTPException(status_code=404, detail="Unknown run")
+
+        async def events():
+            sent = 0
+            while True:
+                pending = run.events[sent:]
+                for event in pending:
+                    yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+                sent += len(pending)
+                if run.status in (DONE, FAILED) and sent == len(run.events):
+                    return
+                await asyncio.sleep(EVENT_POLL)
+
+        return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+    @api.get("/health")
+    def health():
+        return {"status": "ok", **service.stats()}
+
+    return api
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Genesis Crew as a long-lived local service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=WORKERS, help="runs executed at the same time")
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE, help="runs that may wait before 503")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    service = GenesisService(workers=args.workers, queue_size=args.queue_size)
+    uvicorn.run(create_app(service), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Shared SQLite Access for Genesis Crew
+The LLM scheduler, the job queue and the artifact store each coordinate the
+processes of one host through a SQLite file. They all open it the same way:
+one connection per thread, WAL journaling so readers never block the
+writer, a generous busy timeout, and BEGIN IMMEDIATE transactions so a
+read-then-write cannot lose a race to another process.
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+# Seconds a statement waits for another process's write lock before failing
+BUSY_TIMEOUT = 30.0
+
+
+class SQLiteDatabase:
+    """A SQLite file opened once per thread, created (with its directory) on first use."""
+
+    def __init__(self, path: str, row_factory: Optional[Callable[[sqlite3.Cursor, Any], Any]] = None):
+        self.path = path
+        self.row_factory = row_factory
+        self._local = threading.local()
+
+    def connection(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            # Autocommit mode: transactions are only the explicit ones below
+            db = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            if self.row_factory is not None:
+                db.row_factory = self.row_factory
+            self._local.db = db
+        return db
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Hold the write lock for the block; commit on success, roll back on any exception."""
+        db = self.connection()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
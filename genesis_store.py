@@ -0,0 +1,263 @@
+"""
+Content-Addressed Artifact Store for Genesis Crew
+With GENESIS_STORE set, every file a run writes is stored once per distinct
+content: blobs are keyed by their SHA-256, zlib-compressed, and written only
+if no run has produced the same bytes before. Run directories hold
+hardlinks to a shared read-only checkout of each blob (one per file mode,
+so scripts stay executable) instead of their own copies, so disk usage and write I/O grow with unique content, not with the
+number of runs. Committed runs reference their blobs in a SQLite index, and
+gc() removes blobs no run references any more.
+
+    python genesis_store.py stats
+    python genesis_store.py commit <run_id> ./build
+    python genesis_store.py checkout <run_id> ./restored
+    python genesis_store.py release <run_id>
+    python genesis_store.py gc
+"""
+
+import argparse
+import errno
+import hashlib
+import os
+import threading
+import time
+import zlib
+from typing import Dict, Optional, Tuple, Union
+
+from genesis_sqlite import SQLiteDatabase
+from genesis_workspace import IGNORED_DIRS, is_executable, replace_file
+
+STORE_ENABLED = os.getenv("GENESIS_STORE", "").lower() in ("1", "true", "yes")
+DEFAULT_STORE_DIR = os.getenv("GENESIS_STORE_DIR", os.path.join(".genesis", "store"))
+# Unreferenced blobs younger than this may belong to a run that has not been committed yet
+GC_GRACE = float(os.getenv("GENESIS_STORE_GC_GRACE", "3600"))
+COMPRESS_LEVEL = 6
+
+
+class ArtifactStore:
+    """Hash-keyed, compressed blobs with per-run references and hardlinked checkouts."""
+
+    def __init__(self, root: str = DEFAULT_STORE_DIR):
+        self.root = root
+        self._db = SQLiteDatabase(os.path.join(root, "index.db"))
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        os.makedirs(os.path.join(root, "checkout"), exist_ok=True)
+        with self._db.transaction() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS objects (digest TEXT PRIMARY KEY, size INTEGER, "
+                       "stored_size INTEGER, created REAL)")
+            db.execute("CREATE TABLE IF NOT EXISTS refs (run_id TEXT, path TEXT, digest TEXT, "
+                       "executable INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (run_id, path))")
+            columns = {row[1] for row in db.execute("PRAGMA table_info(refs)")}
+            if "executable" not in columns:
+                db.execute("ALTER TABLE refs ADD COLUMN executable INTEGER NOT NULL DEFAULT 0")
+            db.execute("CREATE INDEX IF NOT EXISTS refs_digest ON refs (digest)")
+
+    # --- Storage ---
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], digest[2:] + ".z")
+
+    def _checkout_path(self, digest: str, executable: bool = False) -> str:
+        # The mode belongs to the inode, so executable files get their own checkout
+        return os.path.join(self.root, "checkout", digest[:2], digest[2:] + (".x" if executable else ""))
+
+    # --- Blobs ---
+
+    def put(self, data: bytes) -> str:
+        """Store data and return its digest; content the store already has costs no write."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            replace_file(path, zlib.compress(data, COMPRESS_LEVEL))
+        # Refreshing created keeps gc() from collecting a reused blob before its run is committed
+        with self._db.transaction() as db:
+            db.execute("INSERT INTO objects (digest, size, stored_size, created) VALUES (?, ?, ?, ?) "
+                       "ON CONFLICT(digest) DO UPDATE SET created = excluded.created",
+                       (digest, len(data), os.path.getsize(path), time.time()))
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        with open(self._object_path(digest), "rb") as f:
+            return zlib.decompress(f.read())
+
+    def checkout(self, digest: str, executable: bool = False) -> str:
+        """Path of the shared, read-only uncompressed copy of a blob (created on first use)."""
+        path = self._checkout_path(digest, executable)
+        if not os.path.exists(path):
+            replace_file(path, self.get(digest))
+            os.chmod(path, 0o555 if executable else 0o444)
+        return path
+
+    def link(self, digest: str, target: str, executable: bool = False) -> None:
+        """Point target at a blob: a hardlink to its checkout, or a copy across filesystems."""
+        directory = os.path.dirname(target) or "."
+        os.makedirs(directory, exist_ok=True)
+        temp = os.path.join(directory, f".genesis-link-{os.getpid()}-{threading.get_ident()}")
+        if os.path.lexists(temp):
+            os.unlink(temp)
+        try:
+            try:
+                os.link(self.checkout(digest, executable), temp)
+            except FileNotFoundError:
+                # gc() dropped the checkout between creating and linking it
+                os.link(self.checkout(digest, executable), temp)
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+                raise
+            replace_file(target, self.get(digest), executable)
+            return
+        # Renaming over the old file never writes into it, so other links stay intact
+        os.replace(temp, target)
+
+    def write(self, target: str, data: bytes, executable: Optional[bool] = None) -> str:
+        """Store data and link target to it; executable=None keeps the mode of the file replaced."""
+        digest = self.put(data)
+        self.link(digest, target, is_executable(target) if executable is None else executable)
+        return digest
+
+    def _is_linked(self, path: str, digest: str, executable: bool) -> bool:
+        checkout = self._checkout_path(digest, executable)
+        return os.path.exists(checkout) and os.path.samefile(path, checkout)
+
+    # --- Runs ---
+
+    def commit(self, run_id: str, root: str) -> Dict[str, str]:
+        """Store every file under root, relink it to the store and make the run reference them."""
+        files: Dict[str, Tuple[str, bool]] = {}
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if d not in IGNORED_DIRS]
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                with open(path, "rb") as f:
+                    data = f.read()
+                digest = hashlib.sha256(data).hexdigest()
+                executable = is_executable(path)
+                if not self._is_linked(path, digest, executable):
+                    self.write(path, data, executable)
+                files[os.path.relpath(path, root).replace(os.sep, "/")] = (digest, executable)
+        with self._db.transaction() as db:
+            db.execute("DELETE FROM refs WHERE run_id = ?", (run_id,))
+            db.executemany("INSERT INTO refs (run_id, path, digest, executable) VALUES (?, ?, ?, ?)",
+                           [(run_id, path, digest, int(executable)) for path, (digest, executable) in files.items()])
+        return {path: digest for path, (digest, _) in files.items()}
+
+    def files(self, run_id: str) -> Dict[str, str]:
+        rows = self._db.connection().execute("SELECT path, digest FROM refs WHERE run_id = ?", (run_id,)).fetchall()
+        return dict(rows)
+
+    def materialize(self, run_id: str, dest: str) -> int:
+        """Recreate a committed run's files under dest as hardlinks into the store."""
+        rows = self._db.connection().execute(
+            "SELECT path, digest, executable FROM refs WHERE run_id = ?", (run_id,)).fetchall()
+        for path, digest, executable in rows:
+            self.link(digest, os.path.join(dest, *path.split("/")), bool(executable))
+        return len(rows)
+
+    def release(self, run_id: str) -> int:
+        """Drop a run's references; its blobs go at the next gc() unless another run uses them."""
+        with self._db.transaction() as db:
+            return db.execute("DELETE FROM refs WHERE run_id = ?", (run_id,)).rowcount
+
+    def gc(self, grace: float = GC_GRACE) -> Tuple[int, int]:
+        """
+        Delete unreferenced blobs older than grace seconds, and checkouts no
+        run directory links to any more. Returns (blobs removed, bytes freed).
+        """
+        with self._db.transaction() as db:
+            garbage = db.execute(
+                "SELECT digest, stored_size FROM objects WHERE created < ? "
+                "AND NOT EXISTS (SELECT 1 FROM refs WHERE refs.digest = objects.digest)",
+                (time.time() - grace,)).fetchall()
+            db.executemany("DELETE FROM objects WHERE digest = ?", [(digest,) for digest, _ in garbage])
+        freed = 0
+        for digest, stored_size in garbage:
+            for path in (self._object_path(digest), self._checkout_path(digest), self._checkout_path(digest, True)):
+                if os.path.exists(path):
+                    freed += os.path.getsize(path)
+                    os.unlink(path)
+        # A checkout with a single link is only a cache; the blob can recreate it
+        for dirpath, _, filenames in os.walk(os.path.join(self.root, "checkout")):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                stat = os.stat(path)
+                if stat.st_nlink == 1:
+                    freed += stat.st_size
+                    os.unlink(path)
+        return len(garbage), freed
+
+    def stats(self) -> Dict[str, int]:
+        db = self._db.connection()
+        objects, size, stored = db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored_size), 0) FROM objects").fetchone()
+        runs, logical = db.execute(
+            "SELECT COUNT(DISTINCT refs.run_id), COALESCE(SUM(objects.size), 0) "
+            "FROM refs JOIN objects ON objects.digest = refs.digest").fetchone()
+        return {"runs": runs, "objects": objects, "unique_bytes": size, "stored_bytes": stored, "logical_bytes": logical}
+
+
+_store: Optional[ArtifactStore] = None
+_store_lock = threading.Lock()
+
+
+def default_store() -> ArtifactStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ArtifactStore()
+        return _store
+
+
+def write_artifact(target: str, content: Union[str, bytes]) -> None:
+    """Write a build file, through the artifact store when GENESIS_STORE is set."""
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    if STORE_ENABLED:
+        default_store().write(target, data)
+    else:
+        replace_file(target, data)
+
+
+def commit_run(run_id: str, root: str) -> None:
+    """Commit a finished run's directory to the store (no-op without GENESIS_STORE)."""
+    if not STORE_ENABLED or not os.path.isdir(root):
+        return
+    files = default_store().commit(run_id, root)
+    print(f"🗄️ Committed {len(files)} files of run {run_id} to the artifact store")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Genesis Crew content-addressed artifact store")
+    parser.add_argument("--store", default=DEFAULT_STORE_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="show deduplication statistics")
+    commit = commands.add_parser("commit", help="store a run directory and link it to the store")
+    commit.add_argument("run_id")
+    commit.add_argument("root")
+    checkout = commands.add_parser("checkout", help="materialize a committed run with hardlinks")
+    checkout.add_argument("run_id")
+    checkout.add_argument("dest")
+    release = commands.add_parser("release", help="drop a run's references")
+    release.add_argument("run_id")
+    gc = commands.add_parser("gc", help="delete unreferenced blobs")
+    gc.add_argument("--grace", type=float, default=GC_GRACE, help="keep unreferenced blobs younger than this (seconds)")
+    args = parser.parse_args()
+
+    store = ArtifactStore(args.store)
+    if args.command == "stats":
+        stats = store.stats()
+        ratio = stats["logical_bytes"] / stats["stored_bytes"] if stats["stored_bytes"] else 0.0
+        print(f"🗄️ {stats['runs']} runs, {stats['objects']} blobs")
+        print(f"   - Logical: {stats['logical_bytes']} bytes, unique: {stats['unique_bytes']} bytes, "
+              f"stored: {stats['stored_bytes']} bytes ({ratio:.1f}x)")
+    elif args.command == "commit":
+        print(f"🗄️ Committed {len(store.commit(args.run_id, args.root))} files")
+    elif args.command == "checkout":
+        print(f"📦 Linked {store.materialize(args.run_id, args.dest)} files into {args.dest}")
+    elif args.command == "release":
+        print(f"🗑️ Released {store.release(args.run_id)} files")
+    elif args.command == "gc":
+        removed, freed = store.gc(args.grace)
+        print(f"🧹 Removed {removed} blobs, freed {freed} bytes")
+
+
+if __name__ == "__main__":
+    main()
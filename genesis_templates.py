@@ -0,0 +1,359 @@
+"""
+Deterministic DevOps Templates for Genesis Crew
+Renders the Dockerfile, requirements.txt, .env.example and docker-compose.yml
+from what the generated backend actually uses: the imports, environment
+variables and entrypoint of build/src, plus the port and Python version
+declared in the architectural blueprint. Stacks it does not recognise return
+None so the DevOps agent can write the files instead.
+"""
+
+import ast
+import os
+import re
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Set
+
+from genesis_assets import BUILD_SCRIPT
+from genesis_manifest import ArtifactFile, ArtifactManifest
+from genesis_workspace import BUILD_DIR, resolve_path
+
+# Pinned distribution for every third-party import the templates know about
+PACKAGES: Dict[str, str] = {
+    "fastapi": "fastapi==0.116.1",
+    "uvicorn": "uvicorn[standard]==0.35.0",
+    "supabase": "supabase==2.18.1",
+    "brotli_asgi": "brotli-asgi==1.4.0",
+    "flask": "Flask==3.1.1",
+    "gunicorn": "gunicorn==23.0.0",
+    "dotenv": "python-dotenv==1.1.1",
+    "httpx": "httpx==0.28.1",
+    "requests": "requests==2.32.4",
+    "jwt": "PyJWT==2.10.1",
+    "pydantic_settings": "pydantic-settings==2.10.1",
+    "rjsmin": "rjsmin==1.3.0",
+    "rcssmin": "rcssmin==1.3.0",
+    "brotli": "Brotli==1.2.0",
+}
+# Optional packages the frontend asset pipeline uses in the Dockerfile's assets stage
+ASSET_PACKAGES = ("rjsmin", "rcssmin", "brotli")
+
+# Imports that come with another distribution
+PROVIDED_BY = {"starlette": "fastapi", "pydantic": "fastapi", "werkzeug": "flask", "jinja2": "flask",
+               "postgrest": "supabase", "gotrue": "supabase", "storage3": "supabase"}
+
+
+@dataclass
+class Framework:
+    name: str
+    server: str
+    default_port: int
+    app_class: str
+
+
+FRAMEWORKS = {
+    "fastapi": Framework("fastapi", "uvicorn", 8000, "FastAPI"),
+    "flask": Framework("flask", "gunicorn", 5000, "Flask"),
+}
+
+DEFAULT_PYTHON = "3.11"
+
+
+@dataclass
+class EnvVar:
+    default: Optional[str] = None
+    """The code's default, when it is a string constant."""
+    has_default: bool = False
+    """Whether a lookup falls back to anything (a constant or not) when unset."""
+    required: bool = False
+    """Read as os.environ[...], which fails when unset."""
+
+
+@dataclass
+class StackSpec:
+    framework: Framework
+    imports: Set[str]
+    port: int
+    python: str = DEFAULT_PYTHON
+    app_name: str = "app"
+    has_main: bool = False
+    has_frontend: bool = False
+    """Whether the asset pipeline left build_assets.py to build frontend/dist in the image."""
+    env: Dict[str, EnvVar] = field(default_factory=dict)
+    """Environment variables read by the code."""
+
+
+def _read(relative: str) -> Optional[str]:
+    path = resolve_path(os.path.join(BUILD_DIR, relative))
+    if not os.path.isfile(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _source_files() -> Dict[str, str]:
+    root = resolve_path(os.path.join(BUILD_DIR, "src"))
+    sources = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d != "__pycache__"]
+        for name in filenames:
+            if name.endswith(".py"):
+                relative = os.path.relpath(os.path.join(dirpath, name), resolve_path(BUILD_DIR))
+                sources[relative] = _read(relative)
+    return sources
+
+
+def _local_modules(sources: Dict[str, str]) -> Set[str]:
+    names = {"src"}
+    for path in sources:
+        parts = path.split(os.sep)[1:]
+        names.add(os.path.splitext(parts[0])[0])
+    return names
+
+
+def _constant(node: ast.AST) -> Optional[str]:
+    return node.value if isinstance(node, ast.Constant) and isinstance(node.value, str) else None
+
+
+def _is_environ(node: ast.AST) -> bool:
+    return isinstance(node, ast.Attribute) and node.attr == "environ"
+
+
+def collect_env(tree: ast.AST, env: Dict[str, EnvVar]) -> None:
+    """Record os.getenv / os.environ.get / os.environ[...] lookups and their defaults."""
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call) and node.args and isinstance(node.func, ast.Attribute):
+            getter = node.func.attr == "getenv" or (node.func.attr == "get" and _is_environ(node.func.value))
+            name = _constant(node.args[0])
+            if getter and name:
+                var = env.setdefault(name, EnvVar())
+                fallback = node.args[1] if len(node.args) > 1 else next(
+                    (keyword.value for keyword in node.keywords if keyword.arg == "default"), None)
+                if fallback is not None:
+                    var.has_default = True
+                    var.default = _constant(fallback) if var.default is None else var.default
+        elif isinstance(node, ast.Subscript) and _is_environ(node.value):
+            name = _constant(node.slice)
+            if name:
+                env.setdefault(name, EnvVar()).required = True
+
+
+def _as_port(value: object) -> Optional[int]:
+    text = str(value).strip() if value is not None else ""
+    return int(text) if text.isdigit() and 0 < int(text) < 65536 else None
+
+
+def _code_port(tree: ast.AST) -> Optional[int]:
+    """A constant port= passed to the server, e.g. uvicorn.run(app, port=8000)."""
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call):
+            for keyword in node.keywords:
+                if keyword.arg == "port" and isinstance(keyword.value, ast.Constant):
+                    return _as_port(keyword.value.value)
+    return None
+
+
+# Ways a blueprint states the app's own port; lines about a database are skipped
+_PORT_PATTERNS = (
+    re.compile(r"--port[ =](\d{4,5})\b"),
+    re.compile(r"\bPORT\s*[=:]\s*(\d{4,5})\b"),
+    re.compile(r"(?:localhost|127\.0\.0\.1|0\.0\.0\.0):(\d{4,5})\b"),
+    re.compile(r"\b(?:app|api|server|application|backend|service|uvicorn|gunicorn)\b[^\n]{0,40}?\bport\s+(\d{4,5})\b", re.I),
+)
+_DATABASE = re.compile(r"postgres|mysql|mariadb|redis|mongo|database|supabase|\bdb\b", re.I)
+
+
+def _blueprint_port(blueprint: str) -> Optional[int]:
+    for line in blueprint.splitlines():
+        if _DATABASE.search(line):
+            continue
+        for pattern in _PORT_PATTERNS:
+            match = pattern.search(line)
+            if match:
+                return _as_port(match.group(1))
+    return None
+
+
+def _blueprint_python(blueprint: str) -> Optional[str]:
+    match = re.search(r"\bPython\s+(3\.\d{1,2})\b", blueprint)
+    return match.group(1) if match else None
+
+
+def detect_stack() -> Optional[StackSpec]:
+    """Inspect build/src and the blueprint; None if anything is outside the known stacks."""
+    sources = _source_files()
+    main_source = sources.get(os.path.join("src", "main.py"))
+    if not main_source:
+        print("ℹ️ No build/src/main.py to derive DevOps files from")
+        return None
+    local = _local_modules(sources)
+    imports: Set[str] = set()
+    env: Dict[str, EnvVar] = {}
+    for path, source in sources.items():
+        try:
+            tree = ast.parse(source, filename=path)
+        except SyntaxError as e:
+            print(f"ℹ️ Cannot parse {path}: {e}")
+            return None
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                imports.update(alias.name.split(".")[0] for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                imports.add(node.module.split(".")[0])
+        collect_env(tree, env)
+    third_party = {name for name in imports if name not in sys.stdlib_module_names and name not in local}
+    unknown = sorted(name for name in third_party if name not in PACKAGES and name not in PROVIDED_BY)
+    frameworks = [FRAMEWORKS[name] for name in FRAMEWORKS if name in third_party]
+    if unknown or len(frameworks) != 1:
+        print(f"ℹ️ Unrecognized stack (frameworks: {[f.name for f in frameworks]}, unknown imports: {unknown})")
+        return None
+    framework = frameworks[0]
+
+    main_tree = ast.parse(main_source)
+    app_name = "app"
+    for node in main_tree.body:
+        if (isinstance(node, ast.Assign) and isinstance(node.value, ast.Call)
+                and getattr(node.value.func, "id", None) == framework.app_class
+                and isinstance(node.targets[0], ast.Name)):
+            app_name = node.targets[0].id
+    has_main = "__main__" in main_source and framework.server in imports
+
+    blueprint = _read("architectural_blueprint.md") or ""
+    port = (_as_port(env["PORT"].default if "PORT" in env else None) or _code_port(main_tree)
+            or _blueprint_port(blueprint) or framework.default_port)
+    return StackSpec(framework=framework, imports=third_party | {framework.server}, port=port,
+                     python=_blueprint_python(blueprint) or DEFAULT_PYTHON,
+                     app_name=app_name, has_main=has_main, env=env,
+                     has_frontend=os.path.isfile(resolve_path(os.path.join(BUILD_DIR, BUILD_SCRIPT))))
+
+
+# --- Renderers ---
+
+def render_requirements(spec: StackSpec) -> str:
+    names = sorted(spec.imports - set(PROVIDED_BY), key=lambda name: (name not in FRAMEWORKS, name != spec.framework.server, name))
+    return "\n".join(PACKAGES[name] for name in names) + "\n"
+
+
+def render_command(spec: StackSpec) -> str:
+    if spec.has_main:
+        return 'CMD ["python", "-m", "src.main"]'
+    if spec.framework.server == "uvicorn":
+        # uvicorn reads WEB_CONCURRENCY for its worker count
+        return f'CMD ["sh", "-c", "uvicorn src.main:{spec.app_name} --host $HOST --port $PORT --proxy-headers"]'
+    return f'CMD ["sh", "-c", "gunicorn --bind $HOST:$PORT --workers ${{WEB_CONCURRENCY:-2}} src.main:{spec.app_name}"]'
+
+
+def render_assets_stage(spec: StackSpec) -> str:
+    if not spec.has_frontend:
+        return ""
+    return f"""# --- Assets stage: bundle, hash and precompress the frontend ---
+FROM python:{spec.python}-slim AS assets
+
+WORKDIR /app
+
+# Full JS/CSS minification and brotli variants
+RUN pip install --no-cache-dir {" ".join(PACKAGES[name] for name in ASSET_PACKAGES)}
+
+COPY {BUILD_SCRIPT} .
+COPY frontend ./frontend
+RUN python {BUILD_SCRIPT} frontend
+
+"""
+
+
+def render_dockerfile(spec: StackSpec) -> str:
+    frontend = "COPY --from=assets /app/frontend/dist ./frontend/dist\n" if spec.has_frontend else ""
+    return f"""{render_assets_stage(spec)}# --- Build stage: resolve wheels once ---
+FROM python:{spec.python}-slim AS builder
+
+WORKDIR /app
+
+# Copy the requirements file into the container
+COPY requirements.txt .
+
+# Build wheels for all dependencies
+RUN pip wheel --no-cache-dir --wheel-dir /wheels -r requirements.txt
+
+# --- Runtime stage ---
+FROM python:{spec.python}-slim
+
+ENV PYTHONDONTWRITEBYTECODE=1 \\
+    PYTHONUNBUFFERED=1 \\
+    HOST=0.0.0.0 \\
+    PORT={spec.port}
+
+# Set the working directory
+WORKDIR /app
+
+# Install dependencies from the prebuilt wheels
+COPY --from=builder /wheels /wheels
+RUN pip install --no-cache-dir /wheels/* && rm -rf /wheels
+
+# Copy the application code{" and the built frontend" if spec.has_frontend else ""} into the container
+COPY src ./src
+{frontend}
+# Run as an unprivileged user
+RUN useradd --create-home appuser
+USER appuser
+
+EXPOSE {spec.port}
+
+STOPSIGNAL SIGTERM
+
+# Command to run the application
+{render_command(spec)}
+"""
+
+
+def _is_secret(name: str) -> bool:
+    return bool(re.search(r"URL|KEY|TOKEN|SECRET|PASSWORD|DSN", name))
+
+
+def render_env_example(spec: StackSpec) -> str:
+    """
+    Only variables the code cannot do without are set: compose loads this
+    file, and an empty value would replace the code's default.
+    """
+    lines = []
+    needed = [name for name, var in spec.env.items() if var.required or (not var.has_default and _is_secret(name))]
+    optional = [name for name in spec.env if name not in needed and name not in ("HOST", "PORT")]
+    for name in needed:
+        # Credentials and endpoints get a placeholder, anything else is left empty
+        lines.append(f"{name}=your_{name.lower()}_here" if _is_secret(name) else f"{name}=")
+    if optional:
+        lines.append("# Optional: the code's defaults are used when unset")
+        lines.extend(f"# {name}={spec.env[name].default or ''}" for name in optional)
+    return "\n".join(lines) + "\n"
+
+
+def render_compose(spec: StackSpec) -> str:
+    grace = spec.env["GRACEFUL_SHUTDOWN_TIMEOUT"].default if "GRACEFUL_SHUTDOWN_TIMEOUT" in spec.env else None
+    stop = ("    # Must exceed GRACEFUL_SHUTDOWN_TIMEOUT so in-flight requests can drain\n"
+            f"    stop_grace_period: {int(grace) + 10}s\n") if grace and grace.isdigit() else ""
+    return f"""version: '3.8'
+
+services:
+  app:
+    build: .
+    ports:
+      - "{spec.port}:{spec.port}"
+    env_file:
+      - .env.example
+    environment:
+      - PORT={spec.port}
+{stop}    restart: unless-stopped
+"""
+
+
+def render_devops_manifest() -> Optional[ArtifactManifest]:
+    """All DevOps files for the current build, or None if the stack is not recognized."""
+    spec = detect_stack()
+    if spec is None:
+        return None
+    print(f"⚡ Rendering DevOps files for {spec.framework.name} on port {spec.port}")
+    return ArtifactManifest(files=[
+        ArtifactFile(path="Dockerfile", content=render_dockerfile(spec)),
+        ArtifactFile(path="requirements.txt", content=render_requirements(spec)),
+        ArtifactFile(path=".env.example", content=render_env_example(spec)),
+        ArtifactFile(path="docker-compose.yml", content=render_compose(spec)),
+    ])
@@ -0,0 +1,222 @@
+"""
+Tool Base Layer for Genesis Crew
+FastTool extends the crewAI BaseTool + args_schema pattern with the plumbing
+every tool needs: memoization keyed on validated arguments, per-call
+timeouts, output truncation to a token budget, native async support and
+per-tool timing metrics. Tools implement _execute (and optionally
+_aexecute) instead of _run.
+
+A timed-out call cannot be killed: its thread keeps running. Each call gets
+its own cancel scope that is set on timeout, so tools with side effects
+call check_cancelled() right before them and a late call changes nothing.
+"""
+
+import asyncio
+import contextvars
+import json
+import os
+import threading
+import time
+from abc import abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, PrivateAttr
+
+from genesis_budget import Cancelled, cancel_scope
+from genesis_profiler import profile_scope
+
+# Rough characters-per-token ratio used for output budgets
+CHARS_PER_TOKEN = 4
+
+# Worker threads that enforce per-call timeouts for synchronous tools
+_executor = ThreadPoolExecutor(max_workers=int(os.getenv("GENESIS_TOOL_WORKERS", "16")),
+                               thread_name_prefix="genesis-tool")
+
+
+@dataclass
+class ToolMetrics:
+    calls: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    cache_hits: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+
+    @property
+    def avg_time(self) -> float:
+        executed = self.calls - self.cache_hits
+        return self.total_time / executed if executed else 0.0
+
+
+_metrics: Dict[str, ToolMetrics] = {}
+_metrics_lock = threading.Lock()
+
+
+def _record(name: str, elapsed: float = 0.0, error: bool = False, timeout: bool = False, cache_hit: bool = False) -> None:
+    with _metrics_lock:
+        metrics = _metrics.setdefault(name, ToolMetrics())
+        metrics.calls += 1
+        metrics.errors += error
+        metrics.timeouts += timeout
+        metrics.cache_hits += cache_hit
+        metrics.total_time += elapsed
+        metrics.max_time = max(metrics.max_time, elapsed)
+
+
+def tool_metrics() -> Dict[str, ToolMetrics]:
+    """Snapshot of the timing metrics of every FastTool used in this process."""
+    with _metrics_lock:
+        return {name: ToolMetrics(**vars(metrics)) for name, metrics in _metrics.items()}
+
+
+def print_tool_metrics() -> None:
+    metrics = tool_metrics()
+    if not metrics:
+        return
+    print("\n🛠️ Tool metrics:")
+    for name, m in sorted(metrics.items()):
+        print(f"   - {name}: {m.calls} calls, {m.cache_hits} cached, {m.errors} errors, "
+              f"{m.timeouts} timeouts, avg {m.avg_time:.2f}s, max {m.max_time:.2f}s")
+
+
+def truncate_output(text: str, max_tokens: Optional[int]) -> str:
+    """Trim text to roughly max_tokens, keeping its head and tail."""
+    if not max_tokens or len(text) <= max_tokens * CHARS_PER_TOKEN:
+        return text
+    budget = max_tokens * CHARS_PER_TOKEN
+    head, tail = text[:budget * 2 // 3], text[-(budget // 3):]
+    dropped = (len(text) - len(head) - len(tail)) // CHARS_PER_TOKEN
+    return f"{head}\n... [truncated ~{dropped} tokens] ...\n{tail}"
+
+
+class FastTool(BaseTool):
+    """
+    BaseTool with memoization, timeouts, output limits, async and metrics.
+    Subclasses must set args_schema and implement _execute; _aexecute may
+    add a native async version. Tools that write call check_cancelled()
+    before writing.
+    """
+    cache_ttl: Optional[float] = None
+    """Seconds a result stays memoized; None disables memoization."""
+    cache_size: int = 128
+    timeout: Optional[float] = 60.0
+    """Seconds before a call is abandoned; None waits forever."""
+    max_output_tokens: Optional[int] = 4000
+
+    _cache: "OrderedDict[Hashable, Tuple[float, str]]" = PrivateAttr(default_factory=OrderedDict)
+    _cache_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    # --- Extension points ---
+
+    @abstractmethod
+    def _execute(self, **kwargs: Any) -> Any:
+        """Synchronous implementation."""
+
+    async def _aexecute(self, **kwargs: Any) -> Any:
+        """Asynchronous implementation. Defaults to running _execute in a thread."""
+        return await asyncio.to_thread(contextvars.copy_context().run, lambda: self._execute(**kwargs))
+
+    def cache_key(self, args: BaseModel) -> Optional[Hashable]:
+        """Memoization key for validated arguments; return None to skip the cache."""
+        return json.dumps(args.model_dump(mode="json"), sort_keys=True)
+
+    def format_error(self, error: Exception, **kwargs: Any) -> str:
+        return f"Error running {self.name}: {error}"
+
+    # --- Plumbing ---
+
+    def _validate(self, kwargs: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[Hashable]]:
+        args = self.args_schema(**kwargs)
+        key = self.cache_key(args) if self.cache_ttl is not None else None
+        return args.model_dump(), key
+
+    def _cached(self, key: Optional[Hashable]) -> Optional[str]:
+        if key is None:
+            return None
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > self.cache_ttl:
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return entry[1]
+
+    def _store(self, key: Optional[Hashable], result: str) -> None:
+        if key is None:
+            return
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic(), result)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _finish(self, key: Optional[Hashable], started: float, result: Any) -> str:
+        output = truncate_output(str(result), self.max_output_tokens)
+        self._store(key, output)
+        _record(self.name, time.perf_counter() - started)
+        return output
+
+    def _fail(self, started: float, error: Exception, timed_out: bool = False, **kwargs: Any) -> str:
+        _record(self.name, time.perf_counter() - started, error=True, timeout=timed_out)
+        if timed_out:
+            return f"Error running {self.name}: timed out after {self.timeout}s"
+        return self.format_error(error, **kwargs)
+
+    def _profiled_execute(self, kwargs: Dict[str, Any]) -> Any:
+        with profile_scope(f"tool:{self.name}"):
+            return self._execute(**kwargs)
+
+    def _run(self, **kwargs: Any) -> str:
+        started = time.perf_counter()
+        try:
+            kwargs, key = self._validate(kwargs)
+            cached = self._cached(key)
+            if cached is not None:
+                _record(self.name, cache_hit=True)
+                return cached
+            # Run in the tool pool so the timeout can be enforced; copy the
+            # context so the active workspace and the call's cancel scope follow it.
+            with cancel_scope(threading.Event()) as stop:
+                context = contextvars.copy_context()
+            future = _executor.submit(context.run, self._profiled_execute, kwargs)
+            try:
+                result = future.result(timeout=self.timeout)
+            except FutureTimeoutError:
+                stop.set()
+                raise
+            return self._finish(key, started, result)
+        except Cancelled:
+            raise
+        except FutureTimeoutError as e:
+            return self._fail(started, e, timed_out=True, **kwargs)
+        except Exception as e:
+            return self._fail(started, e, **kwargs)
+
+    async def _arun(self, **kwargs: Any) -> str:
+        started = time.perf_counter()
+        try:
+            kwargs, key = self._validate(kwargs)
+            cached = self._cached(key)
+            if cached is not None:
+                _record(self.name, cache_hit=True)
+                return cached
+            with cancel_scope(threading.Event()) as stop, profile_scope(f"tool:{self.name}"):
+                try:
+                    result = await asyncio.wait_for(self._aexecute(**kwargs), timeout=self.timeout)
+                except asyncio.TimeoutError:
+                    # The default _aexecute thread outlives the awaiting task
+                    stop.set()
+                    raise
+            return self._finish(key, started, result)
+        except Cancelled:
+            raise
+        except asyncio.TimeoutError as e:
+            return self._fail(started, e, timed_out=True, **kwargs)
+        except Exception as e:
+            return self._fail(started, e, **kwargs)
@@ -0,0 +1,151 @@
+"""
+Verification Stage for Genesis Crew
+Runs the generated pytest suite in an isolated subprocess against a copy of
+the build directory and condenses failures into compact, per-file feedback
+that can be routed back to the agent that owns the failing file.
+"""
+
+import glob
+import os
+import re
+import sys
+import tempfile
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from genesis_sampling import has_tests, run_check, sandbox_env
+from genesis_workspace import create_workspace, discard
+
+VERIFY_TIMEOUT = int(os.getenv("GENESIS_VERIFY_TIMEOUT", "300"))
+MAX_REPAIRS = int(os.getenv("GENESIS_MAX_REPAIRS", "2"))
+
+# "path/to/file.py:12: in func" / "path/to/file.py:12: AssertionError"
+_FRAME = re.compile(r"^(?P<path>[^\s:]+\.py):(?P<line>\d+):", re.M)
+# "ERROR collecting tests/test_main.py" / "ImportError while importing test module '/abs/tests/test_main.py'"
+_COLLECTION_ERROR = re.compile(r"(?:ERROR collecting |importing test module ')(?P<path>[^\s']+\.py)")
+
+
+@dataclass
+class TestFailure:
+    test: str
+    file: str
+    owner: str
+    message: str
+
+    def compact(self) -> str:
+        return f"- {self.test} [{self.file}]: {self.message}"
+
+
+@dataclass
+class VerificationReport:
+    passed: bool
+    tests_passed: int = 0
+    failures: List[TestFailure] = field(default_factory=list)
+    output: str = ""
+
+    def owners(self) -> List[str]:
+        """Agents with failures to fix, backend first since tests depend on it."""
+        found = {failure.owner for failure in self.failures}
+        return [owner for owner in ("BackendDeveloper", "QAEngineer") if owner in found]
+
+    def files_for(self, owner: str) -> List[str]:
+        return sorted({failure.file for failure in self.failures if failure.owner == owner})
+
+    def feedback_for(self, owner: str) -> str:
+        return "\n".join(failure.compact() for failure in self.failures if failure.owner == owner)
+
+
+def attribute_failure(text: str, root: str) -> str:
+    """Return the deepest traceback frame that points at a file inside the workspace."""
+    for match in reversed(list(_FRAME.finditer(text))):
+        path = match.group("path")
+        if not os.path.isabs(path) and os.path.exists(os.path.join(root, path)):
+            return os.path.normpath(path)
+    return ""
+
+
+def suite_failures(output: str, root: str, message: str) -> List[TestFailure]:
+    """
+    Failures of the suite as a whole (collection errors, a crash or a timeout)
+    pinned on files an agent can open: the deepest workspace frame, the test
+    modules that failed to collect, else every test module, else conftest.py.
+    """
+    files = []
+    culprit = attribute_failure(output, root)
+    if culprit:
+        files.append(culprit)
+    for match in _COLLECTION_ERROR.finditer(output):
+        path = match.group("path")
+        rel = os.path.normpath(os.path.relpath(path, root) if os.path.isabs(path) else path)
+        if os.path.isfile(os.path.join(root, rel)) and rel not in files:
+            files.append(rel)
+    if not files:
+        files = sorted(os.path.relpath(path, root) for path in glob.glob(os.path.join(root, "tests", "test_*.py")))
+    if not files:
+        files = [os.path.join("tests", "conftest.py")]
+    return [TestFailure("tests", path, owner_for(path), message) for path in files]
+
+
+def owner_for(path: str) -> str:
+    name = os.path.basename(path)
+    if path.startswith("tests" + os.sep) or name.startswith("test_") or name == "conftest.py":
+        return "QAEngineer"
+    return "BackendDeveloper"
+
+
+def summarize_message(element: ET.Element) -> str:
+    lines = [line[1:].strip() for line in (element.text or "").splitlines() if line.startswith("E ")]
+    message = " ".join(lines[:2]) or element.get("message", "")
+    return message[:240]
+
+
+def parse_junit(path: str, root: str) -> VerificationReport:
+    tree = ET.parse(path)
+    report = VerificationReport(passed=True)
+    for case in tree.iter("testcase"):
+        problem = case.find("failure")
+        if problem is None:
+            problem = case.find("error")
+        if problem is None:
+            if case.find("skipped") is None:
+                report.tests_passed += 1
+            continue
+        test_file = case.get("file") or case.get("classname", "").replace(".", os.sep) + ".py"
+        test_id = f"{test_file}::{case.get('name')}"
+        culprit = attribute_failure(problem.text or "", root) or os.path.normpath(test_file)
+        report.failures.append(TestFailure(test_id, culprit, owner_for(culprit), summarize_message(problem)))
+    report.passed = not report.failures
+    return report
+
+
+def verify_workspace(root: Optional[str] = None) -> VerificationReport:
+    """
+    Run the workspace's test suite in a sandboxed copy and return a structured
+    report. root defaults to the real build directory.
+    """
+    sandbox = create_workspace(prefix="genesis-verify-") if root is None else None
+    workdir = sandbox or root
+    junit_dir = tempfile.mkdtemp(prefix="genesis-junit-")
+    junit_path = os.path.join(junit_dir, "report.xml")
+    try:
+        if not has_tests(workdir):
+            return VerificationReport(passed=True, output="No tests found.")
+        command = [sys.executable, "-m", "pytest", "-q", "--tb=short", "-p", "no:cacheprovider",
+                   "-o", "junit_family=xunit1", f"--junitxml={junit_path}", "tests"]
+        result = run_check(command, cwd=workdir, timeout=VERIFY_TIMEOUT, env=sandbox_env())
+        output = (result.stdout + result.stderr).strip()
+        last_line = output.splitlines()[-1] if output else "pytest did not run"
+        if not os.path.exists(junit_path):
+            # Timed out or pytest itself failed before writing the report
+            return VerificationReport(passed=False, output=output, failures=suite_failures(output, workdir, last_line))
+        report = parse_junit(junit_path, workdir)
+        report.output = output
+        if result.returncode not in (0, 5) and report.passed:
+            report.passed = False
+            report.failures.extend(suite_failures(output, workdir, last_line))
+        return report
+    finally:
+        discard(junit_dir)
+        if sandbox:
+            discard(sandbox)
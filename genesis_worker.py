@@ -0,0 +1,248 @@
+"""
+Distributed Workers for Genesis Crew
+Runs generation jobs from the job queue so batch generation scales across
+processes and build hosts. An "idea" job runs the whole graph on one worker
+and checkpoints the state after every step. A "node" job runs a single
+Orchestrator + node step and enqueues the next step as a new job, so
+consecutive nodes of one run can land on different hosts. Files a step writes
+are stored with the run in the queue, and every job starts from a fresh
+workspace restored from them.
+
+    python genesis_worker.py submit "A todo app with FastAPI" --per-node
+    python genesis_worker.py work --processes 4
+    python genesis_worker.py status <run_id>
+    python genesis_worker.py fetch <run_id> ./build
+"""
+
+import argparse
+import multiprocessing
+import os
+import socket
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from genesis_profiler import profile_run
+from genesis_queue import DEFAULT_QUEUE_URL, Job, JobQueue, LeaseLost, open_queue
+from genesis_scheduler import PRIORITIES
+from genesis_store import commit_run
+from genesis_workspace import changed_files, discard, replace_file, snapshot, use_workspace
+
+POLL_INTERVAL = float(os.getenv("GENESIS_WORKER_POLL", "1.0"))
+
+
+class Heartbeat:
+    """Renews a job's lease in the background while the job runs."""
+
+    def __init__(self, queue: JobQueue, job: Job):
+        self.queue = queue
+        self.job = job
+        self.lost = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"heartbeat-{job.id}", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.queue.lease / 3):
+            try:
+                self.queue.heartbeat(self.job)
+            except LeaseLost:
+                self.lost.set()
+                return
+
+    def __enter__(self) -> "Heartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+# --- Artifacts ---
+
+@contextmanager
+def run_workspace(queue: JobQueue, run_id: str) -> Iterator[str]:
+    """A fresh './build' for this job, restored from the run's stored artifacts."""
+    root = tempfile.mkdtemp(prefix=f"genesis-job-{run_id[:8]}-")
+    try:
+        write_artifacts(queue.get_artifacts(run_id), root)
+        with use_workspace(root):
+            yield root
+    finally:
+        discard(root)
+
+
+def write_artifacts(files: Dict[str, bytes], root: str) -> None:
+    for rel, content in files.items():
+        replace_file(os.path.join(root, rel), content)
+
+
+def save_artifacts(queue: JobQueue, job: Job, root: str, baseline: Dict[str, str]) -> Dict[str, str]:
+    """Upload files changed since baseline, fenced by job's lease, and return the new baseline."""
+    files = {}
+    for rel in changed_files(root, baseline):
+        with open(os.path.join(root, rel), "rb") as f:
+            files[rel] = f.read()
+    queue.put_artifacts(job, files)
+    return snapshot(root)
+
+
+# --- Job handlers ---
+
+def run_idea_job(queue: JobQueue, job: Job, heartbeat: Heartbeat) -> None:
+    from genesis_crew_main import app
+
+    # Resume from the last checkpoint: the Orchestrator picks up at its next_agent
+    state = job.checkpoint or job.payload["state"]
+    with run_workspace(queue, job.run_id) as root:
+        baseline = snapshot(root)
+        with profile_run(lambda: os.path.join(root, "profile")):
+            for state in app.stream(state, stream_mode="values"):
+                if heartbeat.lost.is_set():
+                    raise LeaseLost(f"job {job.id} lost its lease")
+                # Artifacts first, so a checkpoint never refers to files that were not stored
+                baseline = save_artifacts(queue, job, root, baseline)
+                queue.checkpoint(job, state)
+        save_artifacts(queue, job, root, baseline)
+    queue.complete(job, {"artifacts": state.get("artifacts", [])})
+
+
+def node_job_id(run_id: str, step: int) -> str:
+    return f"{run_id}:{step}"
+
+
+def run_node_job(queue: JobQueue, job: Job, heartbeat: Heartbeat) -> None:
+    from genesis_crew_main import NODES, run_orchestrator
+
+    step = job.payload["step"]
+    next_id = node_job_id(job.run_id, step + 1)
+    if queue.get(next_id) is not None:
+        # A previous attempt finished this step and died before completing the job
+        queue.complete(job, {"next_job": next_id})
+        return
+    state = run_orchestrator(job.payload["state"])
+    if state["next_agent"] == "Finish":
+        queue.complete(job, {"artifacts": state.get("artifacts", [])})
+        return
+    with run_workspace(queue, job.run_id) as root:
+        baseline = snapshot(root)
+        with profile_run(lambda: os.path.join(root, "profile", f"step-{step:03d}")):
+            state = NODES[state["next_agent"]](state)
+        if heartbeat.lost.is_set():
+            raise LeaseLost(f"job {job.id} lost its lease")
+        save_artifacts(queue, job, root, baseline)
+    # The step's job id is deterministic, so a retried step cannot enqueue twice, and the
+    # fence keeps a worker that lost this job from handing on a state the new owner will redo
+    queue.enqueue("node", {"state": state, "step": step + 1}, run_id=job.run_id, job_id=next_id,
+                  priority=PRIORITIES.get(state.get("priority"), 0), fence=job)
+    queue.complete(job, {"next_job": next_id})
+
+
+HANDLERS = {"idea": run_idea_job, "node": run_node_job}
+
+
+def run_job(queue: JobQueue, job: Job) -> None:
+    print(f"🧱 Job {job.id} ({job.kind}, attempt {job.attempts}) claimed by {job.worker}")
+    with Heartbeat(queue, job) as heartbeat:
+        try:
+            HANDLERS[job.kind](queue, job, heartbeat)
+            print(f"✅ Job {job.id} done")
+        except LeaseLost as e:
+            # Another worker owns the job now; its result wins
+            print(f"⚠️ {e}")
+        except Exception as e:
+            print(f"❌ Job {job.id} failed: {e}")
+            try:
+                queue.fail(job, str(e))
+            except LeaseLost:
+                pass
+
+
+def run_worker(queue_url: str = DEFAULT_QUEUE_URL, worker_id: Optional[str] = None,
+               max_jobs: Optional[int] = None, exit_when_idle: bool = False) -> int:
+    """Claim and run jobs until max_jobs is reached (or the queue is empty with exit_when_idle)."""
+    queue = open_queue(queue_url)
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    processed = 0
+    while max_jobs is None or processed < max_jobs:
+        job = queue.claim(worker_id)
+        if job is None:
+            if exit_when_idle:
+                break
+            time.sleep(POLL_INTERVAL)
+            continue
+        run_job(queue, job)
+        processed += 1
+    return processed
+
+
+# --- Client side ---
+
+def submit_idea(queue: JobQueue, user_idea: str, per_node: bool = False, priority: str = "batch",
+                **budget: Optional[float]) -> str:
+    """Enqueue a generation run and return its run id; budget takes new_project_state's budget arguments."""
+    from genesis_crew_main import new_project_state
+
+    state = new_project_state(user_idea, priority=priority, **budget)
+    run_id = state["run_id"]
+    if per_node:
+        queue.enqueue("node", {"state": state, "step": 0}, run_id=run_id, job_id=node_job_id(run_id, 0),
+                      priority=PRIORITIES.get(priority, 0))
+    else:
+        queue.enqueue("idea", {"state": state}, run_id=run_id, job_id=run_id, priority=PRIORITIES.get(priority, 0))
+    return run_id
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Genesis Crew distributed workers")
+    parser.add_argument("--queue", default=DEFAULT_QUEUE_URL, help="sqlite:///path or redis://host:port/db")
+    commands = parser.add_subparsers(dest="command", required=True)
+    submit = commands.add_parser("submit", help="enqueue an idea")
+    submit.add_argument("idea")
+    submit.add_argument("--per-node", action="store_true", help="distribute the run node by node")
+    submit.add_argument("--priority", default="batch", choices=sorted(PRIORITIES))
+    submit.add_argument("--deadline", type=float, help="seconds the run may take, from submission")
+    submit.add_argument("--token-budget", type=int)
+    submit.add_argument("--cost-budget", type=float, help="US dollars")
+    work = commands.add_parser("work", help="run a worker")
+    work.add_argument("--processes", type=int, default=1)
+    work.add_argument("--exit-when-idle", action="store_true")
+    status = commands.add_parser("status", help="show a job, or queue counts")
+    status.add_argument("job_id", nargs="?")
+    fetch = commands.add_parser("fetch", help="write a run's artifacts to a directory")
+    fetch.add_argument("run_id")
+    fetch.add_argument("dest")
+    args = parser.parse_args()
+
+    queue = open_queue(args.queue)
+    if args.command == "submit":
+        print(submit_idea(queue, args.idea, per_node=args.per_node, priority=args.priority,
+                          deadline_seconds=args.deadline, token_budget=args.token_budget, cost_budget=args.cost_budget))
+    elif args.command == "work":
+        if args.processes == 1:
+            run_worker(args.queue, exit_when_idle=args.exit_when_idle)
+            return
+        workers = [multiprocessing.Process(target=run_worker, args=(args.queue,),
+                                           kwargs={"exit_when_idle": args.exit_when_idle})
+                   for _ in range(args.processes)]
+        for process in workers:
+            process.start()
+        for process in workers:
+            process.join()
+    elif args.command == "status":
+        if args.job_id is None:
+            print(queue.counts())
+        else:
+            job = queue.get(args.job_id)
+            print(job if job else f"No job {args.job_id}")
+    elif args.command == "fetch":
+        files = queue.get_artifacts(args.run_id)
+        write_artifacts(files, args.dest)
+        print(f"📦 Wrote {len(files)} files to {args.dest}")
+        commit_run(args.run_id, args.dest)
+
+
+if __name__ == "__main__":
+    main()
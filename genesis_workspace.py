@@ -0,0 +1,139 @@
+"""
+Workspace Layer for Genesis Crew
+Maps the './build' paths that agents write to onto the active workspace, so
+several candidates of the same node can work side by side in isolated copies
+of the build directory before one of them is promoted.
+"""
+
+import contextvars
+import hashlib
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+BUILD_DIR = os.path.normpath(os.getenv("GENESIS_BUILD_DIR", "./build"))
+
+# Directories that are never copied into or promoted out of a workspace
+IGNORED_DIRS = {"__pycache__", ".pytest_cache", "node_modules", ".mypy_cache"}
+
+# Root directory that './build' currently resolves to (None = the real build dir)
+_active_root: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("genesis_workspace_root", default=None)
+
+
+def active_root() -> str:
+    """Return the directory that './build' resolves to in the current context."""
+    return _active_root.get() or BUILD_DIR
+
+
+def resolve_path(file_path: str) -> str:
+    """Redirect a path under the build directory into the active workspace."""
+    root = _active_root.get()
+    if root is None:
+        return file_path
+    normalized = os.path.abspath(file_path)
+    build = os.path.abspath(BUILD_DIR)
+    if normalized == build or normalized.startswith(build + os.sep):
+        return os.path.join(root, os.path.relpath(normalized, build))
+    return file_path
+
+
+@contextmanager
+def use_workspace(root: str) -> Iterator[str]:
+    """Make './build' resolve to root for the duration of the block."""
+    token = _active_root.set(root)
+    try:
+        yield root
+    finally:
+        _active_root.reset(token)
+
+
+def _iter_files(root: str) -> Iterator[str]:
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in IGNORED_DIRS]
+        for filename in filenames:
+            yield os.path.relpath(os.path.join(dirpath, filename), root)
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def snapshot(root: str) -> Dict[str, str]:
+    """Map every file under root (relative path) to its content hash."""
+    if not os.path.isdir(root):
+        return {}
+    return {rel: file_digest(os.path.join(root, rel)) for rel in _iter_files(root)}
+
+
+def create_workspace(prefix: str = "genesis-") -> str:
+    """Create a temporary copy of the active build directory."""
+    root = tempfile.mkdtemp(prefix=prefix)
+    source = active_root()
+    if os.path.isdir(source):
+        shutil.copytree(source, root, dirs_exist_ok=True, ignore=shutil.ignore_patterns(*IGNORED_DIRS))
+    return root
+
+
+def changed_files(root: str, baseline: Dict[str, str]) -> List[str]:
+    """Files in root that are new or differ from the baseline snapshot."""
+    current = snapshot(root)
+    return sorted(rel for rel, digest in current.items() if baseline.get(rel) != digest)
+
+
+def is_executable(path: str) -> bool:
+    try:
+        return bool(os.stat(path).st_mode & 0o111)
+    except OSError:
+        return False
+
+
+def _replace(target: str, fill, executable: Optional[bool] = None) -> None:
+    directory = os.path.dirname(target) or "."
+    os.makedirs(directory, exist_ok=True)
+    if executable is None:
+        # A rewritten script stays runnable
+        executable = is_executable(target)
+    fd, temp = tempfile.mkstemp(dir=directory, prefix=".genesis-")
+    try:
+        os.close(fd)
+        os.chmod(temp, 0o755 if executable else 0o644)
+        fill(temp)
+        os.replace(temp, target)
+    except BaseException:
+        if os.path.exists(temp):
+            os.unlink(temp)
+        raise
+
+
+def replace_file(target: str, data: bytes, executable: Optional[bool] = None) -> None:
+    """
+    Write a file by atomic rename. The old file is never written to, so a
+    file hardlinked from the artifact store is replaced, not corrupted.
+    executable=None keeps the executable bit of the file being replaced.
+    """
+    def fill(temp: str) -> None:
+        with open(temp, "wb") as f:
+            f.write(data)
+
+    _replace(target, fill, executable)
+
+
+def promote(root: str, files: List[str]) -> List[str]:
+    """Copy the given workspace files into the active build directory."""
+    promoted = []
+    for rel in files:
+        target = os.path.join(active_root(), rel)
+        source = os.path.join(root, rel)
+        _replace(target, lambda temp: shutil.copyfile(source, temp), is_executable(source))
+        promoted.append(target)
+    return promoted
+
+
+def discard(root: str) -> None:
+    shutil.rmtree(root, ignore_errors=True)
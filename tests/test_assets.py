@@ -0,0 +1,57 @@
+import gzip
+
+import pytest
+
+import genesis_assets
+from genesis_assets import build_assets, minify_js
+
+
+@pytest.fixture(autouse=True)
+def fallback_minifier(monkeypatch):
+    monkeypatch.setattr(genesis_assets, "rjsmin", None)
+
+
+def test_comments_and_indentation_are_dropped():
+    js = "// header\nfunction f() {\n    /* inline */ return 1;   // one\n}\n\n"
+
+    assert minify_js(js) == "function f() {\nreturn 1;\n}\n"
+
+
+@pytest.mark.parametrize("literal", [
+    '"http://example.com/a"',
+    "'it\\'s // not a comment'",
+    "/\\/\\/[/\"']+/g",
+    "`line one\n    // kept, it is text\n  ${ items.map(i => `<li class=\"${i}\">  ${i}</li>`).join(\"\") }  `",
+])
+def test_literals_are_kept_verbatim(literal):
+    assert minify_js(f"const value  =  {literal};  // trailing\n") == f"const value = {literal};\n"
+
+
+def test_division_is_not_a_regex():
+    js = "const half = total / 2 // half\nconst rate = count / seconds;\n"
+
+    assert minify_js(js) == "const half = total / 2\nconst rate = count / seconds;\n"
+
+
+def test_regex_after_return_keeps_quotes():
+    assert minify_js("if (x) return /a'b/.test(s)\n") == "if (x) return /a'b/.test(s)\n"
+
+
+def test_multi_line_comment_still_separates_statements():
+    assert minify_js("let a = 1/* one\ntwo */let b = 2\n") == "let a = 1\nlet b = 2\n"
+
+
+def test_build_bundles_and_precompresses(tmp_path):
+    (tmp_path / "index.html").write_text('<html><head><link rel="stylesheet" href="style.css"></head>'
+                                         '<body><script src="app.js"></script></body></html>')
+    (tmp_path / "style.css").write_text("body {\n  color: red;\n}\n" * 40)
+    (tmp_path / "app.js").write_text("const greeting = `hello  world`;\n")
+    (tmp_path / "unused.js").write_text("")
+
+    report = build_assets(str(tmp_path))
+
+    assert report.dead == ["unused.js"]
+    bundle = tmp_path / "dist" / report.bundles["app.js"].lstrip("/")
+    assert bundle.read_text() == "const greeting = `hello  world`;\n;\n"
+    css = tmp_path / "dist" / report.bundles["style.css"].lstrip("/")
+    assert gzip.decompress((css.parent / (css.name + ".gz")).read_bytes()) == css.read_bytes()
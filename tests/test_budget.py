@@ -0,0 +1,85 @@
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+import genesis_crew_main
+from genesis_budget import Cancelled, check_cancelled, new_budget, run_with_deadline, settle_late_usage, track_usage
+from genesis_workspace import use_workspace
+
+
+class FakeCrew:
+    """Stands in for a crew whose agent writes the PRD with FileWriterTool."""
+
+    def __init__(self, agents, tasks, **kwargs):
+        self.agents = agents
+
+    def kickoff(self):
+        genesis_crew_main.FileWriterTool()._execute(file_path="./build/prd.md", content="# PRD")
+        return None
+
+    def calculate_usage_metrics(self):
+        return None
+
+
+def test_deadline_run_writes_into_workspace(tmp_path, monkeypatch):
+    monkeypatch.setattr(genesis_crew_main, "Crew", FakeCrew)
+    state = {**new_budget(deadline_seconds=60), "current_task_description": "Write the PRD", "run_id": "r1"}
+
+    with use_workspace(str(tmp_path)):
+        genesis_crew_main.kickoff_agent(state, "ProductManager", genesis_crew_main.product_manager,
+                                        expected_output="A PRD", outputs=["prd.md"])
+
+    assert (tmp_path / "prd.md").read_text() == "# PRD"
+
+
+class SlowCrew(FakeCrew):
+    """A crew that is still finishing its LLM call when the deadline passes."""
+
+    def kickoff(self):
+        time.sleep(1.5)
+
+    def calculate_usage_metrics(self):
+        return SimpleNamespace(prompt_tokens=1000, completion_tokens=500)
+
+
+def test_usage_after_the_deadline_is_charged_late(monkeypatch):
+    monkeypatch.setattr(genesis_crew_main, "Crew", SlowCrew)
+    state = {**new_budget(deadline_seconds=1), "current_task_description": "Write the PRD", "run_id": "late"}
+
+    with track_usage("late") as usage:
+        with pytest.raises(Cancelled):
+            genesis_crew_main.kickoff_agent(state, "ProductManager", genesis_crew_main.product_manager,
+                                            expected_output="A PRD", outputs=["prd.md"])
+    assert usage.close()[0] == 0
+
+    deadline = time.time() + 5
+    while (settled := settle_late_usage(state)) is state and time.time() < deadline:
+        time.sleep(0.05)
+    assert settled["tokens_used"] == 1500
+
+
+def test_deadline_cancels_work_at_next_step():
+    stopped = threading.Event()
+
+    def work():
+        try:
+            while True:
+                check_cancelled()
+                time.sleep(0.01)
+        except Cancelled:
+            stopped.set()
+            raise
+
+    state = new_budget(deadline_seconds=0.5)
+    with pytest.raises(Cancelled):
+        run_with_deadline(work, state)
+    assert stopped.wait(1.0)
+
+
+def test_no_deadline_runs_inline():
+    assert run_with_deadline(threading.get_ident, new_budget()) == threading.get_ident()
@@ -0,0 +1,68 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "genesis_crewAI_template", "src"))
+
+from crewai import Crew
+
+from genesis.crew import Genesis
+
+
+class Result:
+    def __init__(self, raw):
+        self.raw = raw
+
+
+@pytest.fixture
+def kickoffs(monkeypatch, tmp_path):
+    """Replaces the LLM calls: research returns notes, reporting records what it saw."""
+    monkeypatch.chdir(tmp_path)
+    seen = {}
+
+    async def kickoff_async(crew, inputs=None):
+        task = crew.tasks[0]
+        if inputs is not None:
+            if inputs["topic"] == "broken":
+                raise RuntimeError("search failed")
+            await asyncio.sleep(0.01 * len(inputs["topic"]))
+            return Result(f"notes on {inputs['topic']}")
+        seen["description"] = task.description
+        seen["role"] = crew.agents[0].role
+        seen["draft"] = (tmp_path / "report.md").read_text()
+        return Result("final report")
+
+    monkeypatch.setattr(Crew, "kickoff_async", kickoff_async)
+    return seen
+
+
+def test_yaml_config_builds_the_crew():
+    crew = Genesis().crew()
+
+    assert [task.name for task in crew.tasks] == ["research_task", "reporting_task"]
+    assert len(crew.agents) == 2
+
+
+def test_map_reduce_reports_once_over_all_research(kickoffs):
+    report = asyncio.run(Genesis().map_reduce(["LLMs", "AI agents"], inputs={"current_year": "2026"}))
+
+    assert report == "final report"
+    assert kickoffs["description"].index("## LLMs\n\nnotes on LLMs") < kickoffs["description"].index("## AI agents")
+    assert kickoffs["role"].strip() == "LLMs, AI agents Reporting Analyst"
+    # Research was streamed into the report file before the reporting task ran
+    assert kickoffs["draft"].startswith("# Research in progress: 2/2 topics done")
+    assert "notes on AI agents" in kickoffs["draft"]
+
+
+def test_map_reduce_keeps_going_when_one_topic_fails(kickoffs):
+    asyncio.run(Genesis().map_reduce(["LLMs", "broken"], inputs={"current_year": "2026"}))
+
+    assert "_Research for this topic failed: search failed_" in kickoffs["description"]
+
+
+def test_map_reduce_raises_when_every_topic_fails(kickoffs):
+    with pytest.raises(RuntimeError, match="every topic"):
+        asyncio.run(Genesis().map_reduce(["broken"], inputs={"current_year": "2026"}))
@@ -0,0 +1,86 @@
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "genesis_crewAI_template", "src"))
+
+import litellm
+from crewai import Crew, Task
+from crewai.events.event_bus import crewai_event_bus
+from crewai.events.types.crew_events import CrewKickoffCompletedEvent, CrewKickoffStartedEvent
+from crewai.tasks.task_output import TaskOutput
+from crewai.utilities.evaluators.crew_evaluator_handler import TaskEvaluationPydanticOutput
+
+from genesis import evaluation
+from genesis.crew import Genesis
+
+
+@pytest.fixture(autouse=True)
+def no_llm_cache(monkeypatch):
+    monkeypatch.setenv("GENESIS_LLM_CACHE", "0")
+    monkeypatch.setattr(litellm, "cache", None)
+
+
+def test_test_iteration_scores_every_task(monkeypatch):
+    def kickoff(crew, inputs=None):
+        # Each finished task hands its output to the callback CrewEvaluator installed
+        for task in crew.tasks:
+            task.start_time, task.end_time = datetime(2026, 1, 1, 12, 0, 0), datetime(2026, 1, 1, 12, 0, 1)
+            task.callback(TaskOutput(description=task.description, raw="done", agent=task.agent.role))
+
+    def execute_sync(task, *args, **kwargs):
+        assert task.output_pydantic is TaskEvaluationPydanticOutput
+        return TaskOutput(description=task.description, raw="", agent=task.agent.role,
+                          pydantic=TaskEvaluationPydanticOutput(quality=8.0))
+
+    monkeypatch.setattr(Crew, "kickoff", kickoff)
+    monkeypatch.setattr(Task, "execute_sync", execute_sync)
+    monkeypatch.setattr(evaluation, "_base_crew", lambda: Genesis().crew())
+
+    first = evaluation._test_iteration(1, {"topic": "AI"}, "gpt-4o-mini")
+    again = evaluation._test_iteration(1, {"topic": "AI"}, "gpt-4o-mini")
+
+    assert first.error is None
+    assert first.task_scores == [8.0, 8.0]
+    assert again.task_scores == [8.0, 8.0]
+    assert first.crew_score == 8.0
+
+
+def test_cache_namespace_separates_iterations(monkeypatch):
+    from litellm.caching.caching import Cache
+
+    monkeypatch.setattr(litellm, "cache", Cache(type="local"))
+    request = {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "hi"}]}
+
+    evaluation.set_cache_namespace(1)
+    first = litellm.cache.get_cache_key(**request)
+    evaluation.set_cache_namespace(2)
+    second = litellm.cache.get_cache_key(**request)
+    evaluation.set_cache_namespace(1)
+
+    assert first != second
+    assert litellm.cache.get_cache_key(**request) == first
+
+
+class TrainingCrew:
+    def train(self, n_iterations, filename, inputs):
+        for _ in range(n_iterations):
+            crewai_event_bus.emit(self, CrewKickoffStartedEvent(crew_name="genesis", inputs=inputs))
+            crewai_event_bus.emit(self, CrewKickoffCompletedEvent(crew_name="genesis", output="done"))
+
+
+def test_train_times_each_kickoff_without_dropping_other_listeners(monkeypatch):
+    seen = []
+    with crewai_event_bus.scoped_handlers():
+        crewai_event_bus.register_handler(CrewKickoffCompletedEvent, lambda source, event: seen.append(event))
+        monkeypatch.setattr(evaluation, "_base_crew", TrainingCrew)
+        evaluation._listen_for_kickoffs.cache_clear()
+
+        results = evaluation.run_train_iterations(3, "trained.pkl", {"topic": "AI"})
+        TrainingCrew().train(1, "trained.pkl", {})
+
+    assert [result.iteration for result in results] == [1, 2, 3]
+    assert len(seen) == 4
@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+
+import pytest
+from pydantic import ValidationError
+
+from genesis_manifest import ArtifactFile, ArtifactManifest, is_allowed, materialize, parse_manifest
+from genesis_workspace import use_workspace
+
+
+@pytest.mark.parametrize("path", ["./build/frontend/app.js", "build/frontend/app.js", "frontend//app.js",
+                                  "frontend\\app.js", " frontend/./app.js "])
+def test_paths_are_made_build_relative(path):
+    assert ArtifactFile(path=path, content="").path == "frontend/app.js"
+
+
+@pytest.mark.parametrize("path", ["/etc/passwd", "../secrets", "frontend/../../x", "./build/../x/..", "."])
+def test_paths_outside_the_build_are_rejected(path):
+    with pytest.raises(ValidationError, match="inside the build directory"):
+        ArtifactFile(path=path, content="")
+
+
+def test_manifest_needs_unique_files():
+    with pytest.raises(ValidationError, match="duplicate paths"):
+        ArtifactManifest(files=[ArtifactFile(path="a.txt", content="1"), ArtifactFile(path="./build/a.txt", content="2")])
+    with pytest.raises(ValidationError):
+        ArtifactManifest(files=[])
+
+
+def test_outputs_allow_files_and_directories():
+    assert is_allowed("frontend/js/app.js", ["frontend/"])
+    assert is_allowed("Dockerfile", ["Dockerfile"])
+    assert not is_allowed("Dockerfile.dev", ["Dockerfile"])
+    assert not is_allowed("frontend-old/app.js", ["frontend/"])
+
+
+def test_parse_manifest_accepts_structured_and_fenced_output():
+    manifest = ArtifactManifest(files=[ArtifactFile(path="a.txt", content="a")])
+    fenced = '```json\n{"files": [{"path": "a.txt", "content": "a"}]}\n```'
+
+    assert parse_manifest(SimpleNamespace(pydantic=manifest, raw="")) is manifest
+    assert parse_manifest(SimpleNamespace(pydantic=None, raw=fenced)) == manifest
+    with pytest.raises(ValueError, match="not a valid artifact manifest"):
+        parse_manifest(SimpleNamespace(pydantic=None, raw="I wrote the files."))
+
+
+def test_materialize_writes_all_files_or_none(tmp_path):
+    manifest = ArtifactManifest(files=[ArtifactFile(path="frontend/index.html", content="<html>"),
+                                       ArtifactFile(path="frontend/js/app.js", content="run()")])
+
+    with use_workspace(str(tmp_path)):
+        with pytest.raises(ValueError, match="outside the allowed outputs"):
+            materialize(manifest, ["frontend/index.html"])
+        assert not (tmp_path / "frontend").exists()
+
+        written = materialize(manifest, ["frontend/"])
+
+    assert written == ["./build/frontend/index.html", "./build/frontend/js/app.js"]
+    assert (tmp_path / "frontend/js/app.js").read_text() == "run()"
@@ -0,0 +1,83 @@
+import os
+
+from genesis_budget import settle_late_usage
+from genesis_pipelining import HANDOFFS, Speculation, _decoded, ddl_section, features_section
+from genesis_workspace import resolve_path, replace_file, use_workspace
+
+PRD = "# PRD\n\n## Features\n\n- Quotes\n- Favourites\n\n## Risks\n\nNone\n"
+BLUEPRINT = "# Blueprint\n\n```sql\nCREATE TABLE quotes (id SERIAL PRIMARY KEY);\n```\n"
+
+
+def test_features_section_waits_for_the_next_heading():
+    assert features_section("# PRD\n\n## Features\n\n- Quotes\n") is None
+    assert features_section("# PRD\n\n## Features\n\n- Quotes\n", final=True) == "## Features\n\n- Quotes"
+    assert features_section(PRD) == "## Features\n\n- Quotes\n- Favourites"
+
+
+def test_ddl_section_needs_a_closed_block():
+    assert ddl_section("```sql\nCREATE TABLE quotes (\n") is None
+    assert ddl_section(BLUEPRINT) == "```sql\nCREATE TABLE quotes (id SERIAL PRIMARY KEY);\n```"
+
+
+def test_decoded_reads_a_tool_call_that_is_still_streaming():
+    streamed = ('Action: File Writer\nAction Input: {"file_path": "./build/prd.md", '
+                '"content": "# PRD\\n\\n## Caf\\u00e9 \\"features\\"\\n- C:\\\\path\\n- \\u00e')
+
+    assert _decoded(streamed) == '# PRD\n\n## Café "features"\n- C:\\path\n- '
+    assert _decoded(streamed + "9\\") == '# PRD\n\n## Café "features"\n- C:\\path\n- é'
+    assert _decoded(PRD) == PRD
+
+
+def run_draft(state, stages):
+    replace_file(resolve_path("./build/architectural_blueprint.md"), BLUEPRINT.encode())
+    return {**state, "next_agent": "SchemaCodegen", "tokens_used": state["tokens_used"] + 300,
+            "artifacts": state["artifacts"] + ["./build/architectural_blueprint.md"]}
+
+
+def speculate(build, state):
+    speculation = Speculation("ProductManager", HANDOFFS["ProductManager"], state, run_draft)
+    with use_workspace(str(build)):
+        for line in PRD.splitlines(keepends=True):
+            speculation.feed(line)
+    return speculation
+
+
+def test_draft_is_adopted_when_the_final_section_matches(tmp_path):
+    build = tmp_path / "build"
+    build.mkdir()
+    # Files linked from the artifact store are read-only
+    (build / "architectural_blueprint.md").write_text("old")
+    os.chmod(build / "architectural_blueprint.md", 0o444)
+    (build / "prd.md").write_text("old")
+    os.chmod(build / "prd.md", 0o444)
+    state = {"run_id": "adopted", "tokens_used": 1000, "cost_used": 0.0, "artifacts": []}
+
+    speculation = speculate(build, state)
+    assert speculation.section == "## Features\n\n- Quotes\n- Favourites"
+    replace_file(str(build / "prd.md"), PRD.encode())
+    with use_workspace(str(build)):
+        new_state = speculation.resolve({**state, "next_agent": "Architect", "tokens_used": 1500,
+                                         "artifacts": ["./build/prd.md"]})
+
+    assert new_state["next_agent"] == "SchemaCodegen"
+    assert new_state["tokens_used"] == 1800
+    assert new_state["artifacts"] == ["./build/prd.md", "./build/architectural_blueprint.md"]
+    assert (build / "architectural_blueprint.md").read_text() == BLUEPRINT
+    assert not os.path.exists(speculation._root)
+
+
+def test_draft_is_discarded_and_charged_when_the_section_changes(tmp_path):
+    build = tmp_path / "build"
+    build.mkdir()
+    state = {"run_id": "discarded", "tokens_used": 1000, "cost_used": 0.0, "artifacts": []}
+
+    speculation = speculate(build, state)
+    (build / "prd.md").write_text(PRD.replace("Favourites", "Sharing"))
+    with use_workspace(str(build)):
+        new_state = speculation.resolve({**state, "next_agent": "Architect", "tokens_used": 1500})
+    speculation._thread.join()
+
+    assert new_state["next_agent"] == "Architect"
+    assert not (build / "architectural_blueprint.md").exists()
+    assert settle_late_usage(new_state)["tokens_used"] == 1800
+    assert not os.path.exists(speculation._root)
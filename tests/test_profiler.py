@@ -0,0 +1,80 @@
+import contextvars
+import threading
+import time
+
+import pytest
+
+import genesis_profiler
+from genesis_profiler import _category, profile_run, profile_scope, profiled
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(genesis_profiler, "PROFILE_ENABLED", True)
+    monkeypatch.setattr(genesis_profiler, "INTERVAL", 0.001)
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_disabled_profiler_changes_nothing(tmp_path):
+    node = lambda state: state
+
+    assert profiled("Node", node) is node
+    with profile_run(lambda: str(tmp_path)) as profile:
+        with profile_scope("Node"):
+            pass
+    assert profile is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_samples_are_attributed_to_nodes_and_tools(enabled, tmp_path):
+    def architect(state):
+        busy(0.05)
+        with profile_scope("tool:File Writer"):
+            busy(0.05)
+        return state
+
+    with profile_run(lambda: str(tmp_path / "profile")) as profile:
+        profiled("Architect", architect)({})
+
+    assert set(profile.wall) == {"Architect", "Architect;tool:File Writer"}
+    assert profile.wall["Architect"] >= profile.wall["Architect;tool:File Writer"] >= 0.05
+    assert profile.categories["Architect"]["tools"] > 0
+    assert profile.categories["Architect"]["genesis"] + profile.categories["Architect"]["other"] > 0
+    collapsed = (tmp_path / "profile/Architect.collapsed").read_text().splitlines()
+    assert any(line.startswith("Architect;tool:File Writer;") and ":busy " in line for line in collapsed)
+    summary = (tmp_path / "profile/summary.txt").read_text()
+    assert "Architect > tool:File Writer" in summary
+    assert "== Architect:" in summary
+
+
+def test_threads_entering_the_same_scope_are_sampled_too(enabled, tmp_path):
+    def worker():
+        with profile_scope("Backend"):
+            busy(0.05)
+
+    def backend(state):
+        # Like a best-of-N candidate or deadline thread: a copy of the node's context
+        thread = threading.Thread(target=contextvars.copy_context().run, args=(worker,))
+        thread.start()
+        thread.join()
+        return state
+
+    with profile_run(lambda: str(tmp_path)) as profile:
+        profiled("Backend", backend)({})
+
+    # Re-entering the innermost scope registers the thread without timing the node twice
+    assert list(profile.wall) == ["Backend"]
+    stacks = profile.stacks["Backend"]
+    assert any(frames[-1].endswith(":busy") for (_, frames) in stacks)
+
+
+def test_category_uses_the_innermost_known_package():
+    assert _category(("Node",), ["genesis_crew_main", "crewai.agent", "litellm.main", "json.decoder"]) == "llm"
+    assert _category(("Node",), ["langgraph.pregel", "genesis_crew_main"]) == "genesis"
+    assert _category(("Node", "tool:Search"), ["litellm.main"]) == "tools"
+    assert _category(("Node",), ["json.decoder"]) == "other"
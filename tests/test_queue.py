@@ -0,0 +1,61 @@
+import pytest
+
+from genesis_queue import LeaseLost, RedisJobQueue, SQLiteJobQueue
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def queue(request, tmp_path, monkeypatch):
+    if request.param == "sqlite":
+        return SQLiteJobQueue(str(tmp_path / "jobs.db"), lease=60)
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")  # fakeredis needs it for Lua scripts
+    monkeypatch.setattr("redis.Redis.from_url", lambda url: fakeredis.FakeRedis())
+    return RedisJobQueue("redis://fake", lease=60)
+
+
+def take_over(queue, job):
+    """Expire job's lease and let a second worker claim it."""
+    queue.lease = -1
+    queue.heartbeat(job)
+    queue.lease = 60
+    return queue.claim("w2")
+
+
+def test_owner_writes_are_stored(queue):
+    queue.enqueue("idea", {}, run_id="r1", job_id="j1")
+    job = queue.claim("w1")
+
+    queue.put_artifacts(job, {"main.py": b"print(1)"})
+    queue.enqueue("node", {"step": 1}, run_id="r1", job_id="j2", fence=job)
+
+    assert queue.get_artifacts("r1") == {"main.py": b"print(1)"}
+    assert queue.get("j2").payload == {"step": 1}
+
+
+def test_stale_worker_writes_are_rejected(queue):
+    queue.enqueue("idea", {}, run_id="r1", job_id="j1")
+    stale = queue.claim("w1")
+    owner = take_over(queue, stale)
+    assert (owner.worker, owner.attempts) == ("w2", 2)
+    queue.put_artifacts(owner, {"main.py": b"new"})
+
+    with pytest.raises(LeaseLost):
+        queue.put_artifacts(stale, {"main.py": b"old", "extra.py": b"old"})
+    with pytest.raises(LeaseLost):
+        queue.enqueue("node", {}, run_id="r1", job_id="j2", fence=stale)
+    with pytest.raises(LeaseLost):
+        queue.checkpoint(stale, {"step": 1})
+
+    assert queue.get_artifacts("r1") == {"main.py": b"new"}
+    assert queue.get("j2") is None
+    queue.complete(owner)
+    assert queue.get("j1").status == "done"
+
+
+def test_expired_jobs_are_requeued_until_attempts_run_out(queue):
+    queue.max_attempts = 1
+    queue.enqueue("idea", {}, job_id="j1")
+    job = queue.claim("w1")
+
+    assert take_over(queue, job) is None
+    assert queue.get("j1").status == "failed"
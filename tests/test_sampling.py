@@ -0,0 +1,29 @@
+import sys
+
+from genesis_sampling import CandidateScore, run_check
+
+
+def test_checks_run_without_credentials(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-secret")
+    monkeypatch.setenv("SUPABASE_KEY", "secret")
+    monkeypatch.setenv("GENESIS_MARKER", "kept")
+    script = "import os; print(os.getenv('OPENAI_API_KEY'), os.getenv('SUPABASE_KEY'), os.getenv('GENESIS_MARKER'))"
+
+    result = run_check([sys.executable, "-c", script], cwd=str(tmp_path))
+
+    assert result.stdout.split() == ["None", "None", "kept"]
+
+
+def test_check_timeout_is_reported(tmp_path):
+    result = run_check([sys.executable, "-c", "import time; time.sleep(5)"], cwd=str(tmp_path), timeout=1)
+
+    assert result.returncode == -1
+    assert "Timed out" in result.stderr
+
+
+def test_passing_candidate_outranks_one_with_more_files():
+    passing = CandidateScore(produced=2, tests_passed=3)
+    failing = CandidateScore(produced=5, tests_ok=False, tests_passed=4, tests_failed=1)
+
+    assert passing.passed and not failing.passed
+    assert max([failing, passing], key=CandidateScore.key) is passing
@@ -0,0 +1,84 @@
+import time
+
+import pytest
+
+from genesis_scheduler import POLL_INTERVAL, LLMScheduler, estimate_tokens, run_scope
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "scheduler.db")
+
+
+def add_waiter(scheduler, waiter_id, run_id, priority, enqueued):
+    with scheduler._db.transaction() as db:
+        db.execute("INSERT INTO waiters (id, run_id, priority, enqueued, heartbeat, cost) VALUES (?, ?, ?, ?, ?, 0)",
+                   (waiter_id, run_id, priority, enqueued, time.time()))
+
+
+def test_without_limits_calls_never_wait(db_path):
+    scheduler = LLMScheduler(rpm=None, tpm=None, db_path=db_path)
+
+    assert scheduler.acquire(10_000) == 0.0
+    assert scheduler.queue_depth() == {}
+
+
+def test_full_bucket_grants_at_once_then_refills_over_time(db_path):
+    # 6000 tokens/min refill at 100 tokens/s
+    scheduler = LLMScheduler(rpm=None, tpm=6000, db_path=db_path)
+
+    assert scheduler.acquire(6000) < POLL_INTERVAL
+    waited = scheduler.acquire(50)
+
+    assert 0.4 <= waited < 1.5
+    assert scheduler.metrics.granted == 2
+    assert scheduler.metrics.throttled == 1
+
+
+def test_oversized_call_fits_into_a_full_bucket(db_path):
+    scheduler = LLMScheduler(rpm=None, tpm=6000, db_path=db_path)
+
+    assert scheduler.acquire(1_000_000) < POLL_INTERVAL
+
+
+def test_processes_share_one_bucket(db_path):
+    first = LLMScheduler(rpm=60, tpm=None, db_path=db_path)
+    second = LLMScheduler(rpm=60, tpm=None, db_path=db_path)
+    with first._db.transaction() as db:
+        first._refill(db, time.time())
+        db.execute("UPDATE buckets SET tokens = 0")
+
+    waited = second.acquire(1)
+
+    # One request per second refills
+    assert waited >= 0.9
+
+
+def test_interactive_calls_go_before_batch(db_path):
+    scheduler = LLMScheduler(rpm=60, tpm=None, db_path=db_path)
+    add_waiter(scheduler, "batch", "r1", 1, enqueued=1.0)
+    add_waiter(scheduler, "interactive", "r2", 0, enqueued=2.0)
+    cost = {"requests": 1.0}
+
+    assert scheduler._try_acquire("batch", "r1", cost) == POLL_INTERVAL
+    assert scheduler._try_acquire("interactive", "r2", cost) == 0.0
+    assert scheduler._try_acquire("batch", "r1", cost) == 0.0
+
+
+def test_least_served_run_goes_first_within_a_priority(db_path):
+    scheduler = LLMScheduler(rpm=60, tpm=None, db_path=db_path)
+    with run_scope("busy", "batch"):
+        scheduler.acquire(1)
+    add_waiter(scheduler, "busy-call", "busy", 1, enqueued=1.0)
+    add_waiter(scheduler, "new-call", "new", 1, enqueued=2.0)
+    cost = {"requests": 1.0}
+
+    assert scheduler.queue_depth() == {"batch": 2}
+    assert scheduler._try_acquire("busy-call", "busy", cost) == POLL_INTERVAL
+    assert scheduler._try_acquire("new-call", "new", cost) == 0.0
+
+
+def test_estimate_counts_prompt_and_completion():
+    messages = [{"role": "user", "content": "x" * 400}]
+
+    assert estimate_tokens(messages) == estimate_tokens("x" * 400) == 100 + estimate_tokens("")
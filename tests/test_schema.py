@@ -0,0 +1,82 @@
+from genesis_schema import extract_ddl, parse_ddl, render_fixtures, render_models, render_repository, sample_rows, singular
+
+BLUEPRINT = '''# Blueprint
+
+```sql
+-- Quotes shown on the front page
+CREATE TABLE IF NOT EXISTS public."authors" (
+    id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    born DATE
+);
+```
+
+Some prose.
+
+```sql
+CREATE TABLE quotes (
+    id SERIAL,
+    author_id BIGINT NOT NULL,
+    text TEXT NOT NULL CHECK (length(text) > 0),
+    rating NUMERIC(3, 1) DEFAULT 0,
+    tags TEXT[],
+    created_at TIMESTAMPTZ DEFAULT now(),
+    PRIMARY KEY (id),
+    FOREIGN KEY (author_id) REFERENCES public.authors (id)
+);
+CREATE INDEX quotes_author ON quotes (author_id);
+```
+'''
+
+
+def schema():
+    return parse_ddl(extract_ddl(BLUEPRINT))
+
+
+def test_parses_tables_columns_and_constraints():
+    authors, quotes = schema().tables
+
+    assert [t.name for t in (authors, quotes)] == ["authors", "quotes"]
+    assert authors.primary_key.name == "id" and authors.primary_key.generated
+    assert [c.name for c in quotes.columns] == ["id", "author_id", "text", "rating", "tags", "created_at"]
+    columns = {c.name: c for c in quotes.columns}
+    assert quotes.primary_key is columns["id"] and not columns["id"].nullable
+    assert columns["author_id"].references == "authors"
+    assert columns["rating"].sql_type == "numeric(3, 1)" and columns["rating"].has_default
+    assert columns["text"].sql_type == "text" and not columns["text"].nullable
+    assert columns["tags"].python_type == "List[str]"
+    assert columns["created_at"].python_type == "datetime"
+
+
+def test_class_names_are_singular():
+    assert [t.class_name for t in schema().tables] == ["Author", "Quote"]
+    assert [singular(name) for name in ("categories", "addresses", "boxes", "glass")] == ["category", "address", "box", "glass"]
+
+
+def test_generated_models_validate_the_fixture_rows():
+    models, fixtures = {}, {}
+    exec(render_models(schema()), models)
+    exec(render_fixtures(schema()), fixtures)
+
+    for table in schema().tables:
+        for row in fixtures[f"{table.name.upper()}_ROWS"]:
+            instance = models[table.class_name](**row)
+            assert getattr(instance, table.primary_key.name) == row[table.primary_key.name]
+    assert "id" not in models["QuoteCreate"].model_fields
+    assert "rating" not in models["QuoteCreate"].model_fields
+
+
+def test_sample_rows_are_python_literals():
+    quotes = schema().tables[1]
+
+    assert sample_rows(quotes)[0]["tags"] == '["Tags 1"]'
+    assert sample_rows(quotes)[1]["rating"] == 'Decimal("2.50")'
+
+
+def test_generated_repository_compiles():
+    compile(render_repository(schema()), "repository.py", "exec")
+    assert "def get(self, id: Any)" in render_repository(schema())
+
+
+def test_ignores_blueprints_without_sql():
+    assert parse_ddl(extract_ddl("# Blueprint\n\nNo schema yet.")).tables == []
@@ -0,0 +1,82 @@
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from genesis_service import DONE, GenesisService, create_app
+
+
+@pytest.fixture
+def service(tmp_path):
+    return GenesisService(workers=1, queue_size=2, runs_dir=str(tmp_path / "runs"))
+
+
+@pytest.fixture
+def client(service):
+    # Not used as a context manager: the lifespan (warm crew, worker threads) never starts,
+    # so submitted runs stay in the backlog
+    return TestClient(create_app(service))
+
+
+def test_submission_is_accepted_with_status_urls(client):
+    response = client.post("/runs", json={"idea": "A todo API", "priority": "batch"})
+
+    assert response.status_code == 202
+    body = response.json()
+    assert body["status"] == "queued"
+    assert body["status_url"] == f"/runs/{body['run_id']}"
+    assert client.get(body["status_url"]).json()["request"]["priority"] == "batch"
+
+
+def test_full_backlog_is_refused_with_retry_after(client, service):
+    for _ in range(2):
+        assert client.post("/runs", json={"idea": "A todo API"}).status_code == 202
+
+    response = client.post("/runs", json={"idea": "One too many"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "30"
+    assert "Backlog full (2 runs)" in response.json()["detail"]
+    assert client.get("/health").json() == {"status": "ok", "workers": 1, "queued": 2, "capacity": 2,
+                                            "runs": {"queued": 2}}
+
+
+@pytest.mark.parametrize("payload", [{"idea": ""}, {"idea": "x", "priority": "urgent"}, {"idea": "x", "token_budget": 0}])
+def test_invalid_requests_are_rejected(client, payload):
+    assert client.post("/runs", json=payload).status_code == 422
+
+
+def test_unknown_run_is_404(client):
+    assert client.get("/runs/nope").status_code == 404
+    assert client.get("/runs/nope/events").status_code == 404
+
+
+def test_events_of_a_finished_run_are_replayed(client, service):
+    run_id = client.post("/runs", json={"idea": "A todo API"}).json()["run_id"]
+    run = service.get(run_id)
+    run.events.append({"event": DONE, "time": 0, "files": ["src/main.py"]})
+    run.status = DONE
+
+    body = client.get(f"/runs/{run_id}/events").text
+
+    assert body.index("event: queued") < body.index("event: done")
+    assert '"files": ["src/main.py"]' in body
+
+
+def test_backlog_accepts_runs_again_once_workers_drain_it(client, service, monkeypatch):
+    def execute(run):
+        run.status = DONE
+
+    monkeypatch.setattr(service, "_execute", execute)
+    for _ in range(2):
+        client.post("/runs", json={"idea": "A todo API"})
+    assert client.post("/runs", json={"idea": "Refused"}).status_code == 503
+
+    worker = threading.Thread(target=service._work, daemon=True)
+    worker.start()
+    service.backlog.join()
+
+    assert client.post("/runs", json={"idea": "Accepted"}).status_code == 202
+    service.backlog.join()
+    service.stop()
+    assert client.get("/health").json()["runs"] == {"done": 3}
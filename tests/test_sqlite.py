@@ -0,0 +1,38 @@
+import threading
+
+import pytest
+
+from genesis_sqlite import SQLiteDatabase
+
+
+def test_creates_the_directory_and_uses_wal(tmp_path):
+    db = SQLiteDatabase(str(tmp_path / "nested" / "state.db"))
+
+    assert db.connection().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert (tmp_path / "nested" / "state.db").exists()
+
+
+def test_each_thread_gets_its_own_connection(tmp_path):
+    db = SQLiteDatabase(str(tmp_path / "state.db"))
+    other = []
+    thread = threading.Thread(target=lambda: other.append(db.connection()))
+    thread.start()
+    thread.join()
+
+    assert db.connection() is db.connection()
+    assert other[0] is not db.connection()
+
+
+def test_transaction_rolls_back_on_error(tmp_path):
+    db = SQLiteDatabase(str(tmp_path / "state.db"))
+    with db.transaction() as conn:
+        conn.execute("CREATE TABLE items (name TEXT)")
+
+    with pytest.raises(RuntimeError):
+        with db.transaction() as conn:
+            conn.execute("INSERT INTO items VALUES ('lost')")
+            raise RuntimeError("boom")
+    with db.transaction() as conn:
+        conn.execute("INSERT INTO items VALUES ('kept')")
+
+    assert db.connection().execute("SELECT name FROM items").fetchall() == [("kept",)]
@@ -0,0 +1,100 @@
+import os
+
+import pytest
+
+import genesis_store
+from genesis_store import ArtifactStore
+from genesis_workspace import replace_file
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = ArtifactStore(str(tmp_path / "store"))
+    monkeypatch.setattr(genesis_store, "STORE_ENABLED", True)
+    monkeypatch.setattr(genesis_store, "_store", store)
+    return store
+
+
+def make_run(root, files):
+    for rel, content in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    return str(root)
+
+
+def test_identical_files_are_stored_once(store, tmp_path):
+    shared = "print('same')\n" * 100
+    a = make_run(tmp_path / "a", {"src/main.py": shared, "README.md": "run a"})
+    b = make_run(tmp_path / "b", {"src/main.py": shared, "README.md": "run b"})
+
+    store.commit("a", a)
+    store.commit("b", b)
+
+    assert os.path.samefile(tmp_path / "a/src/main.py", tmp_path / "b/src/main.py")
+    stats = store.stats()
+    assert stats["runs"] == 2
+    assert stats["objects"] == 3
+    assert stats["logical_bytes"] == 2 * len(shared) + len("run a") + len("run b")
+
+
+def test_rewriting_a_file_does_not_leak_into_other_runs(store, tmp_path):
+    a = make_run(tmp_path / "a", {"src/main.py": "original"})
+    b = make_run(tmp_path / "b", {"src/main.py": "original"})
+    store.commit("a", a)
+    store.commit("b", b)
+
+    genesis_store.write_artifact(str(tmp_path / "a/src/main.py"), "changed by a")
+    replace_file(str(tmp_path / "a/src/main.py"), b"changed again")
+
+    assert (tmp_path / "a/src/main.py").read_text() == "changed again"
+    assert (tmp_path / "b/src/main.py").read_text() == "original"
+    assert store.get(store.files("b")["src/main.py"]) == b"original"
+
+
+@pytest.mark.skipif(hasattr(os, "geteuid") and os.geteuid() == 0, reason="root ignores file permissions")
+def test_committed_files_reject_in_place_writes(store, tmp_path):
+    a = make_run(tmp_path / "a", {"main.py": "original"})
+    store.commit("a", a)
+
+    with pytest.raises(PermissionError):
+        open(tmp_path / "a/main.py", "w")
+
+
+def test_executable_bit_survives_commit_and_checkout(store, tmp_path):
+    a = make_run(tmp_path / "a", {"entrypoint.sh": "#!/bin/sh\n", "copy.sh": "#!/bin/sh\n"})
+    os.chmod(tmp_path / "a/entrypoint.sh", 0o755)
+
+    store.commit("a", a)
+    store.materialize("a", str(tmp_path / "restored"))
+
+    for root in ("a", "restored"):
+        assert os.access(tmp_path / root / "entrypoint.sh", os.X_OK)
+        assert not os.stat(tmp_path / root / "copy.sh").st_mode & 0o111
+    # Same content, different modes: one blob, two checkouts
+    assert store.stats()["objects"] == 1
+    genesis_store.write_artifact(str(tmp_path / "a/entrypoint.sh"), "#!/bin/sh\necho hi\n")
+    assert os.access(tmp_path / "a/entrypoint.sh", os.X_OK)
+
+
+def test_gc_keeps_blobs_other_runs_reference(store, tmp_path):
+    a = make_run(tmp_path / "a", {"shared.txt": "shared", "only_a.txt": "only a"})
+    b = make_run(tmp_path / "b", {"shared.txt": "shared"})
+    store.commit("a", a)
+    store.commit("b", b)
+
+    assert store.release("a") == 2
+    removed, _ = store.gc(grace=0)
+
+    assert removed == 1
+    assert store.get(store.files("b")["shared.txt"]) == b"shared"
+    assert (tmp_path / "b/shared.txt").read_text() == "shared"
+    store.materialize("b", str(tmp_path / "restored"))
+    assert (tmp_path / "restored/shared.txt").read_text() == "shared"
+
+
+def test_gc_spares_unreferenced_blobs_within_grace(store, tmp_path):
+    digest = store.put(b"not committed yet")
+
+    assert store.gc(grace=3600) == (0, 0)
+    assert store.get(digest) == b"not committed yet"
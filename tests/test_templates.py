@@ -0,0 +1,116 @@
+import ast
+
+import pytest
+
+from genesis_templates import EnvVar, collect_env, detect_stack, render_devops_manifest, render_env_example
+from genesis_workspace import use_workspace
+
+MAIN = '''import os
+
+from fastapi import FastAPI
+from supabase import create_client
+
+from .models import Quote
+
+api = FastAPI()
+client = create_client(os.environ["SUPABASE_URL"], os.getenv("SUPABASE_KEY"))
+LOG_LEVEL = os.getenv("LOG_LEVEL", "info")
+TIMEOUT = os.environ.get("GRACEFUL_SHUTDOWN_TIMEOUT", default="20")
+WORKERS = os.getenv("WEB_CONCURRENCY", str(os.cpu_count()))
+'''
+
+
+@pytest.fixture
+def build(tmp_path):
+    def make(files):
+        for rel, content in files.items():
+            path = tmp_path / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+        return tmp_path
+
+    with use_workspace(str(tmp_path)):
+        yield make
+
+
+def files(manifest):
+    return {artifact.path: artifact.content for artifact in manifest.files}
+
+
+def test_collects_env_lookups_and_their_defaults():
+    env = {}
+    collect_env(ast.parse(MAIN), env)
+
+    assert env["SUPABASE_URL"] == EnvVar(required=True)
+    assert env["SUPABASE_KEY"] == EnvVar()
+    assert env["LOG_LEVEL"] == EnvVar(default="info", has_default=True)
+    assert env["GRACEFUL_SHUTDOWN_TIMEOUT"].default == "20"
+    assert env["WEB_CONCURRENCY"] == EnvVar(has_default=True)
+
+
+def test_renders_fastapi_stack(build):
+    build({"src/main.py": MAIN, "src/models.py": "from pydantic import BaseModel\n",
+           "architectural_blueprint.md": "Runs on Python 3.12.\nThe API listens on localhost:8080.\n"
+                                         "Supabase Postgres on port 5432.\n"})
+
+    out = files(render_devops_manifest())
+
+    assert out["requirements.txt"].splitlines() == ["fastapi==0.116.1", "uvicorn[standard]==0.35.0", "supabase==2.18.1"]
+    assert "FROM python:3.12-slim" in out["Dockerfile"]
+    assert "PORT=8080" in out["Dockerfile"]
+    assert "uvicorn src.main:api" in out["Dockerfile"]
+    assert '"8080:8080"' in out["docker-compose.yml"]
+    assert "stop_grace_period: 30s" in out["docker-compose.yml"]
+
+
+def test_env_example_sets_only_what_the_code_needs(build):
+    build({"src/main.py": MAIN})
+
+    lines = render_env_example(detect_stack()).splitlines()
+
+    assert lines[:2] == ["SUPABASE_URL=your_supabase_url_here", "SUPABASE_KEY=your_supabase_key_here"]
+    # An empty value would override the code's default once compose loads the file
+    assert "# LOG_LEVEL=info" in lines
+    assert "# WEB_CONCURRENCY=" in lines
+    assert not any(line.startswith(("LOG_LEVEL", "WEB_CONCURRENCY")) for line in lines)
+
+
+def test_code_port_wins_over_blueprint(build):
+    build({"src/main.py": "import uvicorn\nfrom fastapi import FastAPI\nserver = FastAPI()\n"
+                          "if __name__ == '__main__':\n    uvicorn.run(server, port=9000)\n",
+           "architectural_blueprint.md": "PORT=8080\n"})
+
+    spec = detect_stack()
+
+    assert (spec.framework.name, spec.port, spec.app_name, spec.has_main) == ("fastapi", 9000, "server", True)
+
+
+def test_flask_runs_under_gunicorn(build):
+    build({"src/main.py": "from flask import Flask\napp = Flask(__name__)\n"})
+
+    out = files(render_devops_manifest())
+
+    assert out["requirements.txt"].splitlines() == ["Flask==3.1.1", "gunicorn==23.0.0"]
+    assert "gunicorn --bind $HOST:$PORT" in out["Dockerfile"]
+    assert "PORT=5000" in out["Dockerfile"]
+
+
+def test_unknown_stacks_are_left_to_the_agent(build):
+    build({"src/main.py": "import django\n"})
+
+    assert render_devops_manifest() is None
+
+
+def test_missing_source_is_left_to_the_agent(build):
+    assert detect_stack() is None
+
+
+def test_frontend_is_built_in_its_own_stage(build):
+    build({"src/main.py": MAIN, "build_assets.py": "", "frontend/index.html": "<html></html>"})
+
+    dockerfile = files(render_devops_manifest())["Dockerfile"]
+
+    assert "FROM python:3.11-slim AS assets" in dockerfile
+    assert "RUN python build_assets.py frontend" in dockerfile
+    assert "COPY --from=assets /app/frontend/dist ./frontend/dist" in dockerfile
+    assert dockerfile.index("AS assets") < dockerfile.index("AS builder")
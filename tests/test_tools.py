@@ -0,0 +1,61 @@
+import asyncio
+import time
+from typing import Type
+
+import pytest
+from pydantic import BaseModel
+
+from genesis_budget import check_cancelled
+from genesis_tools import FastTool
+
+
+class WriteInput(BaseModel):
+    path: str
+    delay: float = 0.0
+
+
+class SlowWriter(FastTool):
+    name: str = "SlowWriter"
+    description: str = "Writes a marker file after a delay."
+    args_schema: Type[BaseModel] = WriteInput
+    timeout: float = 0.2
+
+    def _execute(self, path: str, delay: float) -> str:
+        time.sleep(delay)
+        check_cancelled()
+        with open(path, "w") as f:
+            f.write("written")
+        return "ok"
+
+
+def test_execute_is_abstract():
+    class NoExecute(FastTool):
+        name: str = "NoExecute"
+        description: str = "Forgets _execute."
+        args_schema: Type[BaseModel] = WriteInput
+
+    with pytest.raises(TypeError):
+        NoExecute()
+
+
+def test_writes_within_the_timeout(tmp_path):
+    assert SlowWriter()._run(path=str(tmp_path / "out")) == "ok"
+    assert (tmp_path / "out").read_text() == "written"
+
+
+def test_timed_out_call_does_not_write_late(tmp_path):
+    result = SlowWriter()._run(path=str(tmp_path / "out"), delay=0.5)
+
+    assert "timed out" in result
+    time.sleep(0.6)
+    assert not (tmp_path / "out").exists()
+
+
+def test_timed_out_async_call_does_not_write_late(tmp_path):
+    async def call():
+        result = await SlowWriter()._arun(path=str(tmp_path / "out"), delay=0.5)
+        await asyncio.sleep(0.6)
+        return result
+
+    assert "timed out" in asyncio.run(call())
+    assert not (tmp_path / "out").exists()
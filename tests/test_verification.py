@@ -0,0 +1,121 @@
+import os
+
+import pytest
+
+from genesis_verification import TestFailure as Failure
+from genesis_verification import VerificationReport, owner_for, parse_junit, suite_failures, verify_workspace
+
+JUNIT = """<?xml version="1.0" encoding="utf-8"?>
+<testsuites><testsuite name="pytest" tests="4">
+  <testcase classname="tests.test_calc" file="tests/test_calc.py" name="test_ok" />
+  <testcase classname="tests.test_calc" file="tests/test_calc.py" name="test_skipped"><skipped /></testcase>
+  <testcase classname="tests.test_calc" file="tests/test_calc.py" name="test_add">
+    <failure message="assert 3 == 4">tests/test_calc.py:5: in test_add
+    assert add(1, 2) == 4
+src/calc.py:2: in add
+    return a + b + 1
+E   assert 3 == 4
+E    +  where 3 = add(1, 2)</failure>
+  </testcase>
+  <testcase classname="tests.test_api" name="test_fixture">
+    <error message="fixture 'client' not found">file /abs/tests/test_api.py, line 3
+E       fixture 'client' not found</error>
+  </testcase>
+</testsuite></testsuites>
+"""
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    def make(files):
+        for rel, content in files.items():
+            path = tmp_path / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+        return str(tmp_path)
+
+    return make
+
+
+def test_parse_junit_blames_the_deepest_workspace_frame(workspace, tmp_path):
+    root = workspace({"src/calc.py": "", "tests/test_calc.py": "", "report.xml": JUNIT})
+
+    report = parse_junit(os.path.join(root, "report.xml"), root)
+
+    assert not report.passed
+    assert report.tests_passed == 1
+    failure, error = report.failures
+    assert failure == Failure("tests/test_calc.py::test_add", os.path.join("src", "calc.py"), "BackendDeveloper",
+                                  "assert 3 == 4 +  where 3 = add(1, 2)")
+    # No frame inside the workspace: the test module itself, from its classname
+    assert (error.file, error.owner, error.message) == (os.path.join("tests", "test_api.py"), "QAEngineer",
+                                                        "fixture 'client' not found")
+
+
+def test_owners_route_backend_fixes_first():
+    report = VerificationReport(passed=False, failures=[
+        Failure("t1", "tests/test_api.py", "QAEngineer", "a"),
+        Failure("t2", "src/main.py", "BackendDeveloper", "b"),
+        Failure("t3", "src/main.py", "BackendDeveloper", "c"),
+    ])
+
+    assert report.owners()[0] == "BackendDeveloper"
+    assert report.owners() == ["BackendDeveloper", "QAEngineer"]
+    assert report.files_for("BackendDeveloper") == ["src/main.py"]
+    assert report.feedback_for("QAEngineer") == "- t1 [tests/test_api.py]: a"
+    assert [owner_for(p) for p in ("conftest.py", os.path.join("tests", "helpers.py"), "src/main.py")] == [
+        "QAEngineer", "QAEngineer", "BackendDeveloper"]
+
+
+def test_suite_failures_name_the_modules_that_failed_to_collect(workspace):
+    root = workspace({"src/main.py": "", "tests/test_api.py": "", "tests/test_models.py": ""})
+    output = (f"ImportError while importing test module '{root}/tests/test_api.py'.\n"
+              "ERROR collecting tests/test_models.py\n")
+
+    failures = suite_failures(output, root, "2 errors")
+
+    assert [(f.file, f.owner) for f in failures] == [(os.path.join("tests", "test_api.py"), "QAEngineer"),
+                                                      (os.path.join("tests", "test_models.py"), "QAEngineer")]
+
+
+def test_suite_failures_prefer_a_workspace_frame(workspace):
+    root = workspace({"src/main.py": "", "tests/test_api.py": ""})
+    output = "ERROR collecting tests/test_api.py\nsrc/main.py:3: in <module>\n    import missing\n"
+
+    assert [f.file for f in suite_failures(output, root, "error")] == ["src/main.py", os.path.join("tests", "test_api.py")]
+
+
+def test_suite_failures_without_clues_go_to_every_test_module_or_conftest(workspace, tmp_path):
+    root = workspace({"tests/test_b.py": "", "tests/test_a.py": ""})
+
+    assert [f.file for f in suite_failures("Timed out after 300s", root, "timeout")] == [
+        os.path.join("tests", "test_a.py"), os.path.join("tests", "test_b.py")]
+    assert [f.file for f in suite_failures("", str(tmp_path / "empty"), "crash")] == [os.path.join("tests", "conftest.py")]
+
+
+def test_verify_workspace_runs_the_suite(workspace):
+    root = workspace({
+        "src/__init__.py": "",
+        "src/calc.py": "def add(a, b):\n    if a:\n        return a + b + c\n    return b\n",
+        "tests/test_calc.py": "from src.calc import add\n\n\ndef test_add():\n    assert add(1, 2) == 3\n\n\n"
+                              "def test_zero():\n    assert add(0, 0) == 0\n",
+    })
+
+    report = verify_workspace(root)
+
+    assert not report.passed
+    assert report.tests_passed == 1
+    assert [(f.test, f.file, f.owner) for f in report.failures] == [
+        ("tests/test_calc.py::test_add", os.path.join("src", "calc.py"), "BackendDeveloper")]
+
+
+def test_verify_workspace_reports_collection_errors(workspace):
+    root = workspace({"src/__init__.py": "", "src/main.py": "import not_installed\n",
+                      "tests/test_main.py": "from src import main\n\n\ndef test_main():\n    pass\n"})
+
+    report = verify_workspace(root)
+
+    assert not report.passed
+    assert report.failures
+    assert report.owners()[0] == "BackendDeveloper"
+    assert os.path.join("src", "main.py") in report.files_for("BackendDeveloper")